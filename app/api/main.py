@@ -4,23 +4,32 @@ FastAPI主应用
 """
 
 from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
+from fastapi.responses import JSONResponse, HTMLResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from jinja2 import Template
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
 import os
-import shutil
 import json
 from pathlib import Path
 from datetime import datetime
 
-from app.models.database import get_db, init_db, Project, Document, ReviewRecord, ReviewStandard, ReviewRule
+from app.models.database import get_db, init_db, SessionLocal, Project, Document, ReviewRecord, ReviewStandard, ReviewRule, Blob
 from app.services.document_parser.parser import DocumentParserFactory
-from app.services.review_engine.ai_reviewer import AIReviewer
-from app.services.rule_engine.rule_engine import RuleEngine
+from app.services.rule_engine.ruleset_cache import get_ruleset_cache, bump_ruleset_version
+from app.services.rule_engine.rule_store import rule_fingerprint, backfill_rule_fingerprints
+from app.services.rule_engine.rule_transfer import RuleImporter, iter_rules_jsonl
 from app.services.report_generator.report_generator import ReportGenerator
+from app.services.blob_store import BlobStore
+from app.services.executors import get_executor_pools
+from app.utils.upload import get_max_upload_size, UploadTooLargeError, MULTIPART_OVERHEAD, iter_upload_lines
+from app.services.job_queue.job_manager import get_job_manager, JOB_SUCCEEDED, JOB_CANCELLED
+from app.services.job_queue.tasks import (
+    register_default_tasks, get_standard_content,
+    JOB_PARSE_DOCUMENT, JOB_REVIEW_DOCUMENT, JOB_GENERATE_RULES, JOB_IMPORT_HAZARDS
+)
 
 app = FastAPI(title="技术方案审核AI助手系统", version="1.0.0")
 
@@ -33,6 +42,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 接收multipart文件上传的接口（路径后缀）
+UPLOAD_PATH_SUFFIXES = ("/upload", "/api/hazard-library/import")
+
+
+# 上传请求体大小限制：按Content-Length提前拒绝，不等待接收完整请求体
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """
+    上传接口的请求体超过MAX_FILE_SIZE_MB时直接返回413
+    
+    multipart请求体在进入接口处理函数之前已被完整接收（写入临时文件），
+    因此上传接口要求请求带Content-Length：分块传输（无Content-Length）的请求直接返回411，
+    否则超大的请求体会先被完整写入磁盘。
+    """
+    if request.method == "POST" and request.url.path.endswith(UPLOAD_PATH_SUFFIXES):
+        content_length = request.headers.get("content-length", "")
+        if not content_length.isdigit():
+            if "transfer-encoding" in request.headers or \
+                    request.headers.get("content-type", "").startswith("multipart/"):
+                return JSONResponse(status_code=411, content={"detail": "上传请求须包含Content-Length"})
+        elif int(content_length) > get_max_upload_size() + MULTIPART_OVERHEAD:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": str(UploadTooLargeError(get_max_upload_size()))}
+            )
+    return await call_next(request)
+
 # 全局异常处理器
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -69,6 +105,13 @@ if static_dir.exists():
 UPLOAD_DIR = Path("data/documents")
 REPORT_DIR = Path("data/reports")
 
+# 上传文件按内容哈希存储，不同项目上传的相同文件共享一份
+blob_store = BlobStore(UPLOAD_DIR / "blobs")
+
+# 后台任务：解析、审核、规则生成在工作线程中执行，不阻塞事件循环
+job_manager = get_job_manager()
+register_default_tasks(job_manager, report_dir=REPORT_DIR, blob_store=blob_store)
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -79,8 +122,12 @@ async def startup_event():
         # 创建必要的目录
         UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
         REPORT_DIR.mkdir(parents=True, exist_ok=True)
+        blob_store.root.mkdir(parents=True, exist_ok=True)
         print("✓ 目录创建成功")
     except Exception as e:
+        # 上传目录不可写时使用系统临时目录
+        import tempfile
+        blob_store.root = Path(tempfile.gettempdir()) / "uploads" / "blobs"
         print(f"⚠ 目录创建警告: {str(e)}")
         # 在Vercel环境中，某些目录可能无法创建，但不影响基本功能
     
@@ -88,10 +135,55 @@ async def startup_event():
         # 初始化数据库（延迟初始化，避免模块导入时失败）
         init_db()
         print("✓ 数据库初始化成功")
+        # 旧版本重复生成的AI规则补算指纹并合并
+        db = SessionLocal()
+        try:
+            backfill = backfill_rule_fingerprints(db)
+        finally:
+            db.close()
+        if backfill["deleted"]:
+            bump_ruleset_version()
+            print(f"✓ 已合并{backfill['deleted']}条重复的AI生成规则")
     except Exception as e:
         print(f"⚠ 数据库初始化警告: {str(e)}")
         # 在Vercel环境中，如果使用PostgreSQL，需要配置DATABASE_URL
         # SQLite在Vercel中可能无法正常工作（文件系统只读）
+    
+    try:
+        # 恢复上次未执行完的后台任务
+        from config.config import JOB_QUEUE_CONFIG
+        if JOB_QUEUE_CONFIG.get("recover_on_startup", True):
+            recovered = job_manager.recover()
+            if recovered:
+                print(f"✓ 已恢复{recovered}个后台任务")
+    except Exception as e:
+        print(f"⚠ 后台任务恢复警告: {str(e)}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """关闭事件"""
+    job_manager.shutdown(wait=False)
+    get_executor_pools().shutdown(wait=False)
+
+
+def _job_submitted_response(job_id: int) -> dict:
+    """异步提交任务（wait=false）时的返回"""
+    return {
+        "code": 200,
+        "message": "任务已提交",
+        "data": job_manager.get(job_id)
+    }
+
+
+async def _wait_job_result(job_id: int, error_prefix: str) -> dict:
+    """等待任务结束并返回任务结果，失败或取消时抛出HTTP异常"""
+    job = await job_manager.wait(job_id)
+    if job["status"] == JOB_SUCCEEDED:
+        return job["result"]
+    if job["status"] == JOB_CANCELLED:
+        raise HTTPException(status_code=409, detail=f"{error_prefix}: 任务已取消")
+    raise HTTPException(status_code=500, detail=f"{error_prefix}: {job.get('error') or job['status']}")
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -242,21 +334,11 @@ async def upload_document(
     if not project:
         raise HTTPException(status_code=404, detail="项目不存在")
     
-    # 保存文件（Vercel环境中需要使用临时目录或云存储）
+    # 按内容哈希保存文件（相同内容的文件只保存一份）
     try:
-        # 尝试使用配置的目录
-        file_path = UPLOAD_DIR / f"{project_id}_{file.filename}"
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-    except Exception:
-        # 如果失败，使用系统临时目录
-        import tempfile
-        temp_dir = Path(tempfile.gettempdir()) / "uploads"
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        file_path = temp_dir / f"{project_id}_{file.filename}"
-    
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        stored = await blob_store.store_upload(db, file, Path(file.filename).suffix)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"文件保存失败: {str(e)}")
     
@@ -264,9 +346,10 @@ async def upload_document(
     document = Document(
         project_id=project_id,
         file_name=file.filename,
-        file_path=str(file_path),
+        file_path=str(stored.path),
         file_type=Path(file.filename).suffix,
-        file_size=file_path.stat().st_size,
+        file_size=stored.size,
+        file_hash=stored.sha256,
         parse_status="待解析"
     )
     db.add(document)
@@ -287,45 +370,108 @@ async def upload_document(
 @app.post("/api/documents/{document_id}/parse")
 async def parse_document(
     document_id: int,
+    wait: bool = True,
     db: Session = Depends(get_db)
 ):
-    """解析文档"""
+    """解析文档（后台任务执行；wait=false时立即返回任务ID）"""
     document = db.query(Document).filter(Document.id == document_id).first()
     if not document:
         raise HTTPException(status_code=404, detail="文档不存在")
     
-    try:
-        # 解析文档
-        parsed_content = DocumentParserFactory.parse_document(document.file_path)
-        
-        # 更新文档记录
-        document.content = parsed_content.get("content", "")
-        document.chapters = parsed_content.get("chapters", [])
-        document.parse_status = "解析完成"
-        db.commit()
-        
-        return {
-            "code": 200,
-            "message": "文档解析成功",
-            "data": {
-                "document_id": document.id,
-                "chapters_count": len(parsed_content.get("chapters", [])),
-                "content_length": len(parsed_content.get("content", ""))
-            }
-        }
-    except Exception as e:
-        document.parse_status = "解析失败"
-        db.commit()
-        raise HTTPException(status_code=500, detail=f"文档解析失败: {str(e)}")
+    job_id = job_manager.submit(JOB_PARSE_DOCUMENT, {"document_id": document_id})
+    if not wait:
+        return _job_submitted_response(job_id)
+    
+    return {
+        "code": 200,
+        "message": "文档解析成功",
+        "data": await _wait_job_result(job_id, "文档解析失败")
+    }
+
+
+@app.delete("/api/documents/{document_id}")
+async def delete_document(
+    document_id: int,
+    db: Session = Depends(get_db)
+):
+    """删除文档（审核记录保留，文件在不再被引用时删除）"""
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="文档不存在")
+    
+    file_path = document.file_path
+    db.query(ReviewRecord).filter(ReviewRecord.document_id == document_id).update(
+        {ReviewRecord.document_id: None}, synchronize_session=False
+    )
+    db.delete(document)
+    db.commit()
+    blob_store.release(db, file_path)
+    
+    return {
+        "code": 200,
+        "message": "文档删除成功"
+    }
+
+
+@app.get("/api/blob-store/stats")
+async def get_blob_store_stats(db: Session = Depends(get_db)):
+    """获取文件存储统计信息（去重节省的空间等）"""
+    return {
+        "code": 200,
+        "data": blob_store.get_stats(db)
+    }
+
+
+@app.get("/api/parse-cache/stats")
+async def get_parse_cache_stats():
+    """获取解析缓存统计信息"""
+    from app.services.document_parser.parse_cache import get_parse_cache
+    
+    return {
+        "code": 200,
+        "data": get_parse_cache().get_stats()
+    }
+
+
+@app.get("/api/llm-cache/stats")
+async def get_llm_cache_stats():
+    """获取大语言模型响应缓存统计信息"""
+    from app.services.llm.response_cache import get_llm_response_cache
+    
+    cache = get_llm_response_cache()
+    return {
+        "code": 200,
+        "data": cache.get_stats() if cache is not None else {"enabled": False}
+    }
+
+
+@app.get("/api/executors/stats")
+async def get_executor_stats():
+    """获取计算进程池与I/O线程池统计（排队深度等）"""
+    return {
+        "code": 200,
+        "data": get_executor_pools().get_stats()
+    }
+
+
+@app.get("/api/ruleset-cache/stats")
+async def get_ruleset_cache_stats():
+    """获取规则集缓存统计信息"""
+    return {
+        "code": 200,
+        "data": get_ruleset_cache().get_stats()
+    }
 
 
 @app.post("/api/documents/{document_id}/review")
 async def review_document(
     document_id: int,
     use_ai: bool = True,
+    standard_id: Optional[int] = None,
+    wait: bool = True,
     db: Session = Depends(get_db)
 ):
-    """审核文档"""
+    """审核文档（standard_id：只启用该规范生成的规则及通用规则；wait=false时立即返回任务ID）"""
     document = db.query(Document).filter(Document.id == document_id).first()
     if not document:
         raise HTTPException(status_code=404, detail="文档不存在")
@@ -333,97 +479,19 @@ async def review_document(
     if document.parse_status != "解析完成":
         raise HTTPException(status_code=400, detail="文档尚未解析完成")
     
-    try:
-        # 准备文档内容
-        document_content = {
-            "content": document.content or "",
-            "chapters": document.chapters or []
-        }
-        
-        # AI审核
-        ai_reviewer = AIReviewer()
-        review_result = ai_reviewer.review_document(document_content)
-        
-        # 规则引擎审核
-        rule_engine = RuleEngine()
-        rule_results = rule_engine.check_rules(
-            document_content["content"],
-            document_content["chapters"]
-        )
-        
-        # 合并规则引擎结果
-        for rule_result in rule_results:
-            if rule_result.get("status") == "不通过":
-                review_result["issues"].append({
-                    "type": "规则检查",
-                    "severity": rule_result.get("severity", "一般"),
-                    "description": rule_result.get("description", ""),
-                    "suggestion": rule_result.get("suggestion", "")
-                })
-        
-        # 重新计算得分（合并规则引擎结果后）
-        review_result["score"] = ai_reviewer._calculate_score(
-            review_result["completeness"],
-            review_result["chapter_reviews"]
-        )
-        
-        # 生成报告
-        project = db.query(Project).filter(Project.id == document.project_id).first()
-        project_info = {
-            "name": project.name if project else "",
-            "project_type": project.project_type if project else ""
-        }
-        
-        report_generator = ReportGenerator()
-        report = report_generator.generate_report(review_result, project_info)
-        
-        # 保存审核记录
-        review_record = ReviewRecord(
-            project_id=document.project_id,
-            document_id=document_id,
-            review_type="AI审核" if use_ai else "规则审核",
-            review_result=review_result,
-            issues=review_result.get("issues", []),
-            suggestions=review_result.get("suggestions", []),
-            score=review_result.get("score", 0),
-            status="审核完成"
-        )
-        db.add(review_record)
-        
-        # 更新项目状态
-        if project:
-            if review_result["score"] >= 80:
-                project.status = "审核通过"
-            elif review_result["score"] >= 60:
-                project.status = "有条件通过"
-            else:
-                project.status = "审核不通过"
-        
-        db.commit()
-        db.refresh(review_record)
-        
-        # 保存报告文件（Vercel环境中可能需要使用临时目录）
-        try:
-            report_file = REPORT_DIR / f"report_{review_record.id}.json"
-            report_file.parent.mkdir(parents=True, exist_ok=True)
-            report_generator.export_to_json(report, str(report_file))
-        except Exception as e:
-            # 如果保存失败，记录但不影响返回结果
-            print(f"报告文件保存警告: {str(e)}")
-        
-        return {
-            "code": 200,
-            "message": "审核完成",
-            "data": {
-                "review_id": review_record.id,
-                "score": review_result["score"],
-                "issues_count": len(review_result.get("issues", [])),
-                "suggestions_count": len(review_result.get("suggestions", [])),
-                "report": report
-            }
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"审核失败: {str(e)}")
+    job_id = job_manager.submit(JOB_REVIEW_DOCUMENT, {
+        "document_id": document_id,
+        "use_ai": use_ai,
+        "standard_id": standard_id
+    })
+    if not wait:
+        return _job_submitted_response(job_id)
+    
+    return {
+        "code": 200,
+        "message": "审核完成",
+        "data": await _wait_job_result(job_id, "审核失败")
+    }
 
 
 @app.get("/api/projects/{project_id}/reviews")
@@ -452,10 +520,9 @@ async def get_project_reviews(
 @app.get("/api/review-points")
 async def get_review_points():
     """获取审核要点库"""
-    from app.core.review_point_library import ReviewPointLibrary
+    from app.core.review_point_library import get_review_point_library
     
-    library = ReviewPointLibrary()
-    all_points = library.get_all_review_points()
+    all_points = get_review_point_library().get_all_review_points()
     
     # 格式化数据
     formatted_points = {}
@@ -476,16 +543,20 @@ async def upload_review_standard(
     db: Session = Depends(get_db)
 ):
     """上传审核规范文件"""
-    # 保存文件
-    file_path = UPLOAD_DIR / f"standard_{datetime.now().strftime('%Y%m%d%H%M%S')}_{file.filename}"
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # 按内容哈希保存文件（相同内容的文件只保存一份）
+    try:
+        stored = await blob_store.store_upload(db, file, Path(file.filename).suffix)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
-    # 解析文件内容
+    # 解析文件内容（在I/O线程池中执行，不阻塞事件循环）
     try:
-        parsed_content = DocumentParserFactory.parse_document(str(file_path))
+        parsed_content = await get_executor_pools().arun_io(
+            DocumentParserFactory.parse_document, str(stored.path), file_hash=stored.sha256
+        )
         content = parsed_content.get("content", "")
     except Exception as e:
+        parsed_content = None
         content = ""
     
     # 创建规范记录
@@ -493,8 +564,9 @@ async def upload_review_standard(
         name=name or file.filename,
         category=category or "通用规范",
         file_name=file.filename,
-        file_path=str(file_path),
+        file_path=str(stored.path),
         file_type=Path(file.filename).suffix,
+        file_hash=stored.sha256,
         content=content,
         parsed_content=parsed_content,
         status="已上传"
@@ -541,6 +613,87 @@ async def get_review_standards(
     }
 
 
+@app.delete("/api/review-standards/{standard_id}")
+async def delete_review_standard(
+    standard_id: int,
+    db: Session = Depends(get_db)
+):
+    """删除审核规范及其关联规则（文件在不再被引用时删除）"""
+    standard = db.query(ReviewStandard).filter(ReviewStandard.id == standard_id).first()
+    if not standard:
+        raise HTTPException(status_code=404, detail="审核规范不存在")
+    
+    file_path = standard.file_path
+    rules_count = db.query(ReviewRule).filter(ReviewRule.standard_id == standard_id).delete(
+        synchronize_session=False
+    )
+    db.delete(standard)
+    db.commit()
+    if rules_count:
+        bump_ruleset_version()
+    blob_store.release(db, file_path)
+    
+    return {
+        "code": 200,
+        "message": "审核规范删除成功",
+        "data": {
+            "rules_count": rules_count
+        }
+    }
+
+
+@app.post("/api/hazard-library/import")
+async def import_hazard_library(
+    file: Optional[UploadFile] = File(None),
+    wait: bool = True,
+    db: Session = Depends(get_db)
+):
+    """导入重大风险及重大隐患数据库（未上传文件时导入内置数据库；重复导入只更新有变化的条目）"""
+    from config.config import HAZARD_LIBRARY_CONFIG
+    
+    if file is not None and file.filename:
+        if Path(file.filename).suffix.lower() != ".xlsx":
+            raise HTTPException(status_code=400, detail="隐患数据库须为xlsx文件")
+        try:
+            stored = await blob_store.store_upload(db, file, ".xlsx")
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        params = {"file_path": str(stored.path), "file_name": file.filename, "file_hash": stored.sha256}
+    else:
+        default_file = Path(HAZARD_LIBRARY_CONFIG["default_file"])
+        if not default_file.exists():
+            raise HTTPException(status_code=404, detail="内置隐患数据库文件不存在")
+        params = {"file_path": str(default_file), "file_name": default_file.name}
+    
+    job_id = job_manager.submit(JOB_IMPORT_HAZARDS, params)
+    if not wait:
+        return _job_submitted_response(job_id)
+    
+    result = await _wait_job_result(job_id, "隐患数据库导入失败")
+    return {
+        "code": 200,
+        "message": f"隐患数据库导入完成：新增{result['inserted']}条，更新{result['updated']}条，删除{result['deleted']}条",
+        "data": result
+    }
+
+
+@app.get("/api/hazard-library")
+async def get_hazard_library(db: Session = Depends(get_db)):
+    """获取重大隐患关键词包信息（作业关键词与隐患条件词）"""
+    # 规则变更后首次获取需要重新编译规则集，在I/O线程池中执行
+    cached_ruleset = await get_executor_pools().arun_io(get_ruleset_cache().get, db)
+    hazard_pack = cached_ruleset.hazard_pack
+    
+    return {
+        "code": 200,
+        "data": {
+            "hazards_count": len(hazard_pack),
+            "keywords": hazard_pack.keywords,
+            "condition_terms": hazard_pack.condition_terms
+        }
+    }
+
+
 @app.get("/api/ai-models")
 async def get_ai_models():
     """获取可用的AI模型列表"""
@@ -558,65 +711,30 @@ async def generate_rules_from_standard(
     standard_id: int,
     model_name: str = "deepseek-chat",
     api_key: Optional[str] = None,
+    wait: bool = True,
     db: Session = Depends(get_db)
 ):
-    """从审核规范生成审核规则"""
+    """从审核规范生成审核规则（后台任务执行；wait=false时立即返回任务ID）"""
     standard = db.query(ReviewStandard).filter(ReviewStandard.id == standard_id).first()
     if not standard:
         raise HTTPException(status_code=404, detail="审核规范不存在")
     
-    # 使用AI生成规则
-    from app.services.ai_rule_generator import AIRuleGenerator
-    
-    generator = AIRuleGenerator(model_name=model_name, api_key=api_key)
-    content = standard.content or standard.parsed_content.get("content", "") if standard.parsed_content else ""
-    
-    if not content:
+    if not get_standard_content(standard):
         raise HTTPException(status_code=400, detail="规范内容为空，无法生成规则")
     
-    generated_rules = generator.generate_rules_from_standard(content, standard.category)
-    
-    # 保存生成的规则
-    saved_rules = []
-    for rule_data in generated_rules:
-        rule = ReviewRule(
-            standard_id=standard_id,
-            rule_name=rule_data.get("rule_name", ""),
-            rule_type=rule_data.get("rule_type", "内容检查"),
-            rule_content=json.dumps(rule_data, ensure_ascii=False),
-            rule_pattern=rule_data.get("rule_pattern", ""),
-            required_content=rule_data.get("required_content", []),
-            review_focus=rule_data.get("review_focus", ""),
-            severity=rule_data.get("severity", "一般"),
-            is_ai_generated=True,
-            ai_model=model_name
-        )
-        db.add(rule)
-        saved_rules.append(rule)
-    
-    db.commit()
-    
-    # 刷新规则ID
-    for rule in saved_rules:
-        db.refresh(rule)
+    job_id = job_manager.submit(JOB_GENERATE_RULES, {
+        "standard_id": standard_id,
+        "model_name": model_name,
+        "api_key": api_key
+    })
+    if not wait:
+        return _job_submitted_response(job_id)
     
+    result = await _wait_job_result(job_id, "规则生成失败")
     return {
         "code": 200,
-        "message": f"成功生成{len(saved_rules)}条审核规则",
-        "data": {
-            "standard_id": standard_id,
-            "rules_count": len(saved_rules),
-            "rules": [
-                {
-                    "id": r.id,
-                    "rule_name": r.rule_name,
-                    "rule_type": r.rule_type,
-                    "severity": r.severity,
-                    "is_ai_generated": r.is_ai_generated
-                }
-                for r in saved_rules
-            ]
-        }
+        "message": f"成功生成{result['rules_count']}条审核规则",
+        "data": result
     }
 
 
@@ -676,6 +794,7 @@ async def create_review_rule(
     )
     db.add(rule)
     db.commit()
+    bump_ruleset_version()
     db.refresh(rule)
     
     return {
@@ -688,6 +807,64 @@ async def create_review_rule(
     }
 
 
+@app.post("/api/review-rules/import")
+async def import_review_rules(
+    request: Request,
+    standard_id: Optional[int] = None,
+    skip_invalid: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    批量导入审核规则（请求体为JSONL，每行一条规则，格式同导出）
+
+    逐行解析校验并预编译匹配模式，按批写入，整个导入在一个事务中完成；
+    与已有规则指纹相同的规则更新原记录。skip_invalid=false时任一行无效则整体回滚。
+    """
+    from config.config import RULE_TRANSFER_CONFIG
+    
+    if standard_id is not None and not db.query(ReviewStandard.id).filter(ReviewStandard.id == standard_id).first():
+        raise HTTPException(status_code=404, detail="审核规范不存在")
+    
+    importer = RuleImporter(db, standard_id=standard_id, skip_invalid=skip_invalid)
+    pools = get_executor_pools()
+    try:
+        # 事件循环只负责接收与分行；解析、校验、预编译与写入按组在I/O线程池中执行
+        lines = []
+        async for line in iter_upload_lines(request.stream(), RULE_TRANSFER_CONFIG["max_line_bytes"]):
+            lines.append(line)
+            if len(lines) >= importer.batch_size:
+                await pools.arun_io(importer.add_lines, lines)
+                lines = []
+        if lines:
+            await pools.arun_io(importer.add_lines, lines)
+        result = await pools.arun_io(importer.finish)
+    except ValueError as e:
+        await pools.arun_io(db.rollback)
+        raise HTTPException(status_code=400, detail=f"规则导入失败，已回滚: {str(e)}")
+    except Exception:
+        await pools.arun_io(db.rollback)
+        raise
+    if result["imported"]:
+        bump_ruleset_version()
+    
+    return {
+        "code": 200,
+        "message": f"成功导入{result['imported']}条审核规则",
+        "data": result
+    }
+
+
+@app.get("/api/review-rules/export")
+async def export_review_rules(standard_id: Optional[int] = None):
+    """导出审核规则为JSONL（流式输出，不一次性载入全部规则）"""
+    file_name = f"review_rules_{standard_id}.jsonl" if standard_id is not None else "review_rules.jsonl"
+    return StreamingResponse(
+        iter_rules_jsonl(standard_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
+    )
+
+
 @app.put("/api/review-rules/{rule_id}")
 async def update_review_rule(
     rule_id: int,
@@ -718,8 +895,21 @@ async def update_review_rule(
         rule.priority = rule_data["priority"]
     if "is_active" in rule_data:
         rule.is_active = rule_data["is_active"]
+    if rule.rule_fingerprint:
+        # AI生成的规则修改后重新计算指纹，重新生成时按修改后的内容匹配
+        rule.rule_fingerprint = rule_fingerprint({
+            "rule_name": rule.rule_name,
+            "rule_type": rule.rule_type,
+            "rule_pattern": rule.rule_pattern,
+            "required_content": rule.required_content
+        })
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="该规范下已存在相同的规则")
+    bump_ruleset_version()
     db.refresh(rule)
     
     return {
@@ -744,6 +934,7 @@ async def delete_review_rule(
     
     db.delete(rule)
     db.commit()
+    bump_ruleset_version()
     
     return {
         "code": 200,
@@ -751,6 +942,147 @@ async def delete_review_rule(
     }
 
 
+def _job_param_int(params: dict, name: str, required: bool = True) -> Optional[int]:
+    value = params.get(name)
+    if value is None and not required:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise HTTPException(status_code=400, detail=f"任务参数{name}须为整数")
+    return value
+
+
+def _job_param_str(params: dict, name: str, default: Optional[str] = None) -> Optional[str]:
+    value = params.get(name, default)
+    if value is not None and not isinstance(value, str):
+        raise HTTPException(status_code=400, detail=f"任务参数{name}须为字符串")
+    return value
+
+
+def _validate_job_params(job_type: str, params: dict, db: Session) -> dict:
+    """
+    校验POST /api/jobs提交的任务参数，返回实际提交的参数
+
+    与各业务接口的校验一致；只接受客户端可以提供的参数，
+    隐患数据库只能从已上传到文件存储的文件（blob_key）或内置数据库导入，不接受服务器文件路径。
+    """
+    if not isinstance(params, dict):
+        raise HTTPException(status_code=400, detail="任务参数params须为对象")
+    
+    if job_type == JOB_PARSE_DOCUMENT:
+        document_id = _job_param_int(params, "document_id")
+        if not db.query(Document.id).filter(Document.id == document_id).first():
+            raise HTTPException(status_code=404, detail="文档不存在")
+        return {"document_id": document_id}
+    
+    if job_type == JOB_REVIEW_DOCUMENT:
+        document_id = _job_param_int(params, "document_id")
+        standard_id = _job_param_int(params, "standard_id", required=False)
+        use_ai = params.get("use_ai", True)
+        if not isinstance(use_ai, bool):
+            raise HTTPException(status_code=400, detail="任务参数use_ai须为布尔值")
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if not document:
+            raise HTTPException(status_code=404, detail="文档不存在")
+        if document.parse_status != "解析完成":
+            raise HTTPException(status_code=400, detail="文档尚未解析完成")
+        return {"document_id": document_id, "use_ai": use_ai, "standard_id": standard_id}
+    
+    if job_type == JOB_GENERATE_RULES:
+        standard_id = _job_param_int(params, "standard_id")
+        model_name = _job_param_str(params, "model_name", "deepseek-chat")
+        api_key = _job_param_str(params, "api_key")
+        standard = db.query(ReviewStandard).filter(ReviewStandard.id == standard_id).first()
+        if not standard:
+            raise HTTPException(status_code=404, detail="审核规范不存在")
+        if not get_standard_content(standard):
+            raise HTTPException(status_code=400, detail="规范内容为空，无法生成规则")
+        return {"standard_id": standard_id, "model_name": model_name, "api_key": api_key}
+    
+    if job_type == JOB_IMPORT_HAZARDS:
+        from config.config import HAZARD_LIBRARY_CONFIG
+        
+        blob_key = _job_param_str(params, "blob_key")
+        if not blob_key:
+            default_file = Path(HAZARD_LIBRARY_CONFIG["default_file"])
+            if not default_file.exists():
+                raise HTTPException(status_code=404, detail="内置隐患数据库文件不存在")
+            return {"file_path": str(default_file), "file_name": default_file.name}
+        
+        blob = db.query(Blob).filter(Blob.blob_key == blob_key).first()
+        if not blob or not blob_key.lower().endswith(".xlsx"):
+            raise HTTPException(status_code=404, detail="上传的隐患数据库文件不存在")
+        path = blob_store.path_for(blob_key)
+        # 与上传接口一致：任务持有一个引用，导入失败或被替换时由任务释放
+        if not blob_store.acquire(db, blob_key, blob.sha256, blob.file_size, path):
+            blob_store.release(db, str(path))
+            raise HTTPException(status_code=404, detail="上传的隐患数据库文件不存在")
+        return {
+            "file_path": str(path),
+            "file_name": _job_param_str(params, "file_name") or blob_key,
+            "file_hash": blob.sha256
+        }
+    
+    raise HTTPException(status_code=400, detail=f"不支持的任务类型: {job_type}")
+
+
+@app.post("/api/jobs")
+async def submit_job(job_data: dict, db: Session = Depends(get_db)):
+    """
+    提交后台任务
+    
+    job_type：parse_document（params：document_id）、review_document（document_id、use_ai、standard_id）、
+    generate_rules（standard_id、model_name、api_key）、import_hazards（blob_key，为空时导入内置数据库）
+    """
+    job_type = job_data.get("job_type")
+    if job_type not in job_manager.job_types():
+        raise HTTPException(status_code=400, detail=f"不支持的任务类型: {job_type}")
+    
+    params = _validate_job_params(job_type, job_data.get("params") or {}, db)
+    job_id = job_manager.submit(job_type, params)
+    return _job_submitted_response(job_id)
+
+
+@app.get("/api/jobs")
+async def get_jobs(
+    status: Optional[str] = None,
+    job_type: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50
+):
+    """获取后台任务列表"""
+    return {
+        "code": 200,
+        "data": job_manager.list_jobs(status=status, job_type=job_type, skip=skip, limit=limit)
+    }
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: int):
+    """查询后台任务状态及结果"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    
+    return {
+        "code": 200,
+        "data": job
+    }
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: int):
+    """取消后台任务（排队中的任务直接取消，运行中的任务在当前处理阶段结束后停止）"""
+    job = job_manager.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    
+    return {
+        "code": 200,
+        "message": "已请求取消任务",
+        "data": job
+    }
+
+
 @app.get("/api/reviews/{review_id}/report")
 async def get_review_report(
     review_id: int,
@@ -768,20 +1100,12 @@ async def get_review_report(
         "project_type": project.project_type if project else ""
     }
     
-    report_generator = ReportGenerator()
-    report = report_generator.generate_report(review.review_result, project_info)
+    # 报告生成与文件写入在I/O线程池中执行，不阻塞事件循环
+    report, report_file = await get_executor_pools().arun_io(
+        _build_review_report, review_id, review.review_result, project_info, format == "text"
+    )
     
     if format == "text":
-        try:
-            report_file = REPORT_DIR / f"report_{review_id}.txt"
-            report_file.parent.mkdir(parents=True, exist_ok=True)
-            report_generator.export_to_text(report, str(report_file))
-        except Exception as e:
-            # 如果保存失败，使用临时目录
-            import tempfile
-            temp_dir = Path(tempfile.gettempdir())
-            report_file = temp_dir / f"report_{review_id}.txt"
-            report_generator.export_to_text(report, str(report_file))
         return {
             "code": 200,
             "message": "报告已生成",
@@ -796,6 +1120,25 @@ async def get_review_report(
     }
 
 
+def _build_review_report(review_id: int, review_result: dict, project_info: dict, export_text: bool):
+    """生成审核报告，export_text时同时导出文本报告文件，返回(报告, 文本报告文件路径)"""
+    report_generator = ReportGenerator()
+    report = report_generator.generate_report(review_result, project_info)
+    if not export_text:
+        return report, None
+    try:
+        report_file = REPORT_DIR / f"report_{review_id}.txt"
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        report_generator.export_to_text(report, str(report_file))
+    except Exception as e:
+        # 如果保存失败，使用临时目录
+        import tempfile
+        temp_dir = Path(tempfile.gettempdir())
+        report_file = temp_dir / f"report_{review_id}.txt"
+        report_generator.export_to_text(report, str(report_file))
+    return report, report_file
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+多模式关键词自动机模块
+基于Aho-Corasick算法，一次扫描文本即可找出全部关键词的所有出现位置
+"""
+
+import bisect
+import hashlib
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class KeywordAutomaton:
+    """Aho-Corasick多模式匹配自动机"""
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        构建自动机
+
+        Args:
+            keywords: 关键词集合（自动去重，忽略空串）
+        """
+        self.keywords: List[str] = sorted({kw for kw in keywords if kw})
+        self.version = self.compute_version(self.keywords)
+
+        # goto[state]: 字符 -> 下一状态；fail[state]: 失配跳转；output[state]: 该状态命中的关键词序号
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self._build()
+
+        # 根状态下直接跳到下一个可能的关键词开头：
+        # 关键词均不少于两个字时按前两个字定位，否则按首字定位
+        self._prefix_length = 2 if self.keywords and min(map(len, self.keywords)) >= 2 else 1
+        self._prefix_re = self._compile_prefix_regex()
+
+    @staticmethod
+    def compute_version(keywords: Iterable[str]) -> str:
+        """计算关键词集合的版本哈希"""
+        digest = hashlib.sha256()
+        for kw in sorted(set(keywords)):
+            digest.update(kw.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[:16]
+
+    def _compile_prefix_regex(self):
+        """编译关键词前缀定位正则（按首字分组，便于正则引擎按首字符集快速跳过）"""
+        if not self.keywords:
+            return None
+        prefixes: Dict[str, set] = {}
+        for keyword in self.keywords:
+            prefixes.setdefault(keyword[0], set()).add(keyword[1:self._prefix_length])
+        branches = []
+        for first, rests in sorted(prefixes.items()):
+            rests = sorted(rest for rest in rests if rest)
+            if rests:
+                branches.append(re.escape(first) + "(?:" + "|".join(re.escape(r) for r in rests) + ")")
+            else:
+                branches.append(re.escape(first))
+        return re.compile("|".join(branches))
+
+    def _build(self):
+        goto, fail, output = self._goto, self._fail, self._output
+        own_output: List[List[int]] = [[]]
+
+        # 构建字典树
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto.append({})
+                    fail.append(0)
+                    own_output.append([])
+                    goto[state][ch] = next_state
+                state = next_state
+            own_output[state].append(index)
+
+        # 广度优先计算失配指针，并沿失配链合并输出
+        output[0] = ()
+        output.extend([()] * (len(goto) - 1))
+        queue = deque()
+        for next_state in goto[0].values():
+            fail[next_state] = 0
+            output[next_state] = tuple(own_output[next_state])
+            queue.append(next_state)
+
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in goto[state].items():
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail_state = goto[fallback].get(ch, 0)
+                if fail_state == next_state:
+                    fail_state = 0
+                fail[next_state] = fail_state
+                output[next_state] = tuple(own_output[next_state]) + output[fail_state]
+                queue.append(next_state)
+
+    def iter_matches(self, text: str, start: int = 0, end: Optional[int] = None):
+        """
+        扫描文本，按结束位置顺序产出 (起始偏移, 结束偏移, 关键词)
+
+        重叠的匹配与互为子串的关键词都会全部产出。
+        """
+        if not self.keywords:
+            return
+        if end is None:
+            end = len(text)
+
+        goto, fail, output = self._goto, self._fail, self._output
+        keywords = self.keywords
+        prefix_search = self._prefix_re.search
+
+        state = 0
+        pos = start
+        while pos < end:
+            if state == 0:
+                # 根状态：直接跳到下一个关键词前缀出现的位置
+                match = prefix_search(text, pos, end)
+                if match is None:
+                    return
+                for ch in match.group():
+                    state = goto[state][ch]
+                pos = match.end()
+            else:
+                ch = text[pos]
+                transitions = goto[state]
+                while ch not in transitions:
+                    state = fail[state]
+                    if state == 0:
+                        break
+                    transitions = goto[state]
+                state = goto[state].get(ch, 0)
+                pos += 1
+
+            for index in output[state]:
+                keyword = keywords[index]
+                yield pos - len(keyword), pos, keyword
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """返回全部命中 [(起始偏移, 结束偏移, 关键词), ...]"""
+        return list(self.iter_matches(text))
+
+    def build_index(self, text: str) -> "KeywordHitIndex":
+        """扫描一次文本，建立 关键词 -> 出现位置 的索引"""
+        return KeywordHitIndex(self, self.iter_matches(text))
+
+
+class KeywordHitIndex:
+    """关键词命中索引：支持查询某关键词是否出现在指定字符区间内"""
+
+    def __init__(self, automaton: KeywordAutomaton, matches: Iterable[Tuple[int, int, str]]):
+        self.version = automaton.version
+        self._keywords = set(automaton.keywords)
+        self._positions: Dict[str, List[int]] = {}
+        for start, _, keyword in matches:
+            self._positions.setdefault(keyword, []).append(start)
+        # 按结束位置产出，起始位置可能乱序
+        for positions in self._positions.values():
+            positions.sort()
+
+    def covers(self, keyword: str) -> bool:
+        """关键词是否已编译进自动机"""
+        return keyword in self._keywords
+
+    def positions(self, keyword: str) -> List[int]:
+        """关键词全部出现的起始偏移"""
+        return self._positions.get(keyword, [])
+
+    def contains(self, keyword: str, start: int = 0, end: Optional[int] = None) -> bool:
+        """关键词是否完整出现在 [start, end) 区间内"""
+        positions = self._positions.get(keyword)
+        if not positions:
+            return False
+        if end is None:
+            return positions[-1] >= start
+        index = bisect.bisect_left(positions, start)
+        return index < len(positions) and positions[index] + len(keyword) <= end
+
+    def matched_keywords(self) -> List[str]:
+        """出现过的关键词"""
+        return list(self._positions)
+
+
+# 共享自动机缓存：按关键词集合版本复用，避免每个请求重复构建
+_AUTOMATON_CACHE_SIZE = 8
+_automaton_cache: "OrderedDict[str, KeywordAutomaton]" = OrderedDict()
+_automaton_cache_lock = threading.Lock()
+
+
+def get_shared_automaton(keywords: Iterable[str]) -> KeywordAutomaton:
+    """获取（或构建）关键词集合对应的共享自动机"""
+    keywords = {kw for kw in keywords if kw}
+    version = KeywordAutomaton.compute_version(keywords)
+    with _automaton_cache_lock:
+        automaton = _automaton_cache.get(version)
+        if automaton is not None:
+            _automaton_cache.move_to_end(version)
+            return automaton
+
+    automaton = KeywordAutomaton(keywords)
+    with _automaton_cache_lock:
+        _automaton_cache[version] = automaton
+        _automaton_cache.move_to_end(version)
+        while len(_automaton_cache) > _AUTOMATON_CACHE_SIZE:
+            _automaton_cache.popitem(last=False)
+    return automaton
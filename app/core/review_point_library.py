@@ -4,12 +4,86 @@
 基于机场场道工程施工组织设计标准结构设计
 """
 
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# 章节名称关键词：章节名称包含某个要点库章节的全部关键词时，按该章节的审核要点审核
+CHAPTER_NAME_KEYWORDS = {
+    "编制说明": ("编制", "说明"),
+    "工程概况": ("工程", "概况"),
+    "施工部署": ("施工", "部署"),
+    "施工准备": ("施工", "准备"),
+    "主要施工方法": ("施工", "方法", "技术"),
+    "施工进度计划": ("进度", "计划"),
+    "资源配置计划": ("资源", "配置"),
+    "质量保证措施": ("质量", "保证"),
+    "安全保证措施": ("安全", "保证"),
+    "文明施工环保": ("文明", "施工", "环保", "环境"),
+    "季节性施工措施": ("季节", "施工"),
+    "应急预案": ("应急", "预案"),
+    "附图附表": ("附图", "附表", "图表")
+}
+
+# 完整性检查关键词：必含章节与实际章节都没有编号时，包含同一关键词即视为匹配
+COMPLETENESS_KEYWORDS = (
+    "编制说明", "工程概况", "施工部署", "施工准备", "施工方法",
+    "进度计划", "资源配置", "质量保证", "安全保证", "文明施工",
+    "季节性", "应急预案", "附图"
+)
+
+_NUMBER_RE = re.compile(r"(\d+)")
+
+
+class FrozenDict(dict):
+    """只读字典（仍是dict子类，可直接JSON序列化）"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("审核要点库为只读结构，不能修改")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value):
+    """递归转换为只读结构：字典转为FrozenDict，列表转为元组"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def chapter_number(title: str) -> Optional[str]:
+    """章节标题中的第一个数字编号"""
+    match = _NUMBER_RE.search(title)
+    return match.group(1) if match else None
+
 
 class ReviewPointLibrary:
-    """审核要点库"""
+    """
+    审核要点库
+
+    要点数据构建后冻结为只读结构，并预先建立查询索引：
+        required_chapters      必含章节列表（文档完整性）
+        chapter_by_number      章节编号 -> 必含章节
+        required_chapter_keywords / required_chapter_library_keys
+                               必含章节 -> 完整性关键词 / 要点库章节
+        chapter_requirements   要点库章节 -> ((要点名称, 必含内容, 严重程度, 审核重点), ...)
+        required_items         全部必含内容 ((要点库章节, 要点名称, 必含内容, 严重程度), ...)
+        required_content_items 去重排序后的全部必含内容
+        version                要点内容哈希（缓存可据此区分要点库版本）
+    同一进程内通过get_review_point_library()共享一个实例。
+    """
     
     def __init__(self):
-        self.review_points = {
+        self.review_points = freeze({
             "文档完整性": self._get_document_completeness_points(),
             "编制说明": self._get_preparation_statement_points(),
             "工程概况": self._get_project_overview_points(),
@@ -24,7 +98,56 @@ class ReviewPointLibrary:
             "季节性施工措施": self._get_seasonal_construction_points(),
             "应急预案": self._get_emergency_plan_points(),
             "附图附表": self._get_appendix_points()
-        }
+        })
+        self._build_indexes()
+        # 章节名称 -> 要点库章节 的查询结果缓存（章节名称在各文档间大量重复）
+        self._chapter_key_cache: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._chapter_key_lock = threading.Lock()
+    
+    def _build_indexes(self):
+        """建立查询索引"""
+        self.version = hashlib.sha256(
+            json.dumps(self.review_points, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        
+        self.required_chapters: Tuple[str, ...] = self.review_points["文档完整性"].get("必含章节", ())
+        self.chapter_by_number: Dict[str, str] = FrozenDict(
+            (chapter_number(title), title) for title in self.required_chapters if chapter_number(title)
+        )
+        # 必含章节 -> 包含的完整性关键词 / 对应的要点库章节（必含章节与要点库章节顺序一致）
+        self.required_chapter_keywords: Dict[str, frozenset] = FrozenDict(
+            (title, frozenset(kw for kw in COMPLETENESS_KEYWORDS if kw in title))
+            for title in self.required_chapters
+        )
+        self.required_chapter_library_keys: Dict[str, str] = FrozenDict(
+            zip(self.required_chapters, [key for key in self.review_points if key != "文档完整性"])
+        )
+        
+        requirements = {}
+        required_items = []
+        for key, points in self.review_points.items():
+            entries = []
+            for point_name, point_config in points.items():
+                if not isinstance(point_config, dict):
+                    continue
+                items = point_config.get("必含内容", ())
+                severity = point_config.get("严重程度", "一般")
+                entries.append((point_name, items, severity, point_config.get("审核重点", "")))
+                required_items.extend((key, point_name, item, severity) for item in items)
+            requirements[key] = tuple(entries)
+        self.chapter_requirements: Dict[str, Tuple] = FrozenDict(requirements)
+        self.required_items: Tuple[Tuple[str, str, str, str], ...] = tuple(required_items)
+        self.required_content_items: Tuple[str, ...] = tuple(sorted({item[2] for item in required_items}))
+        
+        # 关键词 -> 含该关键词的要点库章节（按要点库顺序）
+        keyword_index: Dict[str, list] = {}
+        for key in self.review_points:
+            for keyword in CHAPTER_NAME_KEYWORDS.get(key, ()):
+                keyword_index.setdefault(keyword, []).append(key)
+        self.chapter_keyword_index: Dict[str, Tuple[str, ...]] = FrozenDict(
+            (keyword, tuple(keys)) for keyword, keys in keyword_index.items()
+        )
+        self._key_order = {key: index for index, key in enumerate(self.review_points)}
     
     def _get_document_completeness_points(self):
         """文档完整性审核要点"""
@@ -595,6 +718,59 @@ class ReviewPointLibrary:
         """根据章节名称获取审核要点"""
         return self.review_points.get(chapter_name, {})
     
+    def match_chapter_name(self, chapter_name: str, library_key: str) -> bool:
+        """章节名称是否包含要点库章节的全部关键词"""
+        keywords = CHAPTER_NAME_KEYWORDS.get(library_key)
+        if not keywords:
+            return False
+        return all(kw in chapter_name for kw in keywords)
+    
+    def find_chapter_key(self, chapter_name: str) -> Optional[str]:
+        """
+        查找章节名称对应的要点库章节
+        
+        名称与要点库章节相同时直接返回；否则按关键词索引只检查包含命中关键词的章节，
+        返回要点库顺序中第一个全部关键词都命中的章节。结果按章节名称缓存。
+        """
+        if chapter_name in self.review_points:
+            return chapter_name
+        
+        with self._chapter_key_lock:
+            if chapter_name in self._chapter_key_cache:
+                self._chapter_key_cache.move_to_end(chapter_name)
+                return self._chapter_key_cache[chapter_name]
+        
+        candidates = set()
+        for keyword, keys in self.chapter_keyword_index.items():
+            if keyword in chapter_name:
+                candidates.update(keys)
+        found = None
+        for key in sorted(candidates, key=self._key_order.get):
+            if self.match_chapter_name(chapter_name, key):
+                found = key
+                break
+        
+        with self._chapter_key_lock:
+            self._chapter_key_cache[chapter_name] = found
+            if len(self._chapter_key_cache) > 4096:
+                self._chapter_key_cache.popitem(last=False)
+        return found
+    
+    def match_required_chapter(self, required: str, actual: str) -> bool:
+        """
+        必含章节与实际章节标题是否匹配
+        
+        两者都有数字编号时比较编号，否则检查是否包含同一个完整性关键词。
+        """
+        required_number = chapter_number(required)
+        actual_number = chapter_number(actual)
+        if required_number and actual_number:
+            return required_number == actual_number
+        required_keywords = self.required_chapter_keywords.get(required)
+        if required_keywords is None:
+            required_keywords = [kw for kw in COMPLETENESS_KEYWORDS if kw in required]
+        return any(kw in actual for kw in required_keywords)
+    
     def get_all_review_points(self):
         """获取所有审核要点"""
         return self.review_points
@@ -606,3 +782,17 @@ class ReviewPointLibrary:
             "一般": "建议整改，影响施工质量或安全",
             "建议": "优化建议，提升方案质量"
         }
+
+
+_library: Optional[ReviewPointLibrary] = None
+_library_lock = threading.Lock()
+
+
+def get_review_point_library() -> ReviewPointLibrary:
+    """获取进程内共享的审核要点库（只构建一次）"""
+    global _library
+    if _library is None:
+        with _library_lock:
+            if _library is None:
+                _library = ReviewPointLibrary()
+    return _library
@@ -3,7 +3,7 @@
 数据库模型定义
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, JSON, Boolean, ForeignKey
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, Text, DateTime, JSON, Boolean, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -37,6 +37,7 @@ class Document(Base):
     file_path = Column(String(500), comment="存储路径")
     file_type = Column(String(50), comment="文件类型")
     file_size = Column(Integer, comment="文件大小（字节）")
+    file_hash = Column(String(64), index=True, comment="文件SHA-256")
     parse_status = Column(String(50), default="待解析", comment="解析状态")
     content = Column(JSON, comment="解析后的内容")
     chapters = Column(JSON, comment="章节结构")
@@ -80,6 +81,7 @@ class ReviewStandard(Base):
     file_name = Column(String(200), comment="文件名")
     file_path = Column(String(500), comment="文件存储路径")
     file_type = Column(String(50), comment="文件类型")
+    file_hash = Column(String(64), index=True, comment="文件SHA-256")
     content = Column(Text, comment="规范内容")
     parsed_content = Column(JSON, comment="解析后的内容")
     status = Column(String(50), default="待处理", comment="处理状态")
@@ -107,9 +109,17 @@ class ReviewRule(Base):
     is_active = Column(Boolean, default=True, comment="是否启用")
     is_ai_generated = Column(Boolean, default=False, comment="是否AI生成")
     ai_model = Column(String(100), comment="使用的AI模型")
+    source_key = Column(String(100), index=True, comment="导入来源记录键（如隐患数据库中的行标识）")
+    source_hash = Column(String(64), comment="导入来源记录内容哈希（用于增量更新）")
+    rule_fingerprint = Column(String(64), comment="规则指纹（AI生成规则去重，见rule_store.rule_fingerprint）")
     create_time = Column(DateTime, default=datetime.now, comment="创建时间")
     update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
+    # 同一规范下指纹唯一（指纹为空的人工规则、导入规则不受限制）
+    __table_args__ = (
+        Index("ux_review_rules_standard_fingerprint", "standard_id", "rule_fingerprint", unique=True),
+    )
+    
     # 关联关系
     standard = relationship("ReviewStandard", back_populates="rules")
 
@@ -124,10 +134,46 @@ class KnowledgeBase(Base):
     content = Column(Text, comment="内容")
     embedding = Column(JSON, comment="向量表示")
     source = Column(String(200), comment="来源")
+    source_key = Column(String(100), index=True, comment="导入来源记录键")
+    source_hash = Column(String(64), comment="导入来源记录内容哈希（用于增量更新）")
+    create_time = Column(DateTime, default=datetime.now, comment="创建时间")
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
+
+
+class Blob(Base):
+    """文件存储表（按内容哈希去重，多个文档/规范共享同一文件）"""
+    __tablename__ = "blobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    blob_key = Column(String(80), unique=True, nullable=False, index=True, comment="存储键（SHA-256+扩展名）")
+    sha256 = Column(String(64), nullable=False, index=True, comment="文件SHA-256")
+    file_path = Column(String(500), comment="存储路径")
+    file_size = Column(Integer, comment="文件大小（字节）")
+    ref_count = Column(Integer, default=0, comment="引用计数")
     create_time = Column(DateTime, default=datetime.now, comment="创建时间")
     update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
 
 
+class Job(Base):
+    """后台任务表"""
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False, index=True, comment="任务类型（parse/review/generate_rules）")
+    status = Column(String(50), default="排队中", index=True, comment="任务状态（排队中/运行中/已完成/失败/已取消）")
+    params = Column(JSON, comment="任务参数")
+    result = Column(JSON, comment="任务结果")
+    error = Column(Text, comment="错误信息")
+    progress = Column(Integer, default=0, comment="进度（0-100）")
+    cancel_requested = Column(Boolean, default=False, comment="是否已请求取消")
+    worker = Column(String(200), comment="执行该任务的工作进程（主机名:进程号）")
+    attempts = Column(Integer, default=0, comment="已执行次数")
+    create_time = Column(DateTime, default=datetime.now, comment="创建时间")
+    start_time = Column(DateTime, comment="开始时间")
+    finish_time = Column(DateTime, comment="结束时间")
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
+
+
 # 数据库配置
 import os
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/review_system.db")
@@ -158,10 +204,42 @@ def get_db():
         raise
 
 
+def _ensure_columns():
+    """
+    为已存在的表补充新增的列
+
+    create_all只创建缺失的表，不会修改已有表结构；
+    这里对模型中新增、且数据库中缺失的可空列执行ALTER TABLE ADD COLUMN（不回填数据）。
+    模型中新增的表级索引同样补建。
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                if column.index:
+                    conn.execute(text(
+                        f'CREATE INDEX IF NOT EXISTS ix_{table.name}_{column.name} ON {table.name} ({column.name})'
+                    ))
+            # 表级索引（如联合唯一索引）
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn, checkfirst=True)
+
+
 def init_db():
     """初始化数据库"""
     try:
         Base.metadata.create_all(bind=engine)
+        _ensure_columns()
     except Exception as e:
         # 在Vercel等无服务器环境中，SQLite可能无法写入
         # 如果使用PostgreSQL，需要配置DATABASE_URL环境变量
@@ -6,9 +6,51 @@ AI规则生成服务
 
 import json
 import re
-from typing import List, Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional
 import os
 
+from config.config import LLM_CLIENT_CONFIG, RULE_GENERATION_CONFIG
+from app.services.llm.client import LLMClient
+from app.services.llm.common import iter_json_objects
+from app.services.llm.response_cache import get_llm_response_cache
+from app.services.rule_engine.rule_store import normalized_required_content, rule_fingerprint
+from app.services.standard_splitter import split_standard
+
+# 严重程度排序（合并重复规则时保留更严重的）
+_SEVERITY_RANK = {"建议": 0, "一般": 1, "严重": 2}
+
+
+def deduplicate_rules(rules: List[Dict]) -> List[Dict]:
+    """
+    合并重复规则（保持首次出现的顺序）
+
+    指纹相同的规则视为重复；类型相同且必含内容集合相同（非空）的规则视为近似重复，
+    只是名称、描述的措辞不同。合并时保留更严重的严重程度，空字段由后出现的规则补齐。
+    """
+    merged: List[Dict] = []
+    by_key: Dict[tuple, Dict] = {}
+    for rule in rules:
+        required = tuple(normalized_required_content(rule))
+        keys = [("fingerprint", rule_fingerprint(rule))]
+        if required:
+            keys.append(("content", str(rule.get("rule_type") or "").strip(), required))
+        existing = next((by_key[key] for key in keys if key in by_key), None)
+        if existing is None:
+            existing = dict(rule)
+            merged.append(existing)
+        else:
+            if _SEVERITY_RANK.get(rule.get("severity"), 1) > _SEVERITY_RANK.get(existing.get("severity"), 1):
+                existing["severity"] = rule["severity"]
+            for field, value in rule.items():
+                if value and not existing.get(field):
+                    existing[field] = value
+        for key in keys:
+            by_key.setdefault(key, existing)
+    return merged
+
 
 class AIRuleGenerator:
     """AI规则生成器"""
@@ -63,6 +105,10 @@ class AIRuleGenerator:
         self.model_name = model_name
         self.model_config = self.MODEL_CONFIGS.get(model_name, self.MODEL_CONFIGS["deepseek-chat"])
         self.api_key = api_key or os.getenv("LLM_API_KEY", "")
+        # 最近一次生成的响应缓存命中情况与分块情况（供API返回）
+        self.cache_info: Optional[Dict] = None
+        self.generation_info: Optional[Dict] = None
+        self._stats_lock = threading.Lock()
     
     def generate_rules_from_standard(self, standard_content: str, category: str = "") -> List[Dict]:
         """
@@ -80,21 +126,90 @@ class AIRuleGenerator:
             return self._generate_rules_without_ai(standard_content, category)
         
         try:
-            # 构建提示词
-            prompt = self._build_prompt(standard_content, category)
-            
-            # 调用AI模型
-            response = self._call_llm(prompt)
-            
-            # 解析响应
-            rules = self._parse_ai_response(response)
-            
-            return rules
+            return self._generate_rules_chunked(standard_content, category)
         except Exception as e:
             print(f"AI生成规则失败: {str(e)}")
             # 降级到非AI生成
             return self._generate_rules_without_ai(standard_content, category)
     
+    def _generate_rules_chunked(self, standard_content: str, category: str) -> List[Dict]:
+        """
+        分块生成规则（map-reduce）
+        
+        按章、条边界把规范切成不超过RULE_GENERATION_CONFIG["chunk_tokens"]的片段，
+        各片段的提示词以不超过max_concurrency的并发数同时请求模型，结果按片段顺序合并后去重。
+        个别片段失败时跳过该片段，全部失败才抛出异常。
+        """
+        chunks = split_standard(standard_content, RULE_GENERATION_CONFIG["chunk_tokens"]) or [standard_content]
+        self.cache_info = None
+        
+        def generate(chunk: str) -> List[Dict]:
+            return list(self.iter_rules_from_standard(chunk, category))
+        
+        if len(chunks) == 1:
+            results = [generate(chunks[0])]
+        else:
+            workers = max(1, min(RULE_GENERATION_CONFIG["max_concurrency"], len(chunks)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(generate, chunk) for chunk in chunks]
+            results = []
+            last_error = None
+            for index, future in enumerate(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    last_error = e
+                    print(f"规范第{index + 1}/{len(chunks)}个片段生成规则失败: {str(e)}")
+            if not results:
+                raise last_error
+        
+        rules = [rule for chunk_rules in results for rule in chunk_rules]
+        merged = deduplicate_rules(rules)
+        self.generation_info = {
+            "chunks": len(chunks),
+            "failed_chunks": len(chunks) - len(results),
+            "rules_before_dedup": len(rules),
+            "rules": len(merged)
+        }
+        return merged
+    
+    def iter_rules_from_standard(self, standard_content: str, category: str = "") -> Iterator[Dict]:
+        """
+        流式生成审核规则：模型每输出完一条规则即解析产出，不等待整个回复
+        
+        逐条解析不到规则时（如回复格式不规范）按完整回复再解析一次。
+        整篇内容放在一个提示词中，长规范请使用generate_rules_from_standard分块生成。
+        
+        Raises:
+            LLMError: 模型调用失败
+        """
+        # 构建提示词
+        prompt = self._build_prompt(standard_content, category)
+        
+        # 调用AI模型，边接收边解析
+        chunks: List[str] = []
+        call: Dict = {}
+        
+        def received():
+            for text in self._stream_llm(prompt, call):
+                chunks.append(text)
+                yield text
+        
+        count = 0
+        for rule in iter_json_objects(received()):
+            if "rule_name" in rule or "required_content" in rule:
+                count += 1
+                yield self._normalize_rule(rule)
+        if count:
+            return
+        
+        # 解析完整响应
+        rules = self._parse_ai_response("".join(chunks))
+        if not rules:
+            # 无法解析的回复不再复用
+            self._forget_cached_response(call.get("cache_key"))
+        yield from rules
+    
     def _build_prompt(self, content: str, category: str) -> str:
         """构建AI提示词"""
         prompt = f"""你是一个专业的审核规则生成专家。请根据以下审核规范内容，拆解生成具体的审核规则。
@@ -129,45 +244,67 @@ class AIRuleGenerator:
         return prompt
     
     def _call_llm(self, prompt: str) -> str:
-        """调用大语言模型"""
-        import requests
+        """调用大语言模型，返回完整回复"""
+        return "".join(self._stream_llm(prompt))
+    
+    def _stream_llm(self, prompt: str, call: Optional[Dict] = None) -> Iterator[str]:
+        """
+        调用大语言模型，逐段产出回复文本
+        
+        相同模型、参数与提示词的回复从响应缓存读取；未命中时通过共享连接池的客户端请求
+        （LLM_CLIENT_CONFIG["stream"]为真时流式接收），接收完毕后写入缓存。
         
+        Args:
+            prompt: 提示词
+            call: 可选，写入本次调用的缓存键（cache_key），多个片段并行调用时各用各的
+        """
         model_config = self.model_config
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
+        messages = [
+            {"role": "system", "content": "你是一个专业的审核规则生成专家。"},
+            {"role": "user", "content": prompt}
+        ]
+        call = call if call is not None else {}
         
-        if model_config["provider"] == "deepseek":
-            url = f"{model_config['api_base']}/chat/completions"
-            data = {
-                "model": model_config["model"],
-                "messages": [
-                    {"role": "system", "content": "你是一个专业的审核规则生成专家。"},
-                    {"role": "user", "content": prompt}
-                ],
-                "max_tokens": model_config["max_tokens"],
-                "temperature": 0.3
-            }
-        elif model_config["provider"] == "openai":
-            url = f"{model_config['api_base']}/chat/completions"
-            data = {
-                "model": model_config["model"],
-                "messages": [
-                    {"role": "system", "content": "你是一个专业的审核规则生成专家。"},
-                    {"role": "user", "content": prompt}
-                ],
-                "max_tokens": model_config["max_tokens"],
-                "temperature": 0.3
-            }
-        else:
-            raise ValueError(f"不支持的模型提供商: {model_config['provider']}")
+        cache = get_llm_response_cache()
+        if cache is not None:
+            call["cache_key"] = cache.make_key(model_config["provider"], model_config["model"], messages,
+                                               0.3, model_config["max_tokens"])
+            started = time.perf_counter()
+            cached = cache.get(call["cache_key"])
+            if cached is not None:
+                self._record_cache_lookup(True, (time.perf_counter() - started) * 1000)
+                yield cached
+                return
+            self._record_cache_lookup(False)
         
-        response = requests.post(url, headers=headers, json=data, timeout=60)
-        response.raise_for_status()
+        client = LLMClient.from_model_config(model_config, self.api_key)
+        if LLM_CLIENT_CONFIG["stream"]:
+            chunks = []
+            for text in client.stream_chat(messages, temperature=0.3):
+                chunks.append(text)
+                yield text
+            response = "".join(chunks)
+        else:
+            response = client.chat(messages, temperature=0.3)
+            yield response
         
-        result = response.json()
-        return result["choices"][0]["message"]["content"]
+        if cache is not None:
+            cache.put(call["cache_key"], model_config["provider"], model_config["model"], response)
+    
+    def _record_cache_lookup(self, hit: bool, lookup_ms: float = 0.0):
+        """累计缓存命中情况（并行片段共用，加锁）"""
+        with self._stats_lock:
+            info = self.cache_info or {"hit": True, "hits": 0, "misses": 0, "lookup_ms": 0.0}
+            info["hits" if hit else "misses"] += 1
+            info["hit"] = info["misses"] == 0
+            info["lookup_ms"] = round(info["lookup_ms"] + lookup_ms, 3)
+            self.cache_info = info
+    
+    def _forget_cached_response(self, cache_key: Optional[str]):
+        """删除指定调用的缓存回复"""
+        cache = get_llm_response_cache()
+        if cache is not None and cache_key:
+            cache.delete(cache_key)
     
     def _parse_ai_response(self, response: str) -> List[Dict]:
         """解析AI响应"""
@@ -193,23 +330,23 @@ class AIRuleGenerator:
             rules = json.loads(json_str)
             
             # 验证和规范化规则
-            normalized_rules = []
-            for rule in rules:
-                normalized_rule = {
-                    "rule_name": rule.get("rule_name", "未命名规则"),
-                    "rule_type": rule.get("rule_type", "内容检查"),
-                    "required_content": rule.get("required_content", []),
-                    "review_focus": rule.get("review_focus", ""),
-                    "severity": rule.get("severity", "一般"),
-                    "rule_pattern": rule.get("rule_pattern", "")
-                }
-                normalized_rules.append(normalized_rule)
-            
-            return normalized_rules
+            return [self._normalize_rule(rule) for rule in rules]
         except Exception as e:
             print(f"解析AI响应失败: {str(e)}")
             return []
     
+    @staticmethod
+    def _normalize_rule(rule: Dict) -> Dict:
+        """规范化规则字段"""
+        return {
+            "rule_name": rule.get("rule_name", "未命名规则"),
+            "rule_type": rule.get("rule_type", "内容检查"),
+            "required_content": rule.get("required_content", []),
+            "review_focus": rule.get("review_focus", ""),
+            "severity": rule.get("severity", "一般"),
+            "rule_pattern": rule.get("rule_pattern", "")
+        }
+    
     def _generate_rules_without_ai(self, content: str, category: str) -> List[Dict]:
         """不使用AI的规则生成（基于关键词和模板）"""
         rules = []
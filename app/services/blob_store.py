@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+内容寻址文件存储模块
+上传文件按SHA-256存储，内容相同的文件只保存一份，通过引用计数在无人引用时清理
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import UploadFile
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.models.database import Blob
+from app.utils.upload import hash_upload_file, save_upload_file
+
+
+class StoredBlob:
+    """一次存储的结果"""
+
+    def __init__(self, blob_key: str, sha256: str, size: int, path: Path, deduplicated: bool):
+        self.blob_key = blob_key
+        self.sha256 = sha256
+        self.size = size
+        self.path = path
+        self.deduplicated = deduplicated  # 是否复用了已有文件（未写入磁盘）
+
+
+class BlobStore:
+    """
+    内容寻址文件存储
+
+    文件保存在 root/哈希前两位/哈希+扩展名，保留扩展名以便解析器按类型识别。
+    存储键为"哈希+扩展名"，blobs表记录引用计数；文档与规范的file_path直接指向共享文件。
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path_for(self, blob_key: str) -> Path:
+        """存储键对应的文件路径"""
+        return self.root / blob_key[:2] / blob_key
+
+    def owns(self, file_path: str) -> bool:
+        """文件是否由本存储管理（旧版本按项目保存的文件不在此列）"""
+        path = Path(file_path)
+        try:
+            return path.resolve().parent.parent == self.root.resolve() and path.name[:2] == path.parent.name
+        except OSError:
+            return False
+
+    async def store_upload(self, db: Session, upload: UploadFile, suffix: str,
+                           max_size: Optional[int] = None) -> StoredBlob:
+        """
+        保存上传文件并增加引用计数
+
+        先只读计算哈希并增加引用计数：相同内容的文件已存在时不产生任何写入；
+        否则（包括文件刚被并发的release删除）再写入临时文件并原子重命名到存储路径。
+        """
+        size, sha256 = await hash_upload_file(upload, max_size)
+        blob_key = f"{sha256}{suffix.lower()}"
+        path = self.path_for(blob_key)
+
+        if self.acquire(db, blob_key, sha256, size, path):
+            return StoredBlob(blob_key, sha256, size, path, deduplicated=True)
+
+        try:
+            await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+            saved = await save_upload_file(upload, path, max_size)
+            if saved.sha256 != sha256:
+                raise ValueError("上传内容在保存过程中发生变化")
+        except BaseException:
+            self.release(db, str(path))
+            raise
+        return StoredBlob(blob_key, sha256, size, path, deduplicated=False)
+
+    def acquire(self, db: Session, blob_key: str, sha256: str, size: int, path: Path) -> bool:
+        """
+        增加引用计数（记录不存在时创建）
+
+        Returns:
+            取得引用后文件是否存在；不存在时（新文件，或并发的release刚删除了文件）调用方须重新写入
+        """
+        if not self._increment(db, blob_key):
+            db.add(Blob(blob_key=blob_key, sha256=sha256, file_path=str(path), file_size=size, ref_count=1))
+            try:
+                db.commit()
+            except IntegrityError:
+                # 并发上传同一文件：记录已由其他请求创建
+                db.rollback()
+                self._increment(db, blob_key)
+                db.commit()
+        else:
+            db.commit()
+        # release在提交删除记录之前删除文件，此处取得引用之后检查，不会误用即将被删除的文件
+        return path.exists()
+
+    @staticmethod
+    def _increment(db: Session, blob_key: str) -> int:
+        return db.query(Blob).filter(Blob.blob_key == blob_key).update(
+            {Blob.ref_count: Blob.ref_count + 1}, synchronize_session=False
+        )
+
+    def release(self, db: Session, file_path: Optional[str]) -> bool:
+        """
+        减少引用计数，计数归零时删除记录与文件
+
+        只有条件删除（ref_count归零）删除了记录时才删除文件，且在提交之前删除：
+        提交前并发的acquire等待本事务的写锁，提交后acquire重新创建记录并发现文件不存在，由调用方重新写入。
+
+        Returns:
+            是否删除了文件
+        """
+        if not file_path or not self.owns(file_path):
+            return False
+
+        blob_key = Path(file_path).name
+        db.query(Blob).filter(Blob.blob_key == blob_key).update(
+            {Blob.ref_count: Blob.ref_count - 1}, synchronize_session=False
+        )
+        deleted = db.query(Blob).filter(Blob.blob_key == blob_key, Blob.ref_count <= 0).delete(
+            synchronize_session=False
+        )
+        if deleted:
+            try:
+                self.path_for(blob_key).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"删除存储文件失败: {blob_key}: {str(e)}")
+        db.commit()
+        return bool(deleted)
+
+    def get_stats(self, db: Session) -> Dict:
+        """获取存储统计信息"""
+        blobs, stored_bytes, references, referenced_bytes = db.query(
+            func.count(Blob.id),
+            func.coalesce(func.sum(Blob.file_size), 0),
+            func.coalesce(func.sum(Blob.ref_count), 0),
+            func.coalesce(func.sum(Blob.file_size * Blob.ref_count), 0)
+        ).one()
+        return {
+            "blobs": blobs,
+            "references": references,
+            "stored_bytes": stored_bytes,
+            "referenced_bytes": referenced_bytes,
+            "saved_bytes": referenced_bytes - stored_bytes
+        }
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+OOXML流式读取模块
+直接增量解析docx压缩包中的word/document.xml，不构建python-docx对象树
+"""
+
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# WordprocessingML命名空间
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_P = W_NS + "p"
+_R = W_NS + "r"
+_T = W_NS + "t"
+_TAB = W_NS + "tab"
+_BR = W_NS + "br"
+_CR = W_NS + "cr"
+_PTAB = W_NS + "ptab"
+_NO_BREAK_HYPHEN = W_NS + "noBreakHyphen"
+_HYPERLINK = W_NS + "hyperlink"
+_TBL = W_NS + "tbl"
+_TBL_GRID = W_NS + "tblGrid"
+_GRID_COL = W_NS + "gridCol"
+_TR = W_NS + "tr"
+_TR_PR = W_NS + "trPr"
+_GRID_BEFORE = W_NS + "gridBefore"
+_TC = W_NS + "tc"
+_TC_PR = W_NS + "tcPr"
+_GRID_SPAN = W_NS + "gridSpan"
+_V_MERGE = W_NS + "vMerge"
+_P_PR = W_NS + "pPr"
+_P_STYLE = W_NS + "pStyle"
+_STYLE = W_NS + "style"
+_NAME = W_NS + "name"
+_OUTLINE_LVL = W_NS + "outlineLvl"
+_VAL = W_NS + "val"
+_TYPE = W_NS + "type"
+_STYLE_ID = W_NS + "styleId"
+
+# 标题样式名称：heading 1 / 标题 1 / Title
+_HEADING_NAME_RE = re.compile(r'^(?:heading|标题)\s*(\d)$', re.IGNORECASE)
+
+# 流式读取时每次送入解析器的字节数
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+def _run_text(run: ET.Element) -> str:
+    """提取run文本（与python-docx的Run.text规则一致）"""
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == _T:
+            parts.append(child.text or "")
+        elif tag == _TAB or tag == _PTAB:
+            parts.append("\t")
+        elif tag == _BR:
+            br_type = child.get(_TYPE)
+            parts.append("\n" if br_type is None or br_type == "textWrapping" else "")
+        elif tag == _CR:
+            parts.append("\n")
+        elif tag == _NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def _paragraph_text(paragraph: ET.Element) -> str:
+    """提取段落文本（包含超链接中的文字）"""
+    parts = []
+    for child in paragraph:
+        if child.tag == _R:
+            parts.append(_run_text(child))
+        elif child.tag == _HYPERLINK:
+            for run in child.findall(_R):
+                parts.append(_run_text(run))
+    return "".join(parts)
+
+
+def _paragraph_style(paragraph: ET.Element) -> Optional[str]:
+    """获取段落样式ID"""
+    p_pr = paragraph.find(_P_PR)
+    if p_pr is None:
+        return None
+    p_style = p_pr.find(_P_STYLE)
+    if p_style is None:
+        return None
+    return p_style.get(_VAL)
+
+
+def _int_val(element: Optional[ET.Element], default: int) -> int:
+    if element is None:
+        return default
+    value = element.get(_VAL, "")
+    return int(value) if value.isdigit() else default
+
+
+def _table_rows(table: ET.Element) -> List[List[str]]:
+    """
+    提取表格行数据
+
+    按网格列定位单元格：横向合并的单元格按gridSpan重复，
+    纵向合并的后续单元格引用上一行同一网格列的文本；
+    行首gridBefore、行尾gridAfter省略的网格列为空字符串，每行补齐为网格列数。
+    """
+    grid = table.find(_TBL_GRID)
+    col_count = len(grid.findall(_GRID_COL)) if grid is not None else 0
+
+    rows: List[List[str]] = []
+    above: List[str] = []
+    for tr in table.findall(_TR):
+        tr_pr = tr.find(_TR_PR)
+        grid_before = _int_val(tr_pr.find(_GRID_BEFORE) if tr_pr is not None else None, 0)
+        row = [""] * grid_before
+        for tc in tr.findall(_TC):
+            grid_span = 1
+            v_merge = None
+            tc_pr = tc.find(_TC_PR)
+            if tc_pr is not None:
+                grid_span = max(1, _int_val(tc_pr.find(_GRID_SPAN), 1))
+                merge = tc_pr.find(_V_MERGE)
+                if merge is not None:
+                    v_merge = merge.get(_VAL, "continue")
+            text = "\n".join(_paragraph_text(p) for p in tc.findall(_P)).strip()
+            for _ in range(grid_span):
+                column = len(row)
+                if v_merge == "continue" and column < len(above):
+                    row.append(above[column])
+                else:
+                    row.append(text)
+        if col_count:
+            row = row[:col_count] + [""] * (col_count - len(row))
+        rows.append(row)
+        above = row
+
+    return rows
+
+
+def read_heading_styles(docx_zip: zipfile.ZipFile) -> Dict[str, int]:
+    """
+    读取word/styles.xml，返回 样式ID -> 标题级别 的映射
+
+    级别取自样式名称（heading N / 标题 N）或样式中的大纲级别（outlineLvl + 1）。
+    """
+    headings: Dict[str, int] = {}
+    try:
+        styles_file = docx_zip.open("word/styles.xml")
+    except KeyError:
+        return headings
+
+    with styles_file:
+        for _, elem in ET.iterparse(styles_file):
+            if elem.tag != _STYLE:
+                continue
+            style_id = elem.get(_STYLE_ID)
+            level = None
+            name = elem.find(_NAME)
+            if name is not None:
+                match = _HEADING_NAME_RE.match((name.get(_VAL) or "").strip())
+                if match:
+                    level = int(match.group(1))
+                elif (name.get(_VAL) or "").lower() == "title":
+                    level = 0
+            if level is None:
+                p_pr = elem.find(_P_PR)
+                outline = p_pr.find(_OUTLINE_LVL) if p_pr is not None else None
+                if outline is not None and outline.get(_VAL, "").isdigit():
+                    level = int(outline.get(_VAL)) + 1
+            if style_id and level is not None:
+                headings[style_id] = level
+            elem.clear()
+    return headings
+
+
+def iter_docx_blocks(file_path: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    流式遍历docx正文块
+
+    按文档顺序产出 ("paragraph", {...}) 与 ("table", {...})：
+    - paragraph: {"text": 段落文本, "style": 样式ID, "heading_level": 标题级别或None}
+    - table: {"rows": 行数据列表}
+
+    只保留当前正在处理的正文块，已处理的元素会立即从树中移除，
+    内存占用与单个段落/表格大小相关，而与文档总大小无关。
+    """
+    with zipfile.ZipFile(file_path) as docx_zip:
+        heading_styles = read_heading_styles(docx_zip)
+
+        with docx_zip.open("word/document.xml") as document_xml:
+            parser = ET.XMLPullParser(events=("start", "end"))
+            depth = 0
+            body = None
+
+            while True:
+                chunk = document_xml.read(_READ_CHUNK_SIZE)
+                if chunk:
+                    parser.feed(chunk)
+                else:
+                    parser.close()
+
+                for event, elem in parser.read_events():
+                    if event == "start":
+                        depth += 1
+                        if depth == 2:
+                            body = elem
+                        continue
+
+                    depth -= 1
+                    # 只处理body的直接子元素（与python-docx的doc.paragraphs/doc.tables一致）
+                    if depth != 2:
+                        continue
+
+                    if elem.tag == _P:
+                        style = _paragraph_style(elem)
+                        yield "paragraph", {
+                            "text": _paragraph_text(elem),
+                            "style": style,
+                            "heading_level": heading_styles.get(style) if style else None
+                        }
+                    elif elem.tag == _TBL:
+                        yield "table", {"rows": _table_rows(elem)}
+
+                    # 释放已处理的元素
+                    elem.clear()
+                    if body is not None:
+                        body.remove(elem)
+
+                if not chunk:
+                    break
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+章节大纲识别模块
+单次扫描全文识别章、节标题，记录字符偏移、行号范围和编号
+"""
+
+import re
+from typing import Dict, List, Optional
+
+_CN_NUM = "[一二三四五六七八九十]+"
+# 标题文字：以非空白字符开头和结尾（等价于对整行strip后再匹配）
+_TITLE = r"\S(?:[^\n]*\S)?"
+# 行内空白（不跨行）
+_WS = r"[^\S\n]"
+
+# 章节标题模式（按优先级排列，与逐行匹配时的先后顺序一致）：
+#   第一章 标题 / 第一节 标题 / 1. 标题、1、标题 / 1.1 标题 / （一）标题
+_HEADING_RE = re.compile(
+    rf"^{_WS}*(?:"
+    rf"(?P<n1>第{_CN_NUM}章){_WS}+(?P<t1>{_TITLE})"
+    rf"|(?P<n2>第{_CN_NUM}节){_WS}+(?P<t2>{_TITLE})"
+    rf"|(?P<n3>\d+[\.、]){_WS}*(?P<t3>{_TITLE})"
+    rf"|(?P<n4>\d+\.\d+){_WS}+(?P<t4>{_TITLE})"
+    rf"|(?P<n5>（{_CN_NUM}）){_WS}*(?P<t5>{_TITLE})"
+    rf"){_WS}*$",
+    re.MULTILINE
+)
+
+# 以数字编号开头的标题（1. 1、 1.1）一律视为章
+_NUMBERED_KINDS = ("t3", "t4")
+
+# Markdown：# 为章、## 为节（更深的标题视为正文），围栏代码块内的行不识别为标题
+_MARKDOWN_HEADING_RE = re.compile(
+    rf"^{_WS}{{0,3}}(?:"
+    rf"(?P<fence>(?:```|~~~)[^\n]*)"
+    rf"|(?P<md>#{{1,2}}){_WS}+(?P<md_title>\S(?:[^\n]*?\S)?)(?:{_WS}+#+)?"
+    rf"){_WS}*$",
+    re.MULTILINE
+)
+# Markdown标题文字开头的编号
+_MARKDOWN_NUMBER_RE = re.compile(rf"^(?:第{_CN_NUM}[章节]|\d+(?:\.\d+)*[\.、]?|（{_CN_NUM}）)")
+
+
+class OutlineNode(dict):
+    """
+    章节节点
+
+    普通字典字段保存标题、级别、偏移等信息；content字段不实际存储，
+    访问时按 [start, end) 从原文惰性切片，序列化时也不会重复写入正文。
+    """
+
+    __slots__ = ("_text",)
+
+    def __init__(self, text: str, **fields):
+        super().__init__(**fields)
+        self._text = text
+
+    def __missing__(self, key):
+        if key == "content":
+            return self._text[self["start"]:self["end"]]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key == "content" and not dict.__contains__(self, key):
+            return self.__missing__(key)
+        return super().get(key, default)
+
+    def __reduce__(self):
+        return (_rebuild_outline_node, (self._text, dict(self)))
+
+
+def _rebuild_outline_node(text: str, fields: Dict) -> OutlineNode:
+    return OutlineNode(text, **fields)
+
+
+class OutlineTokenizer:
+    """
+    章节大纲识别器
+
+    使用预编译的组合正则对全文做一次扫描，不拆分行列表。
+    每个章/节节点包含：
+        title       标题文字
+        number      编号（如"第一章"、"1."、"（一）"）
+        level       1为章，2为节
+        line_number 标题所在行号（从1开始），与line_start相同
+        line_start / line_end  覆盖的行号范围（闭区间）
+        start / end 覆盖的字符偏移范围 [start, end)
+        sections    下属节列表（仅章）
+        content     惰性切片得到的正文（不随序列化存储）
+
+    markdown=True时按Markdown标题（# 章、## 节）识别，不再把有序列表等编号行当作标题。
+    """
+
+    def __init__(self, markdown: bool = False):
+        self.markdown = markdown
+
+    def tokenize(self, content: str) -> List[Dict]:
+        """识别章节结构"""
+        chapters: List[OutlineNode] = []
+        current_chapter: Optional[OutlineNode] = None
+        # 当前尚未确定结束位置的节点（上一个章和上一个节）
+        open_section: Optional[OutlineNode] = None
+
+        line_number = 1
+        scanned = 0
+        in_fence = False
+        pattern = _MARKDOWN_HEADING_RE if self.markdown else _HEADING_RE
+
+        for match in pattern.finditer(content):
+            kind = match.lastgroup
+            line_text = match.group(0)
+
+            if kind == "fence":
+                in_fence = not in_fence
+                continue
+            if kind == "md_title":
+                if in_fence:
+                    continue
+                level = len(match.group("md"))
+                if level == 2 and current_chapter is None:
+                    continue
+                title = match.group(kind)
+                number = _MARKDOWN_NUMBER_RE.match(title)
+                number = number.group(0) if number else ""
+            else:
+                if kind in _NUMBERED_KINDS or "章" in line_text:
+                    level = 1
+                elif "节" in line_text:
+                    if current_chapter is None:
+                        continue
+                    level = 2
+                else:
+                    continue
+                title = match.group(kind).strip()
+                number = match.group("n" + kind[1:])
+
+            start = match.start()
+            line_number += content.count("\n", scanned, start)
+            scanned = start
+
+            node = OutlineNode(
+                content,
+                title=title,
+                number=number,
+                level=level,
+                line_number=line_number,
+                line_start=line_number,
+                start=start
+            )
+
+            if open_section is not None:
+                self._close(open_section, content, start, line_number)
+                open_section = None
+
+            if level == 1:
+                if current_chapter is not None:
+                    self._close(current_chapter, content, start, line_number)
+                node["sections"] = []
+                chapters.append(node)
+                current_chapter = node
+            else:
+                current_chapter["sections"].append(node)
+                open_section = node
+
+        end = len(content)
+        last_line = line_number + content.count("\n", scanned, end)
+        if content.endswith("\n"):
+            last_line -= 1
+        if open_section is not None:
+            open_section["end"] = end
+            open_section["line_end"] = last_line
+        if current_chapter is not None:
+            current_chapter["end"] = end
+            current_chapter["line_end"] = last_line
+
+        return chapters
+
+    @staticmethod
+    def _close(node: OutlineNode, content: str, next_start: int, next_line: int):
+        """以下一个标题的位置结束节点（不含两者之间的换行符）"""
+        end = next_start
+        if end > node["start"] and content[end - 1] == "\n":
+            end -= 1
+        node["end"] = end
+        node["line_end"] = max(node["line_start"], next_line - 1)
+
+
+def extract_outline(content: str, markdown: bool = False) -> List[Dict]:
+    """识别章节结构"""
+    return OutlineTokenizer(markdown=markdown).tokenize(content)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+文档解析结果缓存模块
+以文件内容SHA-256 + 解析器版本为键，将解析结果压缩存储在本地磁盘
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from config.config import PARSE_CACHE_CONFIG, PARSER_CONFIG
+
+# 解析器版本号：解析结果结构发生变化时手动递增
+PARSER_VERSION = "1"
+
+# 影响解析结果的PARSER_CONFIG配置项（并行进程数等只影响耗时的配置不在此列）
+_RESULT_SETTINGS = ("docx_streaming", "text_encodings", "text_chunk_size_kb")
+
+# 计算文件哈希时每次读取的字节数
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+_CACHE_SUFFIX = ".json.gz"
+
+
+def compute_file_hash(file_path: str) -> str:
+    """分块计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _compute_parser_code_version() -> str:
+    """
+    计算解析器代码版本
+
+    由PARSER_VERSION、影响解析结果的解析配置与document_parser包内全部源码的哈希组成，
+    解析器代码或这些配置有任何改动时缓存键随之变化，旧缓存自动失效。
+    """
+    digest = hashlib.sha256(PARSER_VERSION.encode("utf-8"))
+    settings = {name: PARSER_CONFIG.get(name) for name in _RESULT_SETTINGS}
+    digest.update(json.dumps(settings, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    package_dir = Path(__file__).parent
+    for source_file in sorted(package_dir.glob("*.py")):
+        digest.update(source_file.name.encode("utf-8"))
+        digest.update(source_file.read_bytes())
+    return f"{PARSER_VERSION}-{digest.hexdigest()[:16]}"
+
+
+PARSER_CODE_VERSION = _compute_parser_code_version()
+
+
+class ParseCache:
+    """解析结果磁盘缓存（按总大小做LRU淘汰）"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[float] = None,
+                 version: str = PARSER_CODE_VERSION):
+        """
+        初始化解析缓存
+
+        Args:
+            cache_dir: 缓存目录，默认读取PARSE_CACHE_CONFIG["cache_dir"]
+            max_size_mb: 缓存总大小上限（MB），超出后淘汰最久未访问的条目
+            version: 解析器版本，参与缓存键计算
+        """
+        self.cache_dir = Path(cache_dir or PARSE_CACHE_CONFIG["cache_dir"])
+        if max_size_mb is None:
+            max_size_mb = PARSE_CACHE_CONFIG["max_size_mb"]
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.version = version
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._total_size = sum(path.stat().st_size for path in self._iter_entries())
+
+    def make_key(self, file_hash: str, file_ext: str) -> str:
+        """生成缓存键（文件哈希 + 扩展名 + 解析器版本）"""
+        raw_key = f"{file_hash}:{file_ext.lower()}:{self.version}"
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{_CACHE_SUFFIX}"
+
+    def _iter_entries(self):
+        return self.cache_dir.glob(f"*/*{_CACHE_SUFFIX}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """读取缓存，未命中返回None"""
+        path = self._entry_path(key)
+        try:
+            with gzip.open(path, 'rb') as f:
+                result = json.loads(f.read().decode("utf-8"))
+            # 更新访问时间，作为LRU淘汰依据
+            os.utime(path, None)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: Dict):
+        """写入缓存（先写临时文件再原子替换）"""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = gzip.compress(
+            json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode("utf-8"),
+            compresslevel=6
+        )
+
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        old_size = path.stat().st_size if path.exists() else 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.writes += 1
+            self._total_size += len(data) - old_size
+            if self._total_size > self.max_size_bytes:
+                self._evict()
+
+    def _evict(self):
+        """按访问时间从旧到新淘汰，直到总大小降到上限的90%以下（调用方持有锁）"""
+        entries = []
+        for path in self._iter_entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        self._total_size = sum(size for _, size, _ in entries)
+        target_size = self.max_size_bytes * 0.9
+        for _, size, path in entries:
+            if self._total_size <= target_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self._total_size -= size
+            self.evictions += 1
+
+    def get_or_parse(self, file_path: str, parse_func: Callable[[str], Dict],
+                     file_hash: Optional[str] = None) -> Tuple[Dict, bool]:
+        """
+        读取缓存或执行解析
+
+        Args:
+            file_path: 文件路径
+            parse_func: 未命中时调用的解析函数
+            file_hash: 已知的文件SHA-256（可省去重复计算）
+
+        Returns:
+            (解析结果, 是否命中缓存)
+        """
+        key = self.make_key(file_hash or compute_file_hash(file_path), Path(file_path).suffix)
+        cached = self.get(key)
+        if cached is not None:
+            return cached, True
+
+        result = parse_func(file_path)
+        try:
+            self.put(key, result)
+        except OSError as e:
+            # 缓存写入失败不影响解析结果
+            print(f"解析缓存写入失败: {str(e)}")
+        return result, False
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for path in self._iter_entries():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._total_size = 0
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "size_bytes": self._total_size,
+                "max_size_bytes": self.max_size_bytes
+            }
+
+
+_parse_cache: Optional[ParseCache] = None
+_parse_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """获取进程内共享的解析缓存实例"""
+    global _parse_cache
+    if _parse_cache is None:
+        with _parse_cache_lock:
+            if _parse_cache is None:
+                _parse_cache = ParseCache()
+    return _parse_cache
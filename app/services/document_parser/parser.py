@@ -1,75 +1,46 @@
 # -*- coding: utf-8 -*-
 """
 文档解析模块
-支持Word、PDF等格式的文档解析
+支持Word、PDF、Excel、纯文本等格式的文档解析
 """
 
+import multiprocessing
 import os
 import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from config.config import PARSER_CONFIG, PARSE_CACHE_CONFIG, EXECUTOR_CONFIG
+from app.services.document_parser.ooxml_stream import iter_docx_blocks
+from app.services.document_parser.xlsx_stream import iter_xlsx_rows, list_sheets
+from app.services.document_parser.text_stream import read_text_file, DEFAULT_ENCODINGS
+from app.services.document_parser.outline import OutlineTokenizer
+from app.services.document_parser.parse_cache import get_parse_cache
+
 
 class DocumentParser:
     """文档解析器基类"""
     
     def __init__(self):
         self.supported_formats = []
+        self.outline_tokenizer = OutlineTokenizer()
     
     def parse(self, file_path: str) -> Dict:
         """解析文档"""
         raise NotImplementedError
     
     def extract_chapters(self, content: str) -> List[Dict]:
-        """提取章节结构"""
-        # 匹配章节标题的正则表达式
-        # 支持：1. 标题、第一章 标题、1 标题 等格式
-        chapter_patterns = [
-            r'^第[一二三四五六七八九十]+章\s+(.+)$',
-            r'^第[一二三四五六七八九十]+节\s+(.+)$',
-            r'^\d+[\.、]\s*(.+)$',
-            r'^\d+\.\d+\s+(.+)$',
-            r'^（[一二三四五六七八九十]+）\s*(.+)$',
-        ]
+        """
+        提取章节结构
         
-        chapters = []
-        lines = content.split('\n')
-        current_chapter = None
-        current_section = None
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 检查是否是章节标题
-            for pattern in chapter_patterns:
-                match = re.match(pattern, line)
-                if match:
-                    title = match.group(1).strip()
-                    
-                    # 判断是章还是节
-                    if '章' in line or re.match(r'^\d+[\.、]', line):
-                        current_chapter = {
-                            "title": title,
-                            "level": 1,
-                            "line_number": i + 1,
-                            "sections": []
-                        }
-                        chapters.append(current_chapter)
-                        current_section = None
-                    elif '节' in line or re.match(r'^\d+\.\d+', line):
-                        if current_chapter:
-                            current_section = {
-                                "title": title,
-                                "level": 2,
-                                "line_number": i + 1,
-                                "content": []
-                            }
-                            current_chapter["sections"].append(current_section)
-                    break
-        
-        return chapters
+        支持：第一章 标题、第一节 标题、1. 标题、1.1 标题、（一）标题 等格式。
+        每个章/节记录起止字符偏移、行号范围和编号，content字段按偏移惰性切片。
+        """
+        return self.outline_tokenizer.tokenize(content)
     
     def extract_text_content(self, content: str) -> str:
         """提取纯文本内容"""
@@ -81,12 +52,24 @@ class DocumentParser:
 class WordParser(DocumentParser):
     """Word文档解析器"""
     
-    def __init__(self):
+    def __init__(self, streaming: Optional[bool] = None):
+        """
+        初始化Word文档解析器
+        
+        Args:
+            streaming: 是否使用流式解析，默认读取PARSER_CONFIG["docx_streaming"]
+        """
         super().__init__()
         self.supported_formats = ['.docx', '.doc']
+        if streaming is None:
+            streaming = PARSER_CONFIG.get("docx_streaming", False)
+        self.streaming = streaming
     
     def parse(self, file_path: str) -> Dict:
         """解析Word文档"""
+        if self.streaming:
+            return self.parse_streaming(file_path)
+        
         try:
             from docx import Document
             
@@ -123,40 +106,283 @@ class WordParser(DocumentParser):
             raise ImportError("请安装python-docx库: pip install python-docx")
         except Exception as e:
             raise Exception(f"Word文档解析失败: {str(e)}")
+    
+    def parse_streaming(self, file_path: str) -> Dict:
+        """
+        流式解析Word文档
+        
+        逐块读取word/document.xml，边解析边输出段落、标题样式和表格行，
+        返回结果与parse()一致，峰值内存不随文档体积增长。
+        """
+        try:
+            full_text = []
+            tables = []
+            paragraph_count = 0
+            
+            for block_type, block in iter_docx_blocks(file_path):
+                if block_type == "paragraph":
+                    paragraph_count += 1
+                    if block["text"].strip():
+                        full_text.append(block["text"])
+                else:
+                    tables.append(block["rows"])
+            
+            content = '\n'.join(full_text)
+            
+            # 提取章节结构
+            chapters = self.extract_chapters(content)
+            
+            return {
+                "content": content,
+                "chapters": chapters,
+                "tables": tables,
+                "paragraph_count": paragraph_count,
+                "table_count": len(tables)
+            }
+        except zipfile.BadZipFile:
+            raise Exception("Word文档解析失败: 文件不是有效的docx格式")
+        except Exception as e:
+            raise Exception(f"Word文档解析失败: {str(e)}")
+
+
+def _extract_pdf_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """提取PDF指定页码范围[start, end)的文本（并行解析时在工作进程中执行）"""
+    import PyPDF2
+    
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() for i in range(start, end)]
+
+
+# PDF并行解析进程池（按进程数缓存复用，避免每次解析都重新创建进程）
+_pdf_executors: Dict[int, ProcessPoolExecutor] = {}
+_pdf_executors_lock = threading.Lock()
+
+
+def _get_pdf_executor(workers: int) -> ProcessPoolExecutor:
+    """
+    获取PDF并行解析进程池
+
+    与计算进程池使用相同的启动方式（默认spawn）：服务进程中已有事件循环与任务线程，
+    fork出的子进程可能继承被其他线程持有的锁而死锁。
+    """
+    with _pdf_executors_lock:
+        executor = _pdf_executors.get(workers)
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(EXECUTOR_CONFIG.get("cpu_start_method", "spawn"))
+            )
+            _pdf_executors[workers] = executor
+        return executor
+
+
+def _discard_pdf_executor(workers: int, executor: ProcessPoolExecutor):
+    """移除已损坏的PDF并行解析进程池，下次解析时重新创建"""
+    with _pdf_executors_lock:
+        if _pdf_executors.get(workers) is executor:
+            del _pdf_executors[workers]
+    executor.shutdown(wait=False, cancel_futures=True)
 
 
 class PDFParser(DocumentParser):
     """PDF文档解析器"""
     
-    def __init__(self):
+    def __init__(self, workers: Optional[int] = None):
+        """
+        初始化PDF文档解析器
+        
+        Args:
+            workers: 并行解析进程数，默认读取PARSER_CONFIG["pdf_workers"]，0或1表示串行解析
+        """
         super().__init__()
         self.supported_formats = ['.pdf']
+        if workers is None:
+            # 已在计算进程池的子进程中解析时不再创建进程池（并行度由计算进程池提供）
+            workers = 0 if multiprocessing.parent_process() is not None else PARSER_CONFIG.get("pdf_workers", 0)
+        # 不超过CPU核数，避免与计算进程池叠加后过度占用
+        self.workers = min(workers, os.cpu_count() or 1)
+        self.min_parallel_pages = PARSER_CONFIG.get("pdf_parallel_min_pages", 0)
+        self.pages_per_task = max(1, PARSER_CONFIG.get("pdf_pages_per_task", 1))
     
     def parse(self, file_path: str) -> Dict:
         """解析PDF文档"""
         try:
             import PyPDF2
             
-            content = []
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    content.append(page.extract_text())
+                page_count = len(pdf_reader.pages)
+                
+                if self.workers > 1 and page_count >= max(self.min_parallel_pages, 2):
+                    content = self._extract_pages_parallel(file_path, page_count)
+                else:
+                    content = [page.extract_text() for page in pdf_reader.pages]
             
             full_text = '\n'.join(content)
             
+            # 记录每页在全文中的起始字符偏移
+            page_offsets = []
+            offset = 0
+            for page_text in content:
+                page_offsets.append(offset)
+                offset += len(page_text) + 1
+            
             # 提取章节结构
             chapters = self.extract_chapters(full_text)
             
             return {
                 "content": full_text,
                 "chapters": chapters,
-                "page_count": len(pdf_reader.pages)
+                "page_count": page_count,
+                "page_offsets": page_offsets
             }
         except ImportError:
             raise ImportError("请安装PyPDF2库: pip install PyPDF2")
         except Exception as e:
             raise Exception(f"PDF文档解析失败: {str(e)}")
+    
+    def _extract_pages_parallel(self, file_path: str, page_count: int) -> List[str]:
+        """
+        多进程并行提取页面文本
+        
+        将页码切分为连续区间分发到进程池，每个工作进程自行打开文件，
+        结果按页码顺序重新拼接。工作进程异常退出导致进程池损坏时，
+        换用新建的进程池重试一次。
+        """
+        # 区间数取进程数的整数倍，使耗时不均的页面在进程间更均衡
+        task_count = min(page_count, self.workers * 4)
+        pages_per_task = max(self.pages_per_task, -(-page_count // task_count))
+        ranges = [
+            (start, min(start + pages_per_task, page_count))
+            for start in range(0, page_count, pages_per_task)
+        ]
+        
+        for attempt in range(2):
+            executor = _get_pdf_executor(self.workers)
+            try:
+                futures = [
+                    executor.submit(_extract_pdf_page_range, file_path, start, end)
+                    for start, end in ranges
+                ]
+                content = []
+                for future in futures:
+                    content.extend(future.result())
+                return content
+            except BrokenProcessPool:
+                _discard_pdf_executor(self.workers, executor)
+                if attempt:
+                    raise
+
+
+class ExcelParser(DocumentParser):
+    """Excel文档解析器（流式只读）"""
+    
+    def __init__(self):
+        super().__init__()
+        self.supported_formats = ['.xlsx']
+    
+    def parse(self, file_path: str) -> Dict:
+        """
+        解析Excel文档
+        
+        逐行流式读取各工作表，每个工作表作为一个表格，正文每行对应表格一行；
+        与openpyxl一致，合并区域中只有左上角单元格有值。
+        """
+        try:
+            with zipfile.ZipFile(file_path) as xlsx_zip:
+                sheet_names = [name for name, _ in list_sheets(xlsx_zip)]
+            
+            full_text = []
+            tables = []
+            row_count = 0
+            
+            for index in range(len(sheet_names)):
+                table_data = []
+                for _, row in iter_xlsx_rows(file_path, sheet=index, fill_merged=False):
+                    table_data.append(row)
+                    full_text.append(self._row_text(row))
+                row_count += len(table_data)
+                tables.append(table_data)
+            
+            content = '\n'.join(full_text)
+            
+            # 提取章节结构
+            chapters = self.extract_chapters(content)
+            
+            return {
+                "content": content,
+                "chapters": chapters,
+                "tables": tables,
+                "sheet_names": sheet_names,
+                "row_count": row_count,
+                "table_count": len(tables)
+            }
+        except zipfile.BadZipFile:
+            raise Exception("Excel文档解析失败: 文件不是有效的xlsx格式")
+        except Exception as e:
+            raise Exception(f"Excel文档解析失败: {str(e)}")
+    
+    @staticmethod
+    def _row_text(row: List[str]) -> str:
+        """
+        行文本：非空单元格以制表符连接
+        
+        单元格内换行替换为空格，保证一行表格对应一行正文。
+        """
+        return '\t'.join(' '.join(cell.split()) for cell in row if cell.strip())
+
+
+class TextParser(DocumentParser):
+    """纯文本/Markdown文档解析器"""
+    
+    def __init__(self, markdown: bool = False):
+        """
+        初始化文本解析器
+        
+        Args:
+            markdown: 是否按Markdown标题（# 章、## 节）识别章节
+        """
+        super().__init__()
+        self.supported_formats = ['.txt', '.md']
+        self.outline_tokenizer = OutlineTokenizer(markdown=markdown)
+        self.encodings = PARSER_CONFIG.get("text_encodings", DEFAULT_ENCODINGS)
+        self.chunk_size = PARSER_CONFIG.get("text_chunk_size_kb", 1024) * 1024
+    
+    def parse(self, file_path: str) -> Dict:
+        """
+        解析文本文档
+        
+        文件内存映射后分块解码，自动识别UTF-8/GBK/GB18030编码（有BOM时按BOM），
+        换行符统一为\n；章节识别对全文做一次正则扫描，不拆分行列表。
+        """
+        try:
+            content, encoding = read_text_file(file_path, self.encodings, self.chunk_size)
+            
+            # 提取章节结构
+            chapters = self.extract_chapters(content)
+            
+            line_count = content.count('\n')
+            if content and not content.endswith('\n'):
+                line_count += 1
+            
+            return {
+                "content": content,
+                "chapters": chapters,
+                "tables": [],
+                "encoding": encoding,
+                "line_count": line_count,
+                "table_count": 0
+            }
+        except Exception as e:
+            raise Exception(f"文本文档解析失败: {str(e)}")
+
+
+class MarkdownParser(TextParser):
+    """Markdown文档解析器"""
+    
+    def __init__(self):
+        super().__init__(markdown=True)
 
 
 class DocumentParserFactory:
@@ -166,6 +392,9 @@ class DocumentParserFactory:
         '.docx': WordParser,
         '.doc': WordParser,
         '.pdf': PDFParser,
+        '.xlsx': ExcelParser,
+        '.txt': TextParser,
+        '.md': MarkdownParser,
     }
     
     @classmethod
@@ -180,10 +409,22 @@ class DocumentParserFactory:
         return parser_class()
     
     @classmethod
-    def parse_document(cls, file_path: str) -> Dict:
-        """解析文档"""
+    def parse_document(cls, file_path: str, use_cache: bool = True,
+                       file_hash: Optional[str] = None) -> Dict:
+        """
+        解析文档
+        
+        Args:
+            file_path: 文件路径
+            use_cache: 是否使用解析缓存（相同内容的文件直接返回缓存结果）
+            file_hash: 已知的文件SHA-256，省去重新计算
+        """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"文件不存在: {file_path}")
         
         parser = cls.get_parser(file_path)
-        return parser.parse(file_path)
+        if not (use_cache and PARSE_CACHE_CONFIG.get("enabled", False)):
+            return parser.parse(file_path)
+        
+        result, _ = get_parse_cache().get_or_parse(file_path, parser.parse, file_hash=file_hash)
+        return result
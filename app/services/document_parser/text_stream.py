@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+纯文本流式读取模块
+通过内存映射分块解码文本文件，自动识别编码并统一换行符，不一次性读入整个文件
+"""
+
+import codecs
+import mmap
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# 字节序标记 -> 编码（UTF-8 BOM由utf-8-sig解码时去除）
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# 无BOM时依次尝试的编码：GBK是GB18030的子集，先尝试GBK以便如实报告编码
+DEFAULT_ENCODINGS = ("utf-8", "gbk", "gb18030")
+
+# 每次解码的字节数
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def detect_bom(buffer) -> Optional[str]:
+    """根据字节序标记识别编码，没有BOM时返回None"""
+    head = bytes(buffer[:4])
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def _release_pages(buffer, start: int, end: int) -> int:
+    """通知内核已解码部分的映射页不再需要，避免大文件的页缓存计入进程常驻内存"""
+    end = end // mmap.PAGESIZE * mmap.PAGESIZE
+    if end > start and hasattr(buffer, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+        buffer.madvise(mmap.MADV_DONTNEED, start, min(end, len(buffer)) - start)
+        return end
+    return start
+
+
+def iter_decoded_chunks(buffer, encoding: str, errors: str = "strict",
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    分块解码字节缓冲区，产出换行符统一为\\n的文本块
+
+    增量解码器处理跨块的多字节字符；块末尾的\\r暂存到下一块，保证\\r\\n不被拆开。
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    pending_cr = False
+    size = len(buffer)
+    released = 0
+
+    for offset in range(0, size, chunk_size):
+        final = offset + chunk_size >= size
+        text = decoder.decode(buffer[offset:offset + chunk_size], final)
+        released = _release_pages(buffer, released, offset + chunk_size)
+        if pending_cr:
+            text = "\r" + text
+        pending_cr = not final and text.endswith("\r")
+        if pending_cr:
+            text = text[:-1]
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        if text:
+            yield text
+
+
+def read_text_file(file_path: str, encodings: Sequence[str] = DEFAULT_ENCODINGS,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[str, str]:
+    """
+    读取文本文件
+
+    文件以只读方式内存映射，按块解码后一次拼接为全文。有BOM时按BOM解码；
+    否则依次尝试encodings中的编码（解码失败时换下一个编码重新解码，
+    非UTF-8文件通常在开头几KB内就会失败）；全部失败时按最后一个编码替换无法解码的字节。
+
+    Returns:
+        (全文, 编码名称)
+    """
+    with open(file_path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            return "", encodings[0]
+
+        with buffer:
+            encoding = detect_bom(buffer)
+            if encoding is not None:
+                return "".join(iter_decoded_chunks(buffer, encoding, "replace", chunk_size)), encoding
+
+            for encoding in encodings:
+                parts: List[str] = []
+                try:
+                    for text in iter_decoded_chunks(buffer, encoding, "strict", chunk_size):
+                        parts.append(text)
+                except UnicodeDecodeError:
+                    continue
+                return "".join(parts), encoding
+
+            encoding = encodings[-1]
+            return "".join(iter_decoded_chunks(buffer, encoding, "replace", chunk_size)), encoding
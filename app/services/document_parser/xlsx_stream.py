@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+XLSX流式读取模块
+直接增量解析xlsx压缩包中的工作表XML，逐行产出单元格文本，只读、不加载整个工作簿
+"""
+
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Tuple, Union
+
+# SpreadsheetML命名空间
+S_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_SI = S_NS + "si"
+_T = S_NS + "t"
+_R = S_NS + "r"
+_ROW = S_NS + "row"
+_C = S_NS + "c"
+_V = S_NS + "v"
+_IS = S_NS + "is"
+_SHEET = S_NS + "sheet"
+_MERGE_CELL = S_NS + "mergeCell"
+_RELATIONSHIP = _PKG_REL_NS + "Relationship"
+
+_CELL_REF_RE = re.compile(r"^([A-Z]+)(\d+)$")
+
+
+def column_index(letters: str) -> int:
+    """列字母转换为从0开始的列序号（A -> 0, AA -> 26）"""
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def _split_ref(ref: str) -> Tuple[int, int]:
+    """单元格引用转换为 (行号, 列序号)，行号从1开始"""
+    match = _CELL_REF_RE.match(ref)
+    if not match:
+        raise ValueError(f"无效的单元格引用: {ref}")
+    return int(match.group(2)), column_index(match.group(1))
+
+
+def _string_item_text(item: ET.Element) -> str:
+    """共享字符串/内联字符串文本（富文本各段拼接，忽略拼音注音）"""
+    parts = []
+    for child in item:
+        if child.tag == _T:
+            parts.append(child.text or "")
+        elif child.tag == _R:
+            for t in child.findall(_T):
+                parts.append(t.text or "")
+    return "".join(parts)
+
+
+def read_shared_strings(xlsx_zip: zipfile.ZipFile) -> List[str]:
+    """流式读取xl/sharedStrings.xml"""
+    strings: List[str] = []
+    try:
+        shared_file = xlsx_zip.open("xl/sharedStrings.xml")
+    except KeyError:
+        return strings
+
+    with shared_file:
+        for _, elem in ET.iterparse(shared_file):
+            if elem.tag == _SI:
+                strings.append(_string_item_text(elem))
+                elem.clear()
+    return strings
+
+
+def list_sheets(xlsx_zip: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """返回工作表 [(名称, 压缩包内路径), ...]，按工作簿中的顺序"""
+    targets: Dict[str, str] = {}
+    with xlsx_zip.open("xl/_rels/workbook.xml.rels") as rels_file:
+        for rel in ET.parse(rels_file).getroot().iter(_RELATIONSHIP):
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join("xl", target))
+            targets[rel.get("Id")] = target
+
+    sheets = []
+    with xlsx_zip.open("xl/workbook.xml") as workbook_file:
+        for sheet in ET.parse(workbook_file).getroot().iter(_SHEET):
+            target = targets.get(sheet.get(_R_NS + "id"))
+            if target:
+                sheets.append((sheet.get("name", ""), target))
+    return sheets
+
+
+def _resolve_sheet(xlsx_zip: zipfile.ZipFile, sheet: Union[int, str, None]) -> str:
+    sheets = list_sheets(xlsx_zip)
+    if not sheets:
+        raise ValueError("工作簿中没有工作表")
+    if sheet is None:
+        return sheets[0][1]
+    if isinstance(sheet, int):
+        return sheets[sheet][1]
+    for name, target in sheets:
+        if name == sheet:
+            return target
+    raise ValueError(f"工作表不存在: {sheet}")
+
+
+def read_merged_cells(xlsx_zip: zipfile.ZipFile, sheet_path: str) -> Dict[Tuple[int, int], Tuple[int, int]]:
+    """
+    读取合并单元格，返回 被合并单元格(行号, 列序号) -> 左上角单元格(行号, 列序号)
+
+    mergeCells位于工作表XML末尾，需要在逐行读取前单独扫描一遍（扫描时丢弃行数据）。
+    """
+    merged: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    with xlsx_zip.open(sheet_path) as sheet_file:
+        for _, elem in ET.iterparse(sheet_file):
+            if elem.tag == _MERGE_CELL:
+                first, _, last = (elem.get("ref") or "").partition(":")
+                if last:
+                    top, left = _split_ref(first)
+                    bottom, right = _split_ref(last)
+                    for row in range(top, bottom + 1):
+                        for col in range(left, right + 1):
+                            if (row, col) != (top, left):
+                                merged[(row, col)] = (top, left)
+            elif elem.tag == _ROW:
+                elem.clear()
+    return merged
+
+
+def _format_number(value: str) -> str:
+    """数值单元格文本：整数去掉小数部分，浮点数去掉二进制误差（33.950000000000003 -> 33.95）"""
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if number.is_integer():
+        return str(int(number))
+    return format(number, ".15g")
+
+
+def _cell_text(cell: ET.Element, shared_strings: List[str]) -> str:
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        inline = cell.find(_IS)
+        return _string_item_text(inline) if inline is not None else ""
+
+    value = cell.find(_V)
+    if value is None or value.text is None:
+        return ""
+    text = value.text
+    if cell_type == "s":
+        return shared_strings[int(text)]
+    if cell_type == "b":
+        return "TRUE" if text == "1" else "FALSE"
+    if cell_type in ("str", "e"):
+        return text
+    return _format_number(text)
+
+
+def iter_xlsx_rows(file_path: str, sheet: Union[int, str, None] = None,
+                   fill_merged: bool = True) -> Iterator[Tuple[int, List[str]]]:
+    """
+    流式遍历工作表的行
+
+    按行号顺序产出 (行号, 单元格文本列表)，行号从1开始，列表按列序号对齐、缺失单元格为空串；
+    没有非空单元格的行不产出。日期等按数字格式存储的值返回原始数值文本。
+
+    Args:
+        file_path: xlsx文件路径
+        sheet: 工作表名称或序号，默认第一个工作表
+        fill_merged: 合并单元格区域内的单元格是否填入左上角单元格的值
+    """
+    with zipfile.ZipFile(file_path) as xlsx_zip:
+        sheet_path = _resolve_sheet(xlsx_zip, sheet)
+        shared_strings = read_shared_strings(xlsx_zip)
+        merged = read_merged_cells(xlsx_zip, sheet_path) if fill_merged else {}
+        # 合并区域左上角单元格的值，以及按行分组的被合并单元格
+        anchors = {anchor: "" for anchor in merged.values()}
+        merged_by_row: Dict[int, List[Tuple[int, Tuple[int, int]]]] = {}
+        for (merged_row, merged_col), anchor in merged.items():
+            merged_by_row.setdefault(merged_row, []).append((merged_col, anchor))
+
+        with xlsx_zip.open(sheet_path) as sheet_file:
+            next_row = 1
+            for _, elem in ET.iterparse(sheet_file):
+                if elem.tag != _ROW:
+                    continue
+
+                row_number = int(elem.get("r") or next_row)
+                next_row = row_number + 1
+                values: Dict[int, str] = {}
+                for position, cell in enumerate(elem.findall(_C)):
+                    ref = cell.get("r")
+                    col = _split_ref(ref)[1] if ref else position
+                    values[col] = _cell_text(cell, shared_strings)
+                elem.clear()
+
+                if anchors:
+                    for col, text in values.items():
+                        if (row_number, col) in anchors:
+                            anchors[(row_number, col)] = text
+                    for merged_col, anchor in merged_by_row.get(row_number, ()):
+                        if not values.get(merged_col):
+                            values[merged_col] = anchors[anchor]
+
+                if not any(values.values()):
+                    continue
+                row = [""] * (max(values) + 1)
+                for col, text in values.items():
+                    row[col] = text
+                yield row_number, row
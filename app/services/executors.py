@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+执行池模块
+CPU密集的计算阶段（全文关键词索引、必含内容匹配、规则匹配）提交到进程池，不与事件循环争用GIL；
+阻塞I/O（数据库、文件、模型接口）提交到线程池。进程数、线程数见EXECUTOR_CONFIG，
+排队深度等统计由get_stats提供。
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+from config.config import EXECUTOR_CONFIG
+
+
+def _init_cpu_worker():
+    """计算进程初始化：不复用父进程的数据库连接（fork启动时会继承连接池）"""
+    from app.models.database import engine
+    engine.dispose(close=False)
+
+
+class _PoolStats:
+    """单个执行池的提交与完成计数"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+    def on_submit(self):
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def on_done(self, future: Future):
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    @property
+    def queue_depth(self) -> int:
+        """已提交但还没有空闲进程/线程执行的任务数"""
+        return max(0, self.in_flight - self.workers)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": min(self.in_flight, self.workers),
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed
+            }
+
+
+class ExecutorPools:
+    """
+    计算进程池与I/O线程池
+
+    两个池在首次使用时创建，按进程号区分（子进程不复用父进程的池）；
+    计算进程异常退出导致进程池损坏时，下次提交重新创建。
+    cpu_workers为0时不使用进程池，计算阶段提交到I/O线程池（仍不阻塞事件循环）。
+    """
+
+    def __init__(self, cpu_workers: Optional[int] = None, io_workers: Optional[int] = None,
+                 start_method: Optional[str] = None):
+        """
+        Args:
+            cpu_workers: 计算进程数，默认读取EXECUTOR_CONFIG
+            io_workers: I/O线程数，默认读取EXECUTOR_CONFIG
+            start_method: 计算进程启动方式（spawn/fork/forkserver）
+        """
+        self.cpu_workers = EXECUTOR_CONFIG["cpu_workers"] if cpu_workers is None else cpu_workers
+        self.io_workers = max(1, EXECUTOR_CONFIG["io_workers"] if io_workers is None else io_workers)
+        self.start_method = start_method or EXECUTOR_CONFIG.get("cpu_start_method", "spawn")
+        self.cpu_stats = _PoolStats(self.cpu_workers if self.cpu_workers > 0 else self.io_workers)
+        self.io_stats = _PoolStats(self.io_workers)
+        self._cpu_executor: Optional[ProcessPoolExecutor] = None
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            # fork出的子进程：父进程的池不可用
+            self._cpu_executor = None
+            self._io_executor = None
+            self._pid = os.getpid()
+
+    def _get_cpu_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.cpu_workers <= 0:
+            return None
+        with self._lock:
+            self._check_pid()
+            if self._cpu_executor is None:
+                self._cpu_executor = ProcessPoolExecutor(
+                    max_workers=self.cpu_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_cpu_worker
+                )
+            return self._cpu_executor
+
+    def _get_io_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            self._check_pid()
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="io-worker")
+            return self._io_executor
+
+    @staticmethod
+    def _submit(executor: Executor, stats: _PoolStats, fn: Callable, *args, **kwargs) -> Future:
+        future = executor.submit(fn, *args, **kwargs)
+        stats.on_submit()
+        future.add_done_callback(stats.on_done)
+        return future
+
+    def submit_cpu(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        提交计算任务（fn须为模块级函数，参数与返回值须可pickle）
+
+        进程池已损坏（计算进程被杀死等）时重新创建后再提交一次。
+        """
+        executor = self._get_cpu_executor()
+        if executor is None:
+            return self._submit(self._get_io_executor(), self.cpu_stats, fn, *args, **kwargs)
+        try:
+            return self._submit(executor, self.cpu_stats, fn, *args, **kwargs)
+        except BrokenProcessPool:
+            with self._lock:
+                if self._cpu_executor is executor:
+                    self._cpu_executor = None
+            executor.shutdown(wait=False)
+            return self._submit(self._get_cpu_executor(), self.cpu_stats, fn, *args, **kwargs)
+
+    def submit_io(self, fn: Callable, *args, **kwargs) -> Future:
+        """提交阻塞I/O任务"""
+        return self._submit(self._get_io_executor(), self.io_stats, fn, *args, **kwargs)
+
+    def run_cpu(self, fn: Callable, *args, **kwargs):
+        """在计算进程池中执行并等待结果（供工作线程调用）"""
+        return self.submit_cpu(fn, *args, **kwargs).result()
+
+    async def arun_cpu(self, fn: Callable, *args, **kwargs):
+        """在计算进程池中执行，等待期间不阻塞事件循环"""
+        return await asyncio.wrap_future(self.submit_cpu(fn, *args, **kwargs))
+
+    async def arun_io(self, fn: Callable, *args, **kwargs):
+        """在I/O线程池中执行，等待期间不阻塞事件循环"""
+        return await asyncio.wrap_future(self.submit_io(fn, *args, **kwargs))
+
+    def get_stats(self) -> Dict:
+        """获取执行池统计（运行中、排队深度、历史最大排队深度、提交/完成/失败数）"""
+        cpu = self.cpu_stats.to_dict()
+        cpu["mode"] = "process" if self.cpu_workers > 0 else "thread"
+        return {"cpu": cpu, "io": self.io_stats.to_dict()}
+
+    def shutdown(self, wait: bool = False):
+        """关闭执行池（未开始的任务取消）"""
+        with self._lock:
+            executors = [self._cpu_executor, self._io_executor]
+            self._cpu_executor = None
+            self._io_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_executor_pools: Optional[ExecutorPools] = None
+_executor_pools_lock = threading.Lock()
+
+
+def get_executor_pools() -> ExecutorPools:
+    """获取进程内共享的执行池"""
+    global _executor_pools
+    if _executor_pools is None:
+        with _executor_pools_lock:
+            if _executor_pools is None:
+                _executor_pools = ExecutorPools()
+    return _executor_pools
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+重大隐患关键词包模块
+将导入的重大风险/重大隐患条目按作业关键词与隐患条件词预编译，审核时复用全文关键词索引，
+作业关键词与该条目的条件词在文档中相邻出现时才输出预警
+"""
+
+import bisect
+import json
+from typing import Dict, Iterable, List, Optional
+
+from config.config import HAZARD_LIBRARY_CONFIG
+from app.core.keyword_automaton import KeywordAutomaton, KeywordHitIndex, get_shared_automaton
+
+# 隐患数据库导入的审核规则类型（不参与规则引擎的正则/必含内容检查）
+HAZARD_RULE_TYPE = "重大隐患"
+
+# 隐患条件词：条目的"转换为隐患的条件"与隐患描述中出现的条件词即该条目的条件词。
+# 作业关键词（基坑、脚手架等）几乎出现在每份施工方案中，只有与条件词相邻出现才说明方案中存在该隐患情形
+HAZARD_CONDITION_TERMS = [
+    "未编制", "未审核", "未审批", "未论证", "未经验收", "未验收", "验收不合格", "不合格",
+    "未按规定", "未按设计", "未按方案", "未按专项", "未按施工方案", "未按操作规程",
+    "未采取", "未设置", "未安装", "未取得", "未配备", "未进行", "未及时", "未对",
+    "无资质", "超资质", "无执业资格", "擅自", "违规", "失效", "不到位", "不满足", "不符合",
+    "超载", "超过设计", "超挖", "不灵敏", "安全距离不足",
+]
+
+
+def extract_condition_terms(text: str) -> List[str]:
+    """提取文本中出现的隐患条件词（被更长条件词包含的短条件词不重复计入）"""
+    found = [term for term in HAZARD_CONDITION_TERMS if term in text]
+    return [term for term in found if not any(term != other and term in other for other in found)]
+
+
+def hazard_from_rule(rule) -> Optional[Dict]:
+    """从重大隐患类型的审核规则还原隐患条目（规则内容中保存了导入时的整行数据与关键词）"""
+    try:
+        record = json.loads(rule.rule_content or "{}")
+    except (TypeError, ValueError):
+        return None
+    keywords = [kw for kw in record.get("keywords") or [] if isinstance(kw, str) and kw]
+    condition_terms = extract_condition_terms(
+        " ".join((record.get("condition") or "", record.get("hazard_description") or ""))
+    )
+    if not keywords or not condition_terms:
+        return None
+    return {
+        "rule_id": rule.id,
+        "category": record.get("category", ""),
+        "risk_description": record.get("risk_description", ""),
+        "hazard_description": record.get("hazard_description") or rule.review_focus or "",
+        "basis": record.get("basis", ""),
+        "severity": rule.severity or "严重",
+        "keywords": keywords,
+        "condition_terms": condition_terms
+    }
+
+
+class HazardPack:
+    """
+    重大隐患关键词包
+
+    关键词 -> 隐患条目 的倒排表；evaluate按关键词在文档中首次出现的位置顺序输出预警，
+    每个关键词只列出条件词在其附近（condition_window个字符内）出现的隐患判定条目。
+    """
+
+    def __init__(self, hazards: Iterable[Dict], condition_window: Optional[int] = None):
+        self.hazards: List[Dict] = list(hazards)
+        self.condition_window = condition_window or HAZARD_LIBRARY_CONFIG["condition_window"]
+        self._by_keyword: Dict[str, List[Dict]] = {}
+        condition_terms = set()
+        for hazard in self.hazards:
+            for keyword in hazard["keywords"]:
+                self._by_keyword.setdefault(keyword, []).append(hazard)
+            condition_terms.update(hazard["condition_terms"])
+        self.keywords: List[str] = sorted(self._by_keyword)
+        self.condition_terms: List[str] = sorted(condition_terms)
+        # 需要编入全文关键词索引的全部词
+        self.index_terms: List[str] = sorted(set(self.keywords) | condition_terms)
+        self.version = KeywordAutomaton.compute_version(self.index_terms)
+
+    @classmethod
+    def from_rules(cls, rules: Iterable) -> "HazardPack":
+        """由数据库中的重大隐患规则构建"""
+        hazards = []
+        for rule in rules:
+            hazard = hazard_from_rule(rule)
+            if hazard is not None:
+                hazards.append(hazard)
+        return cls(hazards)
+
+    def __len__(self):
+        return len(self.hazards)
+
+    def _near(self, positions: List[int], other: List[int]) -> Optional[int]:
+        """positions中第一个在condition_window内有other出现的位置"""
+        for position in positions:
+            index = bisect.bisect_left(other, position - self.condition_window)
+            if index < len(other) and other[index] <= position + self.condition_window:
+                return position
+        return None
+
+    def evaluate(self, content: str = "", content_index: Optional[KeywordHitIndex] = None) -> List[Dict]:
+        """
+        找出文档涉及的重大隐患
+
+        Args:
+            content: 文档全文（content_index未覆盖全部关键词与条件词时用于扫描）
+            content_index: 审核时已建立的全文关键词索引，覆盖全部词时直接复用、不再扫描全文
+
+        Returns:
+            [{"keyword", "occurrences", "first_position", "hazards": [...]}, ...]
+        """
+        if not self.keywords:
+            return []
+        if content_index is None or not all(content_index.covers(term) for term in self.index_terms):
+            content_index = get_shared_automaton(self.index_terms).build_index(content)
+
+        alerts = []
+        for keyword in self.keywords:
+            positions = content_index.positions(keyword)
+            if not positions:
+                continue
+            hazards = []
+            first_position = None
+            for hazard in self._by_keyword[keyword]:
+                for term in hazard["condition_terms"]:
+                    position = self._near(positions, content_index.positions(term))
+                    if position is None:
+                        continue
+                    hazards.append({
+                        "rule_id": hazard["rule_id"],
+                        "category": hazard["category"],
+                        "hazard_description": hazard["hazard_description"],
+                        "basis": hazard["basis"],
+                        "severity": hazard["severity"],
+                        "condition_term": term
+                    })
+                    first_position = position if first_position is None else min(first_position, position)
+                    break
+            if hazards:
+                alerts.append({
+                    "keyword": keyword,
+                    "occurrences": len(positions),
+                    "first_position": first_position,
+                    "hazards": hazards
+                })
+        alerts.sort(key=lambda alert: alert["first_position"])
+        return alerts
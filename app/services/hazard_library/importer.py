@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+重大风险及重大隐患数据库导入模块
+流式读取Excel隐患数据库，每行生成一条审核规则和一条知识库条目；
+按行标识与内容哈希增量更新，重复导入时只写入有变化的行
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.database import ReviewStandard, ReviewRule, KnowledgeBase
+from app.services.document_parser.xlsx_stream import iter_xlsx_rows
+from app.services.hazard_library.hazard_pack import HAZARD_RULE_TYPE, extract_condition_terms
+from app.services.rule_engine.ruleset_cache import bump_ruleset_version
+
+# 隐患数据库对应的审核规范
+HAZARD_STANDARD_NAME = "民航专业工程重大风险及重大隐患数据库"
+HAZARD_STANDARD_CATEGORY = "重大风险及重大隐患"
+# 知识库条目来源标识
+HAZARD_KNOWLEDGE_SOURCE = HAZARD_STANDARD_NAME
+
+# 表头（去除空白后）-> 字段名；"等级"列依次对应风险等级与隐患等级
+HAZARD_COLUMNS = {
+    "一级": "level1_no",
+    "二级": "level2_no",
+    "类别": "category",
+    "风险描述": "risk_description",
+    "来源": "risk_source",
+    "转换为隐患的条件": "condition",
+    "隐患描述": "hazard_description",
+    "依据": "basis",
+    "说明": "note",
+}
+_LEVEL_COLUMNS = ("risk_level", "hazard_level")
+
+# 危险性较大的作业/工程关键词：条目描述中出现的关键词编入隐患关键词包
+# （这些词在施工方案中普遍出现，预警还须该条目的条件词在附近出现，见hazard_pack.HAZARD_CONDITION_TERMS）
+HAZARD_KEYWORDS = [
+    "深基坑", "基坑", "土方开挖", "降水", "高边坡", "边坡", "填方", "支挡", "土石方",
+    "高大模板", "模板支撑", "模板支架", "模板", "支撑体系", "脚手架",
+    "起重吊装", "起重机械", "塔式起重机", "门式起重机", "桥式起重机", "施工升降机", "物料提升机", "吊篮",
+    "暗挖", "隧道", "人工挖孔桩", "围堰", "有限空间", "动火", "焊接", "临时用电", "配电",
+    "爆破", "拆除", "钢结构", "钢筋", "不停航施工", "施工便道", "化学品", "驻地",
+    "高处作业", "交叉作业", "特种作业",
+]
+
+# 参与内容哈希的字段（行号、序号变化不视为内容变化）
+_HASHED_FIELDS = (
+    "category", "risk_description", "risk_source", "risk_level", "condition",
+    "hazard_description", "hazard_level", "basis", "note"
+)
+
+
+def extract_hazard_keywords(text: str) -> List[str]:
+    """提取文本中出现的作业关键词（被更长关键词包含的短关键词不重复计入）"""
+    found = [kw for kw in HAZARD_KEYWORDS if kw in text]
+    return [kw for kw in found if not any(kw != other and kw in other for other in found)]
+
+
+def _clean(value: str) -> str:
+    """单元格文本：合并换行与连续空白"""
+    return " ".join((value or "").split())
+
+
+def _map_header(header_row: List[str]) -> Dict[int, str]:
+    columns: Dict[int, str] = {}
+    levels = iter(_LEVEL_COLUMNS)
+    for index, title in enumerate(header_row):
+        title = "".join(title.split())
+        if title == "等级":
+            field = next(levels, None)
+        else:
+            field = HAZARD_COLUMNS.get(title)
+        if field and field not in columns.values():
+            columns[index] = field
+    return columns
+
+
+def iter_hazard_records(file_path: str) -> Iterator[Dict]:
+    """
+    流式读取隐患数据库，逐条产出隐患记录
+
+    以同时包含"风险描述"与"隐患描述"的行作为表头，按表头名称定位各列；
+    合并单元格（如类别、依据）按左上角单元格的值填充到每一行。
+    """
+    columns: Optional[Dict[int, str]] = None
+    seen_keys: Dict[str, int] = {}
+
+    for row_number, row in iter_xlsx_rows(file_path):
+        if columns is None:
+            titles = {"".join(cell.split()) for cell in row}
+            if "风险描述" in titles and "隐患描述" in titles:
+                columns = _map_header(row)
+            continue
+
+        record = {field: _clean(row[index]) if index < len(row) else "" for index, field in columns.items()}
+        if not record.get("risk_description") and not record.get("hazard_description"):
+            continue
+
+        # 行标识：类别+风险描述+转换条件，重复时追加序号
+        identity = "|".join(record.get(field, "") for field in ("category", "risk_description", "condition"))
+        key = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+        seen_keys[key] = seen_keys.get(key, 0) + 1
+        if seen_keys[key] > 1:
+            key = f"{key}#{seen_keys[key]}"
+
+        hashed = {field: record.get(field, "") for field in _HASHED_FIELDS}
+        record["row_number"] = row_number
+        record["source_key"] = key
+        record["source_hash"] = hashlib.sha256(
+            json.dumps(hashed, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        record["keywords"] = extract_hazard_keywords(
+            " ".join((record.get("category", ""), record.get("risk_description", ""),
+                      record.get("hazard_description", "")))
+        )
+        record["condition_terms"] = extract_condition_terms(
+            " ".join((record.get("condition", ""), record.get("hazard_description", "")))
+        )
+        yield record
+
+    if columns is None:
+        raise ValueError("未找到隐患数据库表头（需包含\"风险描述\"和\"隐患描述\"列）")
+
+
+def _rule_values(record: Dict) -> Dict:
+    name = "：".join(part for part in (record.get("category"), record.get("risk_description")) if part)
+    return {
+        "rule_name": name[:200],
+        "rule_type": HAZARD_RULE_TYPE,
+        "rule_content": json.dumps(
+            {key: value for key, value in record.items() if key not in ("source_key", "source_hash", "row_number")},
+            ensure_ascii=False
+        ),
+        "rule_pattern": "",
+        "required_content": [],
+        "review_focus": record.get("hazard_description", ""),
+        "severity": "严重",
+        "source_key": record["source_key"],
+        "source_hash": record["source_hash"],
+    }
+
+
+def _knowledge_values(record: Dict) -> Dict:
+    lines = [
+        f"{label}：{record[field]}"
+        for label, field in (
+            ("风险描述", "risk_description"), ("风险来源", "risk_source"), ("转换为隐患的条件", "condition"),
+            ("隐患描述", "hazard_description"), ("依据", "basis"), ("说明", "note")
+        )
+        if record.get(field)
+    ]
+    return {
+        "title": (record.get("risk_description") or record.get("hazard_description", ""))[:200],
+        "category": record.get("category", ""),
+        "content": "\n".join(lines),
+        "source": HAZARD_KNOWLEDGE_SOURCE,
+        "source_key": record["source_key"],
+        "source_hash": record["source_hash"],
+    }
+
+
+class HazardImporter:
+    """隐患数据库导入器"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_or_create_standard(self, file_path: str, file_name: Optional[str] = None,
+                               file_hash: Optional[str] = None) -> Tuple[ReviewStandard, Optional[str]]:
+        """
+        获取隐患数据库对应的审核规范记录（不存在时创建），并更新为本次导入的文件
+
+        Returns:
+            (规范记录, 此前引用的文件路径)
+        """
+        standard = self.db.query(ReviewStandard).filter(
+            ReviewStandard.category == HAZARD_STANDARD_CATEGORY
+        ).order_by(ReviewStandard.id).first()
+        if standard is None:
+            standard = ReviewStandard(name=HAZARD_STANDARD_NAME, category=HAZARD_STANDARD_CATEGORY)
+            self.db.add(standard)
+        previous_file_path = standard.file_path
+        standard.file_name = file_name or Path(file_path).name
+        standard.file_path = str(file_path)
+        standard.file_type = Path(standard.file_name).suffix
+        standard.file_hash = file_hash
+        standard.status = "已导入"
+        self.db.flush()
+        return standard, previous_file_path
+
+    def import_file(self, file_path: str, file_name: Optional[str] = None,
+                    file_hash: Optional[str] = None) -> Dict:
+        """
+        导入隐患数据库
+
+        新增行批量插入，内容哈希变化的行批量更新（保留规则的启用状态与优先级），
+        表格中已删除的行同步删除；整个导入在一个事务中提交。
+
+        Returns:
+            导入统计
+        """
+        standard, previous_file_path = self.get_or_create_standard(file_path, file_name, file_hash)
+
+        existing_rules = {
+            key: (rule_id, source_hash)
+            for rule_id, key, source_hash in self.db.query(
+                ReviewRule.id, ReviewRule.source_key, ReviewRule.source_hash
+            ).filter(ReviewRule.standard_id == standard.id, ReviewRule.rule_type == HAZARD_RULE_TYPE)
+        }
+        existing_knowledge = {
+            key: (entry_id, source_hash)
+            for entry_id, key, source_hash in self.db.query(
+                KnowledgeBase.id, KnowledgeBase.source_key, KnowledgeBase.source_hash
+            ).filter(KnowledgeBase.source == HAZARD_KNOWLEDGE_SOURCE)
+        }
+
+        rule_inserts, rule_updates = [], []
+        knowledge_inserts, knowledge_updates = [], []
+        seen = set()
+        total = 0
+        with_keywords = 0
+
+        for record in iter_hazard_records(file_path):
+            total += 1
+            if record["keywords"] and record["condition_terms"]:
+                with_keywords += 1
+            key = record["source_key"]
+            seen.add(key)
+
+            current = existing_rules.get(key)
+            if current is None:
+                rule_inserts.append(dict(_rule_values(record), standard_id=standard.id,
+                                         is_active=True, is_ai_generated=False, priority=0))
+            elif current[1] != record["source_hash"]:
+                rule_updates.append(dict(_rule_values(record), id=current[0]))
+
+            current = existing_knowledge.get(key)
+            if current is None:
+                knowledge_inserts.append(_knowledge_values(record))
+            elif current[1] != record["source_hash"]:
+                knowledge_updates.append(dict(_knowledge_values(record), id=current[0]))
+
+        stale_rules = [rule_id for key, (rule_id, _) in existing_rules.items() if key not in seen]
+        stale_knowledge = [entry_id for key, (entry_id, _) in existing_knowledge.items() if key not in seen]
+
+        if rule_inserts:
+            self.db.bulk_insert_mappings(ReviewRule, rule_inserts)
+        if rule_updates:
+            self.db.bulk_update_mappings(ReviewRule, rule_updates)
+        if stale_rules:
+            self.db.query(ReviewRule).filter(ReviewRule.id.in_(stale_rules)).delete(synchronize_session=False)
+        if knowledge_inserts:
+            self.db.bulk_insert_mappings(KnowledgeBase, knowledge_inserts)
+        if knowledge_updates:
+            self.db.bulk_update_mappings(KnowledgeBase, knowledge_updates)
+        if stale_knowledge:
+            self.db.query(KnowledgeBase).filter(KnowledgeBase.id.in_(stale_knowledge)).delete(
+                synchronize_session=False
+            )
+        self.db.commit()
+
+        changed = len(rule_inserts) + len(rule_updates) + len(stale_rules)
+        if changed:
+            bump_ruleset_version()
+
+        return {
+            "standard_id": standard.id,
+            "previous_file_path": previous_file_path,
+            "total": total,
+            "inserted": len(rule_inserts),
+            "updated": len(rule_updates),
+            "deleted": len(stale_rules),
+            "unchanged": total - len(rule_inserts) - len(rule_updates),
+            "knowledge_inserted": len(knowledge_inserts),
+            "knowledge_updated": len(knowledge_updates),
+            "knowledge_deleted": len(stale_knowledge),
+            "keyword_hazards": with_keywords
+        }
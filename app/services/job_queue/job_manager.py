@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+后台任务管理模块
+任务记录持久化在jobs表中，由本进程的工作线程池执行，
+避免解析、审核、规则生成等阻塞操作占用事件循环
+"""
+
+import asyncio
+import os
+import socket
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from config.config import JOB_QUEUE_CONFIG
+from app.models.database import SessionLocal, Job
+
+# 任务状态
+JOB_QUEUED = "排队中"
+JOB_RUNNING = "运行中"
+JOB_SUCCEEDED = "已完成"
+JOB_FAILED = "失败"
+JOB_CANCELLED = "已取消"
+
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+# 任务处理函数：handler(db, params, ctx) -> 结果字典（须可JSON序列化）
+JobHandler = Callable[[Session, Dict, "JobContext"], Dict]
+
+
+class JobCancelled(Exception):
+    """任务已被请求取消"""
+
+
+class JobContext:
+    """任务执行上下文，供处理函数检查取消请求、上报进度"""
+
+    def __init__(self, manager: "JobManager", job_id: int):
+        self.manager = manager
+        self.job_id = job_id
+
+    def check_cancelled(self):
+        """已请求取消时抛出JobCancelled（在各处理阶段之间调用）"""
+        if self.manager.is_cancel_requested(self.job_id):
+            raise JobCancelled()
+
+    def set_progress(self, progress: int):
+        """更新任务进度（0-100）"""
+        self.manager.update_progress(self.job_id, progress)
+
+
+def job_to_dict(job: Job) -> Dict:
+    """任务记录转换为接口返回的字典"""
+    return {
+        "job_id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "params": job.params or {},
+        "result": job.result,
+        "error": job.error,
+        "progress": job.progress or 0,
+        "cancel_requested": bool(job.cancel_requested),
+        "attempts": job.attempts or 0,
+        "create_time": job.create_time.isoformat() if job.create_time else None,
+        "start_time": job.start_time.isoformat() if job.start_time else None,
+        "finish_time": job.finish_time.isoformat() if job.finish_time else None
+    }
+
+
+def _current_worker() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    """判断本机进程是否存活"""
+    if os.name == "nt":
+        # Windows下os.kill会直接结束目标进程，无法用于探测；按已退出处理（通常为单进程部署）
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobManager:
+    """
+    后台任务管理器
+
+    submit写入一条"排队中"的任务记录并交给线程池执行；
+    执行前以条件更新（status=排队中 -> 运行中）认领任务，多进程同时恢复同一任务时只会执行一次。
+    取消为协作式：排队中的任务直接标记为已取消，运行中的任务由处理函数在阶段之间检查后退出。
+    """
+
+    def __init__(self, workers: Optional[int] = None, session_factory=SessionLocal):
+        self.workers = workers or JOB_QUEUE_CONFIG["workers"]
+        self.session_factory = session_factory
+        self._handlers: Dict[str, JobHandler] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[int, Future] = {}
+        self._cancel_flags = set()
+        self._lock = threading.Lock()
+
+    def register(self, job_type: str, handler: JobHandler):
+        """注册任务类型及其处理函数"""
+        self._handlers[job_type] = handler
+
+    def job_types(self) -> List[str]:
+        """已注册的任务类型"""
+        return list(self._handlers)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="job-worker"
+                )
+            return self._executor
+
+    def shutdown(self, wait: bool = False):
+        """关闭工作线程池（未开始的任务保留为排队中，下次启动时恢复）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def submit(self, job_type: str, params: Optional[Dict] = None) -> int:
+        """
+        提交任务
+
+        Returns:
+            任务ID
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"不支持的任务类型: {job_type}")
+
+        db = self.session_factory()
+        try:
+            job = Job(job_type=job_type, status=JOB_QUEUED, params=params or {})
+            db.add(job)
+            db.commit()
+            job_id = job.id
+        finally:
+            db.close()
+
+        self._enqueue(job_id)
+        return job_id
+
+    def _enqueue(self, job_id: int) -> Future:
+        future = self._get_executor().submit(self._run, job_id)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._futures.pop(job_id, None))
+        return future
+
+    def _run(self, job_id: int):
+        db = self.session_factory()
+        try:
+            # 认领任务：只有仍处于排队中的任务才会被执行
+            claimed = db.query(Job).filter(Job.id == job_id, Job.status == JOB_QUEUED).update({
+                Job.status: JOB_RUNNING,
+                Job.start_time: datetime.now(),
+                Job.worker: _current_worker(),
+                Job.attempts: Job.attempts + 1
+            }, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                return
+
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if job.cancel_requested:
+                self._finish(db, job_id, JOB_CANCELLED)
+                return
+
+            handler = self._handlers.get(job.job_type)
+            if handler is None:
+                self._finish(db, job_id, JOB_FAILED, error=f"不支持的任务类型: {job.job_type}")
+                return
+
+            params = dict(job.params or {})
+            try:
+                result = handler(db, params, JobContext(self, job_id))
+            except JobCancelled:
+                db.rollback()
+                self._finish(db, job_id, JOB_CANCELLED)
+            except Exception as e:
+                db.rollback()
+                print(f"后台任务{job_id}执行失败: {str(e)}")
+                self._finish(db, job_id, JOB_FAILED, error=str(e))
+            else:
+                self._finish(db, job_id, JOB_SUCCEEDED, result=result)
+        finally:
+            db.close()
+            self._cancel_flags.discard(job_id)
+
+    @staticmethod
+    def _finish(db: Session, job_id: int, status: str, result: Optional[Dict] = None,
+                error: Optional[str] = None):
+        values = {Job.status: status, Job.finish_time: datetime.now(), Job.error: error}
+        if status == JOB_SUCCEEDED:
+            values[Job.result] = result
+            values[Job.progress] = 100
+        db.query(Job).filter(Job.id == job_id).update(values, synchronize_session=False)
+        db.commit()
+
+    def cancel(self, job_id: int) -> Optional[Dict]:
+        """
+        请求取消任务
+
+        Returns:
+            取消后的任务信息；任务不存在时返回None
+        """
+        db = self.session_factory()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if job is None:
+                return None
+            if job.status not in FINISHED_STATUSES:
+                job.cancel_requested = True
+                if job.status == JOB_QUEUED:
+                    job.status = JOB_CANCELLED
+                    job.finish_time = datetime.now()
+                db.commit()
+                db.refresh(job)
+
+                self._cancel_flags.add(job_id)
+                future = self._futures.get(job_id)
+                if future is not None:
+                    future.cancel()
+            return job_to_dict(job)
+        finally:
+            db.close()
+
+    def is_cancel_requested(self, job_id: int) -> bool:
+        """任务是否已被请求取消（同时检查其他进程写入数据库的取消请求）"""
+        if job_id in self._cancel_flags:
+            return True
+        db = self.session_factory()
+        try:
+            job = db.query(Job.cancel_requested).filter(Job.id == job_id).first()
+            return bool(job and job.cancel_requested)
+        finally:
+            db.close()
+
+    def update_progress(self, job_id: int, progress: int):
+        """更新任务进度"""
+        db = self.session_factory()
+        try:
+            db.query(Job).filter(Job.id == job_id).update(
+                {Job.progress: max(0, min(100, int(progress)))}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """查询任务"""
+        db = self.session_factory()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            return job_to_dict(job) if job else None
+        finally:
+            db.close()
+
+    def list_jobs(self, status: Optional[str] = None, job_type: Optional[str] = None,
+                  skip: int = 0, limit: int = 50) -> Dict:
+        """分页查询任务"""
+        db = self.session_factory()
+        try:
+            query = db.query(Job)
+            if status:
+                query = query.filter(Job.status == status)
+            if job_type:
+                query = query.filter(Job.job_type == job_type)
+            total = query.count()
+            jobs = query.order_by(Job.id.desc()).offset(skip).limit(limit).all()
+            return {"total": total, "items": [job_to_dict(job) for job in jobs]}
+        finally:
+            db.close()
+
+    async def wait(self, job_id: int, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        异步等待任务结束（不阻塞事件循环）
+
+        本进程执行的任务直接等待线程池结果；其他进程执行的任务按间隔轮询数据库。
+        超时后返回任务当前状态。
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        future = self._futures.get(job_id)
+        if future is not None:
+            try:
+                # shield：客户端断开导致等待被取消时，不影响任务本身
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                # 排队中的任务被取消时线程池future随之取消，其余情况为等待方自身被取消
+                if not future.cancelled():
+                    raise
+            except Exception:
+                # 任务异常已记录在任务表中，以数据库状态为准
+                pass
+
+        interval = JOB_QUEUE_CONFIG["wait_poll_interval"]
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in FINISHED_STATUSES:
+                return job
+            if deadline is not None and loop.time() >= deadline:
+                return job
+            await asyncio.sleep(interval)
+
+    def recover(self) -> int:
+        """
+        恢复上次未执行完的任务
+
+        本机已退出进程遗留的"运行中"任务重新排队，所有"排队中"的任务重新提交到线程池。
+
+        Returns:
+            重新提交的任务数
+        """
+        db = self.session_factory()
+        try:
+            hostname = socket.gethostname()
+            for job in db.query(Job).filter(Job.status == JOB_RUNNING).all():
+                host, _, pid = (job.worker or "").rpartition(":")
+                orphaned = not job.worker or (host == hostname and pid.isdigit() and not _pid_alive(int(pid)))
+                if orphaned:
+                    if job.cancel_requested:
+                        job.status = JOB_CANCELLED
+                        job.finish_time = datetime.now()
+                    else:
+                        job.status = JOB_QUEUED
+            db.commit()
+
+            job_ids = [
+                job_id for (job_id,) in
+                db.query(Job.id).filter(Job.status == JOB_QUEUED).order_by(Job.id).all()
+            ]
+        finally:
+            db.close()
+
+        for job_id in job_ids:
+            self._enqueue(job_id)
+        return len(job_ids)
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """获取进程内共享的任务管理器"""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
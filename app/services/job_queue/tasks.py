@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+后台任务处理函数
+文档解析、文档审核、规则生成在工作线程中执行，使用任务管理器提供的独立数据库会话
+"""
+
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Dict
+
+from sqlalchemy.orm import Session
+
+from config.config import LLM_API_KEY, LLM_MODEL
+
+from app.models.database import Project, Document, ReviewRecord, ReviewStandard
+from app.services.document_parser.parser import DocumentParserFactory
+from app.services.review_engine.ai_reviewer import AIReviewer
+from app.services.review_engine.review_pipeline import analyze_document_for_review
+from app.services.executors import get_executor_pools
+from app.services.rule_engine.ruleset_cache import get_ruleset_version, bump_ruleset_version
+from app.services.rule_engine.rule_store import upsert_generated_rules
+from app.services.report_generator.report_generator import ReportGenerator
+from app.services.blob_store import BlobStore
+from app.services.hazard_library.importer import HazardImporter
+from app.services.job_queue.job_manager import JobManager, JobContext, JobCancelled
+
+# 任务类型
+JOB_PARSE_DOCUMENT = "parse_document"
+JOB_REVIEW_DOCUMENT = "review_document"
+JOB_GENERATE_RULES = "generate_rules"
+JOB_IMPORT_HAZARDS = "import_hazards"
+
+
+def run_parse_document(db: Session, params: Dict, ctx: JobContext) -> Dict:
+    """解析文档，参数：document_id"""
+    document = db.query(Document).filter(Document.id == params["document_id"]).first()
+    if not document:
+        raise ValueError("文档不存在")
+
+    previous_status = document.parse_status
+    document.parse_status = "解析中"
+    db.commit()
+
+    try:
+        # 解析是CPU密集的计算，在计算进程池中执行，不占用任务线程与接口所在进程的GIL
+        parsed_content = get_executor_pools().run_cpu(
+            DocumentParserFactory.parse_document, document.file_path, file_hash=document.file_hash
+        )
+        ctx.check_cancelled()
+    except JobCancelled:
+        document.parse_status = previous_status
+        db.commit()
+        raise
+    except Exception:
+        document.parse_status = "解析失败"
+        db.commit()
+        raise
+
+    # 更新文档记录
+    document.content = parsed_content.get("content", "")
+    document.chapters = parsed_content.get("chapters", [])
+    document.parse_status = "解析完成"
+    document.parse_time = datetime.now()
+    db.commit()
+
+    return {
+        "document_id": document.id,
+        "chapters_count": len(parsed_content.get("chapters", [])),
+        "content_length": len(parsed_content.get("content", ""))
+    }
+
+
+def run_review_document(db: Session, params: Dict, ctx: JobContext, report_dir: Path) -> Dict:
+    """审核文档，参数：document_id、use_ai、standard_id"""
+    document_id = params["document_id"]
+    use_ai = params.get("use_ai", True)
+
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise ValueError("文档不存在")
+    if document.parse_status != "解析完成":
+        raise ValueError("文档尚未解析完成")
+
+    # 准备文档内容
+    document_content = {
+        "content": document.content or "",
+        "chapters": document.chapters or []
+    }
+
+    # 配置了LLM_API_KEY且use_ai时各章节再并发调用大语言模型审核
+    ai_reviewer = AIReviewer(llm_api_key=LLM_API_KEY if use_ai else None, llm_model=LLM_MODEL)
+
+    # 计算阶段在计算进程池中执行：启用规则的必含内容、隐患关键词与审核要点库一起编译进关键词自动机，
+    # 完整性与章节审核、重大隐患预警、规则引擎匹配复用同一份全文关键词索引
+    stage = get_executor_pools().run_cpu(
+        analyze_document_for_review, document_content, params.get("standard_id"),
+        get_ruleset_version(), ai_reviewer.use_llm
+    )
+    ctx.check_cancelled()
+
+    # 大语言模型审核（I/O）在当前工作线程中执行，然后汇总
+    review_result = ai_reviewer.complete_review(stage["analysis"])
+    ctx.check_cancelled()
+
+    # 重大隐患预警（单独列出，不计入修改建议）
+    hazard_alerts = stage["hazard_alerts"]
+    review_result["hazard_alerts"] = hazard_alerts
+
+    # 规则引擎审核结果
+    rule_results, rule_timings = stage["rule_results"], stage["rule_timings"]
+
+    # 合并规则引擎结果
+    for rule_result in rule_results:
+        if rule_result.get("status") == "不通过":
+            review_result["issues"].append({
+                "type": "规则检查",
+                "severity": rule_result.get("severity", "一般"),
+                "description": rule_result.get("description", ""),
+                "suggestion": rule_result.get("suggestion", "")
+            })
+
+    # 重新计算得分（合并规则引擎结果后）
+    review_result["score"] = ai_reviewer._calculate_score(
+        review_result["completeness"],
+        review_result["chapter_reviews"]
+    )
+
+    # 生成报告
+    project = db.query(Project).filter(Project.id == document.project_id).first()
+    project_info = {
+        "name": project.name if project else "",
+        "project_type": project.project_type if project else ""
+    }
+
+    report_generator = ReportGenerator()
+    report = report_generator.generate_report(review_result, project_info)
+    ctx.check_cancelled()
+
+    # 保存审核记录
+    review_record = ReviewRecord(
+        project_id=document.project_id,
+        document_id=document_id,
+        review_type="AI审核" if use_ai else "规则审核",
+        review_result=review_result,
+        issues=review_result.get("issues", []),
+        suggestions=review_result.get("suggestions", []),
+        score=review_result.get("score", 0),
+        status="审核完成"
+    )
+    db.add(review_record)
+
+    # 更新项目状态
+    if project:
+        if review_result["score"] >= 80:
+            project.status = "审核通过"
+        elif review_result["score"] >= 60:
+            project.status = "有条件通过"
+        else:
+            project.status = "审核不通过"
+
+    db.commit()
+    db.refresh(review_record)
+
+    # 保存报告文件（Vercel环境中可能需要使用临时目录）
+    try:
+        report_file = report_dir / f"report_{review_record.id}.json"
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        report_generator.export_to_json(report, str(report_file))
+    except Exception as e:
+        # 如果保存失败，记录但不影响返回结果
+        print(f"报告文件保存警告: {str(e)}")
+
+    return {
+        "review_id": review_record.id,
+        "score": review_result["score"],
+        "issues_count": len(review_result.get("issues", [])),
+        "suggestions_count": len(review_result.get("suggestions", [])),
+        "hazard_alerts_count": len(hazard_alerts),
+        "rule_timings": rule_timings,
+        "llm_review": review_result.get("llm_review"),
+        "report": report
+    }
+
+
+def run_generate_rules(db: Session, params: Dict, ctx: JobContext) -> Dict:
+    """从审核规范生成审核规则，参数：standard_id、model_name、api_key"""
+    from app.services.ai_rule_generator import AIRuleGenerator
+
+    standard_id = params["standard_id"]
+    model_name = params.get("model_name", "deepseek-chat")
+
+    standard = db.query(ReviewStandard).filter(ReviewStandard.id == standard_id).first()
+    if not standard:
+        raise ValueError("审核规范不存在")
+
+    content = get_standard_content(standard)
+    if not content:
+        raise ValueError("规范内容为空，无法生成规则")
+
+    generator = AIRuleGenerator(model_name=model_name, api_key=params.get("api_key"))
+    generated_rules = generator.generate_rules_from_standard(content, standard.category)
+    ctx.check_cancelled()
+
+    # 按规则指纹批量写入（重新生成时更新已有规则，不追加重复规则）
+    saved_rules = upsert_generated_rules(db, standard_id, generated_rules, model_name)
+    db.commit()
+    bump_ruleset_version()
+
+    return {
+        "standard_id": standard_id,
+        "rules_count": len(saved_rules),
+        "llm_cache": generator.cache_info,
+        "generation": generator.generation_info,
+        "rules": [
+            {
+                "id": r["id"],
+                "rule_name": r["rule_name"],
+                "rule_type": r["rule_type"],
+                "severity": r["severity"],
+                "is_ai_generated": r["is_ai_generated"]
+            }
+            for r in saved_rules
+        ]
+    }
+
+
+def run_import_hazards(db: Session, params: Dict, ctx: JobContext, blob_store: BlobStore) -> Dict:
+    """导入重大风险及重大隐患数据库，参数：file_path、file_name、file_hash"""
+    file_path = params["file_path"]
+    try:
+        result = HazardImporter(db).import_file(file_path, params.get("file_name"), params.get("file_hash"))
+    except Exception:
+        db.rollback()
+        # 本次上传的文件未被引用，释放存储
+        blob_store.release(db, file_path)
+        raise
+
+    # 规范记录改为引用新文件，释放此前引用的文件（内置数据库文件不受存储管理，自动忽略）
+    blob_store.release(db, result.pop("previous_file_path", None))
+    return result
+
+
+def get_standard_content(standard: ReviewStandard) -> str:
+    """获取规范正文（优先使用content字段，其次解析结果）"""
+    return standard.content or standard.parsed_content.get("content", "") if standard.parsed_content else ""
+
+
+def register_default_tasks(manager: JobManager, report_dir: Path, blob_store: BlobStore):
+    """注册内置任务类型"""
+    manager.register(JOB_PARSE_DOCUMENT, run_parse_document)
+    manager.register(JOB_REVIEW_DOCUMENT, partial(run_review_document, report_dir=report_dir))
+    manager.register(JOB_GENERATE_RULES, run_generate_rules)
+    manager.register(JOB_IMPORT_HAZARDS, partial(run_import_hazards, blob_store=blob_store))
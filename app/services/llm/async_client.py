@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+异步大语言模型客户端
+基于httpx.AsyncClient连接池调用OpenAI兼容的chat/completions接口，
+并发数由信号量限制，单次调用超时，限流/服务端错误/网络错误按抖动退避重试，可选响应缓存
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from app.services.llm.common import LLMError, RETRYABLE_STATUS, backoff_delay
+from app.services.llm.response_cache import LLMResponseCache
+
+
+class AsyncLLMClient:
+    """
+    异步LLM客户端
+
+    在同一事件循环内共享一个连接池（连接数上限与并发数一致，保持长连接）；
+    用作异步上下文管理器，退出时关闭连接池。
+    """
+
+    def __init__(self, base_url: str, api_key: str, model: str,
+                 max_concurrency: int = 8, timeout: float = 60.0,
+                 max_retries: int = 3, retry_base_delay: float = 0.5, retry_max_delay: float = 8.0,
+                 cache: Optional[LLMResponseCache] = None, provider: Optional[str] = None):
+        """
+        Args:
+            base_url: 接口地址（如 https://api.openai.com/v1）
+            api_key: API密钥
+            model: 模型名称
+            max_concurrency: 同时进行的请求数上限
+            timeout: 单次请求超时秒数
+            max_retries: 失败后的最多重试次数
+            retry_base_delay: 重试退避的基准秒数
+            retry_max_delay: 单次重试等待的最长秒数
+            cache: 响应缓存，命中时不发送请求
+            provider: 缓存键中的服务提供方，默认为接口地址
+        """
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.cache = cache
+        self.provider = provider or self.base_url
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncLLMClient":
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(max_connections=self.max_concurrency,
+                                max_keepalive_connections=self.max_concurrency)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """关闭连接池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def chat(self, messages: List[Dict], temperature: float = 0.3,
+                   max_tokens: Optional[int] = None, **params) -> str:
+        """
+        调用chat/completions并返回回复文本
+
+        Raises:
+            LLMError: 重试后仍失败
+        """
+        if self._client is None:
+            raise RuntimeError("AsyncLLMClient需在 async with 中使用")
+
+        payload = {"model": self.model, "messages": messages, "temperature": temperature, **params}
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(self.provider, self.model, messages, temperature, max_tokens, **params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+
+        async with self._semaphore:
+            text = await self._post_with_retry(payload)
+        if key is not None:
+            self.cache.put(key, self.provider, self.model, text)
+        return text
+
+    def forget(self, messages: List[Dict], temperature: float = 0.3,
+               max_tokens: Optional[int] = None, **params):
+        """删除一组消息的缓存回复（回复内容不可用时调用，下次重新请求）"""
+        if self.cache is not None:
+            self.cache.delete(self.cache.make_key(self.provider, self.model, messages, temperature, max_tokens, **params))
+
+    async def _post_with_retry(self, payload: Dict) -> str:
+        import httpx
+
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                # httpx的超时针对单次读写，wait_for限制整个请求的总耗时
+                response = await asyncio.wait_for(
+                    self._client.post("/chat/completions", json=payload), self.timeout
+                )
+                if response.status_code < 400:
+                    try:
+                        return response.json()["choices"][0]["message"]["content"] or ""
+                    except (ValueError, KeyError, IndexError, TypeError) as e:
+                        raise LLMError(f"无法解析模型响应: {e}", response.status_code)
+                retry_after = response.headers.get("Retry-After")
+                error = LLMError(
+                    f"模型接口返回 {response.status_code}: {response.text[:200]}",
+                    response.status_code, response.status_code in RETRYABLE_STATUS
+                )
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                error = LLMError(f"模型接口超时（{self.timeout}秒）", retryable=True)
+            except httpx.TransportError as e:
+                error = LLMError(f"模型接口连接失败: {e}", retryable=True)
+
+            if not error.retryable or attempt >= self.max_retries:
+                raise error
+            await asyncio.sleep(backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay, retry_after))
+            attempt += 1
+
+    async def chat_many(self, requests: List[List[Dict]], **params) -> List:
+        """
+        并发调用多组消息
+
+        Returns:
+            与requests一一对应的回复文本；失败的项为LLMError（部分失败不影响其他请求）
+        """
+        async def call(messages):
+            try:
+                return await self.chat(messages, **params)
+            except LLMError as e:
+                return e
+
+        return await asyncio.gather(*(call(messages) for messages in requests))
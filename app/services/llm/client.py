@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+大语言模型同步客户端
+同一接口地址的请求共用进程级httpx连接池（HTTP keep-alive，不再每次调用重新建立TCP/TLS连接），
+限流/服务端错误/网络错误按抖动退避重试，流式响应边接收边解析
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config.config import LLM_CLIENT_CONFIG
+from app.services.llm.common import LLMError, RETRYABLE_STATUS, backoff_delay
+from app.services.llm.providers import ProviderAdapter, get_adapter
+
+# (进程号, 接口地址) -> httpx.Client
+_http_clients: Dict[Tuple[int, str], object] = {}
+_http_clients_lock = threading.Lock()
+
+
+def get_http_client(base_url: str):
+    """
+    获取接口地址对应的共享httpx.Client（线程安全，进程内复用长连接）
+
+    按进程号区分，子进程不会继承父进程的连接。
+    """
+    import httpx
+
+    key = (os.getpid(), base_url.rstrip("/"))
+    client = _http_clients.get(key)
+    if client is None:
+        with _http_clients_lock:
+            client = _http_clients.get(key)
+            if client is None:
+                client = httpx.Client(
+                    base_url=key[1],
+                    limits=httpx.Limits(
+                        max_connections=LLM_CLIENT_CONFIG["max_connections"],
+                        max_keepalive_connections=LLM_CLIENT_CONFIG["max_keepalive_connections"],
+                        keepalive_expiry=LLM_CLIENT_CONFIG["keepalive_expiry_seconds"]
+                    ),
+                    timeout=httpx.Timeout(LLM_CLIENT_CONFIG["timeout_seconds"])
+                )
+                _http_clients[key] = client
+    return client
+
+
+def close_http_clients():
+    """关闭本进程的全部共享连接池"""
+    with _http_clients_lock:
+        for key in [key for key in _http_clients if key[0] == os.getpid()]:
+            _http_clients.pop(key).close()
+
+
+def iter_sse(lines: Iterable[str]) -> Iterator[Tuple[Optional[str], str]]:
+    """
+    逐行解析SSE（Server-Sent Events）
+
+    Yields:
+        (event字段, data字段)；多行data以换行连接
+    """
+    event = None
+    data: List[str] = []
+    for line in lines:
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = None, []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+    if data:
+        yield event, "\n".join(data)
+
+
+class LLMClient:
+    """大语言模型同步客户端（按提供商适配请求与响应格式）"""
+
+    def __init__(self, provider: str, api_base: str, api_key: str, model: str,
+                 max_tokens: Optional[int] = None, timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None):
+        """
+        Args:
+            provider: 提供商（openai/deepseek/anthropic）
+            api_base: 接口地址
+            api_key: API密钥
+            model: 模型名称
+            max_tokens: 默认最大生成token数
+            timeout: 单次请求超时秒数，默认读取LLM_CLIENT_CONFIG
+            max_retries: 失败后的最多重试次数，默认读取LLM_CLIENT_CONFIG
+        """
+        self.provider = provider
+        self.adapter: ProviderAdapter = get_adapter(provider)
+        self.api_base = api_base.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.max_tokens = max_tokens
+        self.timeout = timeout if timeout is not None else LLM_CLIENT_CONFIG["timeout_seconds"]
+        self.max_retries = max_retries if max_retries is not None else LLM_CLIENT_CONFIG["max_retries"]
+
+    @classmethod
+    def from_model_config(cls, model_config: Dict, api_key: str) -> "LLMClient":
+        """由AIRuleGenerator.MODEL_CONFIGS中的模型配置创建客户端"""
+        return cls(model_config["provider"], model_config["api_base"], api_key,
+                   model_config["model"], max_tokens=model_config.get("max_tokens"))
+
+    def _retry_or_raise(self, error: LLMError, attempt: int, retry_after: Optional[str] = None):
+        if not error.retryable or attempt >= self.max_retries:
+            raise error
+        time.sleep(backoff_delay(attempt, LLM_CLIENT_CONFIG["retry_base_delay"],
+                                 LLM_CLIENT_CONFIG["retry_max_delay"], retry_after))
+
+    def chat(self, messages: List[Dict], temperature: float = 0.3, max_tokens: Optional[int] = None) -> str:
+        """
+        调用模型并返回完整回复（非流式）
+
+        Raises:
+            LLMError: 重试后仍失败
+        """
+        import httpx
+
+        path, headers, body = self.adapter.build_request(
+            self.api_key, self.model, messages, temperature, max_tokens or self.max_tokens, False
+        )
+        client = get_http_client(self.api_base)
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = client.post(path, headers=headers, json=body, timeout=self.timeout)
+                if response.status_code < 400:
+                    try:
+                        return self.adapter.parse_response(response.json())
+                    except (ValueError, KeyError, IndexError, TypeError) as e:
+                        raise LLMError(f"无法解析模型响应: {e}", response.status_code)
+                retry_after = response.headers.get("Retry-After")
+                error = LLMError(f"模型接口返回 {response.status_code}: {response.text[:200]}",
+                                 response.status_code, response.status_code in RETRYABLE_STATUS)
+            except httpx.TimeoutException:
+                error = LLMError(f"模型接口超时（{self.timeout}秒）", retryable=True)
+            except httpx.TransportError as e:
+                error = LLMError(f"模型接口连接失败: {e}", retryable=True)
+            self._retry_or_raise(error, attempt, retry_after)
+            attempt += 1
+
+    def stream_chat(self, messages: List[Dict], temperature: float = 0.3,
+                    max_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        流式调用模型，逐段产出新生成的文本
+
+        收到第一段文本之前的失败按规则重试；已产出文本后连接中断则直接报错（避免重复内容）。
+
+        Raises:
+            LLMError: 重试后仍失败或流式响应中断
+        """
+        import httpx
+
+        path, headers, body = self.adapter.build_request(
+            self.api_key, self.model, messages, temperature, max_tokens or self.max_tokens, True
+        )
+        client = get_http_client(self.api_base)
+        attempt = 0
+        while True:
+            retry_after = None
+            started = False
+            try:
+                with client.stream("POST", path, headers=headers, json=body, timeout=self.timeout) as response:
+                    if response.status_code < 400:
+                        done = False
+                        for event, data in iter_sse(response.iter_lines()):
+                            # 结束事件之后的内容只读取不解析，响应读完连接才能放回连接池
+                            if done:
+                                continue
+                            try:
+                                text, done = self.adapter.parse_event(event, data)
+                            except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                                raise LLMError(f"无法解析流式响应: {e}", response.status_code)
+                            if text:
+                                started = True
+                                yield text
+                        return
+                    response.read()
+                    retry_after = response.headers.get("Retry-After")
+                    error = LLMError(f"模型接口返回 {response.status_code}: {response.text[:200]}",
+                                     response.status_code, response.status_code in RETRYABLE_STATUS)
+            except httpx.TimeoutException:
+                error = LLMError(f"模型接口超时（{self.timeout}秒）", retryable=not started)
+            except httpx.TransportError as e:
+                error = LLMError(f"模型接口连接失败: {e}", retryable=not started)
+            self._retry_or_raise(error, attempt, retry_after)
+            attempt += 1
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+大语言模型调用公共部分
+异常类型、可重试状态码、重试退避时间计算与流式输出中JSON对象的增量解析
+"""
+
+import json
+import random
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# 可重试的HTTP状态码（限流与服务端错误）
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class LLMError(Exception):
+    """大语言模型调用失败"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float,
+                  retry_after: Optional[str] = None) -> float:
+    """
+    第attempt次重试前的等待秒数
+
+    指数退避加全抖动：在 [0, min(max_delay, base_delay * 2^attempt)] 内随机取值，
+    避免并发请求同时失败后同时重试；服务端给出Retry-After（秒）时至少等待该时长。
+    """
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    if retry_after:
+        try:
+            delay = max(delay, min(float(retry_after), max_delay))
+        except ValueError:
+            pass
+    return delay
+
+
+def iter_json_objects(chunks: Iterable[str]) -> Iterator[Dict]:
+    """
+    从流式输出中逐个解析JSON对象
+
+    跟踪字符串与花括号层级，每当一个最外层对象的右花括号到达即解析产出，
+    不必等待整个回复（如规则数组）接收完毕；无法解析的片段跳过。
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    buffer: List[str] = []
+    for chunk in chunks:
+        start = 0
+        for index, char in enumerate(chunk):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = depth > 0
+            elif char == "{":
+                if depth == 0:
+                    buffer = []
+                    start = index
+                depth += 1
+            elif char == "}" and depth > 0:
+                depth -= 1
+                if depth == 0:
+                    buffer.append(chunk[start:index + 1])
+                    try:
+                        value = json.loads("".join(buffer))
+                    except ValueError:
+                        value = None
+                    if isinstance(value, dict):
+                        yield value
+                    buffer = []
+        if depth > 0:
+            buffer.append(chunk[start:])
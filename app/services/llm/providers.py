@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+大语言模型提供商适配
+各提供商的请求格式、完整响应与流式事件的解析（OpenAI、DeepSeek为OpenAI兼容格式，Anthropic为Messages格式）
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+
+class ProviderAdapter:
+    """提供商适配器基类"""
+
+    def build_request(self, api_key: str, model: str, messages: List[Dict], temperature: float,
+                      max_tokens: Optional[int], stream: bool) -> Tuple[str, Dict, Dict]:
+        """
+        构建请求
+
+        Returns:
+            (相对接口地址的路径, 请求头, 请求体)
+        """
+        raise NotImplementedError
+
+    def parse_response(self, data: Dict) -> str:
+        """从完整响应中取出回复文本"""
+        raise NotImplementedError
+
+    def parse_event(self, event: Optional[str], data: str) -> Tuple[str, bool]:
+        """
+        解析一条流式事件（SSE）
+
+        Args:
+            event: SSE的event字段（没有时为None）
+            data: SSE的data字段
+
+        Returns:
+            (新增文本, 是否结束)
+        """
+        raise NotImplementedError
+
+
+class OpenAIAdapter(ProviderAdapter):
+    """OpenAI兼容接口（OpenAI、DeepSeek及本地兼容服务）"""
+
+    def build_request(self, api_key, model, messages, temperature, max_tokens, stream):
+        body = {"model": model, "messages": messages, "temperature": temperature, "stream": stream}
+        if max_tokens:
+            body["max_tokens"] = max_tokens
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        return "/chat/completions", headers, body
+
+    def parse_response(self, data):
+        return data["choices"][0]["message"]["content"] or ""
+
+    def parse_event(self, event, data):
+        if data.strip() == "[DONE]":
+            return "", True
+        payload = json.loads(data)
+        choices = payload.get("choices") or [{}]
+        delta = choices[0].get("delta") or {}
+        return delta.get("content") or "", False
+
+
+class AnthropicAdapter(ProviderAdapter):
+    """Anthropic Messages接口（system消息单独传递）"""
+
+    API_VERSION = "2023-06-01"
+
+    def build_request(self, api_key, model, messages, temperature, max_tokens, stream):
+        system = "\n".join(m["content"] for m in messages if m.get("role") == "system")
+        body = {
+            "model": model,
+            "messages": [m for m in messages if m.get("role") != "system"],
+            "temperature": temperature,
+            "max_tokens": max_tokens or 4000,
+            "stream": stream
+        }
+        if system:
+            body["system"] = system
+        headers = {
+            "x-api-key": api_key,
+            "anthropic-version": self.API_VERSION,
+            "Content-Type": "application/json"
+        }
+        return "/messages", headers, body
+
+    def parse_response(self, data):
+        return "".join(block.get("text", "") for block in data.get("content", []) if block.get("type") == "text")
+
+    def parse_event(self, event, data):
+        payload = json.loads(data)
+        event_type = event or payload.get("type")
+        if event_type == "content_block_delta":
+            return payload.get("delta", {}).get("text", ""), False
+        if event_type == "message_stop":
+            return "", True
+        if event_type == "error":
+            raise ValueError(payload.get("error", {}).get("message", "流式响应错误"))
+        return "", False
+
+
+# 提供商 -> 适配器（与AIRuleGenerator.MODEL_CONFIGS中的provider对应）
+PROVIDER_ADAPTERS: Dict[str, ProviderAdapter] = {
+    "openai": OpenAIAdapter(),
+    "deepseek": OpenAIAdapter(),
+    "anthropic": AnthropicAdapter(),
+}
+
+
+def get_adapter(provider: str) -> ProviderAdapter:
+    """获取提供商适配器"""
+    adapter = PROVIDER_ADAPTERS.get(provider)
+    if adapter is None:
+        raise ValueError(f"不支持的模型提供商: {provider}")
+    return adapter
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+大语言模型响应缓存模块
+以 提供方 + 模型 + 生成参数 + 规范化提示词的SHA-256 为键，将模型回复持久化在本地SQLite中，
+相同请求在有效期内直接返回缓存的回复；超出总大小上限时按最近访问时间淘汰
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.config import LLM_CACHE_CONFIG
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t　]+\n")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed_at ON llm_responses (accessed_at);
+"""
+
+
+def normalize_prompt(text: str) -> str:
+    """规范化提示词：统一换行符、去掉行尾空白和首尾空白（不影响语义的差异不产生新的缓存键）"""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return _TRAILING_SPACE_RE.sub("\n", text + "\n").strip()
+
+
+class LLMResponseCache:
+    """大语言模型响应缓存（SQLite，多线程共享一个连接）"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_hours: Optional[float] = None,
+                 max_size_mb: Optional[float] = None):
+        """
+        Args:
+            db_path: SQLite文件路径，默认读取LLM_CACHE_CONFIG["db_path"]
+            ttl_hours: 缓存有效期（小时），0为永不过期
+            max_size_mb: 缓存回复总大小上限（MB），超出后淘汰最久未访问的条目
+        """
+        self.db_path = Path(db_path or LLM_CACHE_CONFIG["db_path"])
+        if ttl_hours is None:
+            ttl_hours = LLM_CACHE_CONFIG["ttl_hours"]
+        if max_size_mb is None:
+            max_size_mb = LLM_CACHE_CONFIG["max_size_mb"]
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(provider: str, model: str, messages: List[Dict], temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None, **params) -> str:
+        """
+        生成缓存键
+
+        Args:
+            provider: 服务提供方（提供商名称或接口地址）
+            model: 模型名称
+            messages: 对话消息（内容规范化后参与哈希）
+            temperature / max_tokens / params: 生成参数
+        """
+        prompt = json.dumps(
+            [[message.get("role", ""), normalize_prompt(message.get("content", ""))] for message in messages],
+            ensure_ascii=False, separators=(",", ":")
+        )
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        raw_key = json.dumps(
+            [provider, model, temperature, max_tokens, sorted(params.items()), prompt_hash],
+            ensure_ascii=False, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存的回复，未命中或已过期返回None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at, size FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._total_size -= row[2]
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_responses SET accessed_at = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, provider: str, model: str, response: str):
+        """写入缓存"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, provider, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, response, size, now, now)
+            )
+            self.writes += 1
+            self._total_size += size - (old[0] if old else 0)
+            if self._total_size > self.max_size_bytes:
+                self._evict()
+
+    def delete(self, key: str):
+        """删除一条缓存（如回复无法解析时不再复用）"""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._total_size -= row[0]
+
+    def _evict(self):
+        """先删除过期条目，再按访问时间从旧到新淘汰，直到总大小降到上限的90%以下（调用方持有锁）"""
+        if self.ttl_seconds:
+            cursor = self._conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self.expired += cursor.rowcount
+            self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+
+        target_size = self.max_size_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM llm_responses ORDER BY accessed_at").fetchall() \
+            if self._total_size > target_size else []
+        evicted = []
+        for key, size in rows:
+            if self._total_size <= target_size:
+                break
+            evicted.append((key,))
+            self._total_size -= size
+        if evicted:
+            self._conn.executemany("DELETE FROM llm_responses WHERE key = ?", evicted)
+            self.evictions += len(evicted)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._total_size = 0
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0,
+                "writes": self.writes,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "entries": entries,
+                "size_bytes": self._total_size,
+                "max_size_bytes": self.max_size_bytes,
+                "ttl_hours": self.ttl_seconds / 3600
+            }
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """获取进程内共享的响应缓存实例（未启用缓存时返回None）"""
+    global _response_cache
+    if not LLM_CACHE_CONFIG["enabled"]:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = LLMResponseCache()
+    return _response_cache
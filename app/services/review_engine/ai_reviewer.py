@@ -5,25 +5,41 @@ AI审核引擎
 """
 
 import json
-from typing import Dict, List, Optional
-from app.core.review_point_library import ReviewPointLibrary
+from typing import Dict, Iterable, List, Optional
+from app.core.review_point_library import get_review_point_library
+from app.core.keyword_automaton import KeywordHitIndex, get_shared_automaton
+from app.services.review_engine.chapter_aligner import ChapterAligner, ChapterAlignment
+from app.services.review_engine.fuzzy_matcher import get_fuzzy_matcher
+from app.services.review_engine.llm_reviewer import LLMChapterReviewer
+from config.config import REVIEW_CONFIG
 
 
 class AIReviewer:
     """AI审核引擎"""
     
-    def __init__(self, llm_api_key: Optional[str] = None, llm_model: str = "gpt-3.5-turbo"):
+    def __init__(self, llm_api_key: Optional[str] = None, llm_model: str = "gpt-3.5-turbo",
+                 extra_required_content: Optional[Iterable[str]] = None, llm_base_url: Optional[str] = None):
         """
         初始化AI审核引擎
         
         Args:
             llm_api_key: 大语言模型API密钥
             llm_model: 使用的模型名称
+            extra_required_content: 审核要点库之外的必含内容（如数据库中审核规则的必含内容），
+                与要点库一起编译进关键词自动机
+            llm_base_url: OpenAI兼容接口地址，默认取LLM_BASE_URL
         """
         self.llm_api_key = llm_api_key
         self.llm_model = llm_model
-        self.review_library = ReviewPointLibrary()
-        self.use_llm = llm_api_key is not None
+        self.review_library = get_review_point_library()
+        self.chapter_aligner = ChapterAligner(self.review_library)
+        # 必含内容模糊匹配（未启用或缺少NumPy/SciPy时为None）
+        self.fuzzy_matcher = get_fuzzy_matcher()
+        self.use_llm = bool(llm_api_key)
+        self.llm_reviewer = LLMChapterReviewer(llm_api_key, llm_model, llm_base_url) if self.use_llm else None
+        self.extra_required_content = list(extra_required_content or [])
+        # 最近一次审核时全文的必含内容命中索引（供规则引擎复用）
+        self.content_index: Optional[KeywordHitIndex] = None
     
     def review_document(self, document_content: Dict, project_info: Optional[Dict] = None) -> Dict:
         """
@@ -36,28 +52,73 @@ class AIReviewer:
         Returns:
             审核结果
         """
+        return self.complete_review(self.analyze_document(document_content))
+    
+    def analyze_document(self, document_content: Dict) -> Dict:
+        """
+        文档完整性与各章节必含内容审核（不调用大语言模型，纯计算，可在子进程中执行）
+        
+        Returns:
+            {"completeness", "chapter_reviews", "llm_chapters": [(章节名, 章节内容, 要点库章节键)]}
+        """
         content = document_content.get("content", "")
-        chapters = document_content.get("chapters", [])
+        chapters = self._ensure_chapter_spans(content, document_content.get("chapters", []))
+        
+        # 扫描一次全文，建立全部必含内容的命中位置索引
+        self.content_index = self.build_content_index(content)
+        
+        # 章标题与必含章节一一对齐，完整性审核和各章节审核共用
+        alignment = self.chapter_aligner.align(chapters)
         
         # 1. 文档完整性审核
-        completeness_result = self._review_completeness(chapters)
+        completeness_result = self._review_completeness(chapters, alignment)
         
-        # 2. 各章节内容审核
-        chapter_reviews = []
-        for chapter in chapters:
+        # 2. 各章节内容审核（先精确匹配，未找到的必含内容全部章节一次性批量模糊匹配）
+        pending = []
+        for index, chapter in enumerate(chapters):
             chapter_name = chapter.get("title", "")
             chapter_content = self._extract_chapter_content(content, chapter)
-            review_result = self._review_chapter(chapter_name, chapter_content)
-            chapter_reviews.append(review_result)
+            span = (chapter["start"], chapter["end"]) if self._has_span(chapter, len(content)) else None
+            library_key = alignment.library_keys[index]
+            if library_key is None:
+                library_key = self.review_library.find_chapter_key(chapter_name)
+            missing = self._find_missing_items(chapter_content, span, library_key)
+            pending.append((chapter_name, chapter_content, library_key, missing))
+        
+        fuzzy_results = self._fuzzy_match([(missing, chapter_content)
+                                           for _, chapter_content, _, missing in pending])
+        chapter_reviews = [
+            self._build_chapter_review(chapter_name, library_key, missing, fuzzy_matches)
+            for (chapter_name, _, library_key, missing), fuzzy_matches in zip(pending, fuzzy_results)
+        ]
+        
+        return {
+            "completeness": completeness_result,
+            "chapter_reviews": chapter_reviews,
+            "llm_chapters": [(chapter_name, chapter_content, library_key)
+                             for chapter_name, chapter_content, library_key, _ in pending]
+        }
+    
+    def complete_review(self, analysis: Dict) -> Dict:
+        """
+        在analyze_document的结果上完成审核：大语言模型章节审核（I/O），综合评分并汇总问题和建议
+        """
+        completeness_result = analysis["completeness"]
+        chapter_reviews = analysis["chapter_reviews"]
         
-        # 3. 综合评分
+        # 3. 大语言模型审核（有审核要点的章节并发审核）
+        llm_review = None
+        if self.use_llm and REVIEW_CONFIG.get("enable_ai_review", True):
+            llm_review = self._review_chapters_with_llm(analysis["llm_chapters"], chapter_reviews)
+        
+        # 4. 综合评分
         score = self._calculate_score(completeness_result, chapter_reviews)
         
-        # 4. 汇总问题和建议
+        # 5. 汇总问题和建议
         issues = self._collect_issues(completeness_result, chapter_reviews)
         suggestions = self._collect_suggestions(completeness_result, chapter_reviews)
         
-        return {
+        result = {
             "score": score,
             "completeness": completeness_result,
             "chapter_reviews": chapter_reviews,
@@ -65,79 +126,131 @@ class AIReviewer:
             "suggestions": suggestions,
             "review_summary": self._generate_summary(score, issues, suggestions)
         }
+        if llm_review is not None:
+            result["llm_review"] = llm_review
+        return result
     
-    def _review_completeness(self, chapters: List[Dict]) -> Dict:
-        """审核文档完整性"""
-        required_chapters = self.review_library.get_review_points_by_chapter("文档完整性")
-        required_titles = required_chapters.get("必含章节", [])
-        
-        found_chapters = []
-        missing_chapters = []
-        
-        # 提取已找到的章节标题
-        chapter_titles = [ch.get("title", "") for ch in chapters]
-        
-        # 检查必含章节
-        for required in required_titles:
-            # 简化匹配：检查章节编号或关键词
-            found = False
-            for title in chapter_titles:
-                if self._match_chapter(required, title):
-                    found = True
-                    found_chapters.append(required)
-                    break
-            
-            if not found:
-                missing_chapters.append(required)
+    def _review_completeness(self, chapters: List[Dict],
+                             alignment: Optional[ChapterAlignment] = None) -> Dict:
+        """审核文档完整性（每个必含章节至多对应一个章，一个章也只计入一个必含章节）"""
+        if alignment is None:
+            alignment = self.chapter_aligner.align(chapters)
+        required_titles = alignment.required
         
         return {
-            "status": "通过" if len(missing_chapters) == 0 else "不通过",
-            "found_chapters": found_chapters,
-            "missing_chapters": missing_chapters,
-            "completeness_rate": len(found_chapters) / len(required_titles) if required_titles else 0
+            "status": "通过" if len(alignment.missing) == 0 else "不通过",
+            "found_chapters": alignment.found,
+            "missing_chapters": alignment.missing,
+            "completeness_rate": len(alignment.found) / len(required_titles) if required_titles else 0,
+            "alignment": alignment.to_list()
         }
     
     def _match_chapter(self, required: str, actual: str) -> bool:
         """匹配章节"""
-        # 提取章节编号
-        import re
-        required_num = re.search(r'(\d+)', required)
-        actual_num = re.search(r'(\d+)', actual)
-        
-        if required_num and actual_num:
-            return required_num.group(1) == actual_num.group(1)
+        return self.review_library.match_required_chapter(required, actual)
+    
+    def get_required_content_items(self) -> List[str]:
+        """收集审核要点库与额外规则中的全部必含内容"""
+        if not self.extra_required_content:
+            return list(self.review_library.required_content_items)
+        items = set(self.extra_required_content)
+        items.update(self.review_library.required_content_items)
+        return sorted(items)
+    
+    def build_content_index(self, content: str) -> KeywordHitIndex:
+        """
+        建立必含内容命中索引
         
-        # 关键词匹配
-        keywords = ["编制说明", "工程概况", "施工部署", "施工准备", "施工方法", 
-                   "进度计划", "资源配置", "质量保证", "安全保证", "文明施工", 
-                   "季节性", "应急预案", "附图"]
+        全部必含内容编译为一个共享的多模式自动机（按关键词集合版本缓存），
+        对全文只扫描一次，得到每个必含内容的全部出现位置。
+        """
+        automaton = get_shared_automaton(self.get_required_content_items())
+        return automaton.build_index(content)
+    
+    def _ensure_chapter_spans(self, content: str, chapters: List[Dict]) -> List[Dict]:
+        """
+        确保章节带有字符偏移
         
-        for keyword in keywords:
-            if keyword in required and keyword in actual:
-                return True
+        旧版本解析结果中的章节只有行号，此时基于正文重新识别一次章节结构。
+        """
+        if not chapters or not content:
+            return chapters
+        if all(self._has_span(ch, len(content)) for ch in chapters):
+            return chapters
         
-        return False
+        from app.services.document_parser.outline import extract_outline
+        return extract_outline(content)
+    
+    @staticmethod
+    def _has_span(chapter: Dict, content_length: int) -> bool:
+        """章节偏移是否有效"""
+        start = chapter.get("start")
+        end = chapter.get("end")
+        return isinstance(start, int) and isinstance(end, int) and 0 <= start <= end <= content_length
     
     def _extract_chapter_content(self, full_content: str, chapter: Dict) -> str:
-        """提取章节内容"""
-        # 简化实现：返回章节标题附近的内容
-        # 实际应该根据章节的行号范围提取
+        """
+        提取章节内容
+        
+        按章节的字符偏移 [start, end) 从全文切片，只复制该章节自身的正文；
+        没有偏移信息时退回到章节标题。
+        """
+        if self._has_span(chapter, len(full_content)):
+            return full_content[chapter["start"]:chapter["end"]]
         return chapter.get("title", "")
     
-    def _review_chapter(self, chapter_name: str, chapter_content: str) -> Dict:
-        """审核单个章节"""
-        # 获取该章节的审核要点
-        review_points = self.review_library.get_review_points_by_chapter(chapter_name)
-        
-        if not review_points:
-            # 尝试匹配章节
-            all_points = self.review_library.get_all_review_points()
-            for key, points in all_points.items():
-                if self._match_chapter_name(chapter_name, key):
-                    review_points = points
-                    break
-        
-        if not review_points:
+    def _review_chapter(self, chapter_name: str, chapter_content: str,
+                        span: Optional[tuple] = None, library_key: Optional[str] = None) -> Dict:
+        """
+        审核单个章节
+        
+        Args:
+            chapter_name: 章节名称
+            chapter_content: 章节正文
+            span: 章节在全文中的字符区间 (start, end)，有命中索引时据此判断必含内容
+            library_key: 章节对齐得到的要点库章节，未提供时按章节名称查找
+        """
+        # 获取该章节的审核要点（名称不完全一致时按关键词索引匹配）
+        if library_key is None:
+            library_key = self.review_library.find_chapter_key(chapter_name)
+        
+        missing = self._find_missing_items(chapter_content, span, library_key)
+        fuzzy_matches = self._fuzzy_match([(missing, chapter_content)])[0]
+        return self._build_chapter_review(chapter_name, library_key, missing, fuzzy_matches)
+    
+    def _find_missing_items(self, chapter_content: str, span: Optional[tuple],
+                            library_key: Optional[str]) -> List[tuple]:
+        """精确匹配未找到的必含内容：[(审核要点, 必含内容, 严重程度, 审核重点), ...]"""
+        if library_key is None:
+            return []
+        return [
+            (point_name, item, severity, review_focus)
+            for point_name, required_items, severity, review_focus in self.review_library.chapter_requirements[library_key]
+            for item in required_items
+            if not self._item_in_chapter(item, chapter_content, span)
+        ]
+    
+    def _fuzzy_match(self, requests: List[tuple]) -> List[Dict]:
+        """
+        批量查找未找到的必含内容的近似表述
+        
+        Args:
+            requests: [(精确匹配未找到的必含内容, 章节正文), ...]
+        
+        Returns:
+            与requests一一对应的 {必含内容: 最佳匹配}（未启用模糊匹配时均为空）
+        """
+        if self.fuzzy_matcher is None or not any(missing for missing, _ in requests):
+            return [{} for _ in requests]
+        return self.fuzzy_matcher.match_many([
+            ([item for _, item, _, _ in missing], chapter_content)
+            for missing, chapter_content in requests
+        ])
+    
+    def _build_chapter_review(self, chapter_name: str, library_key: Optional[str],
+                              missing: List[tuple], fuzzy_matches: Dict) -> Dict:
+        """由缺失的必含内容生成章节审核结果（近似匹配到的必含内容不计为问题）"""
+        if library_key is None:
             return {
                 "chapter_name": chapter_name,
                 "status": "未找到审核要点",
@@ -145,62 +258,82 @@ class AIReviewer:
                 "suggestions": []
             }
         
-        # 检查必含内容
         issues = []
         suggestions = []
+        for point_name, item, severity, review_focus in missing:
+            if item in fuzzy_matches:
+                continue
+            issue = {
+                "type": point_name,
+                "item": item,
+                "severity": severity,
+                "description": f"缺少必含内容：{item}",
+                "suggestion": review_focus
+            }
+            if severity == "严重":
+                issues.append(issue)
+            else:
+                suggestions.append(issue)
         
-        if isinstance(review_points, dict):
-            for point_name, point_config in review_points.items():
-                if isinstance(point_config, dict):
-                    required_items = point_config.get("必含内容", [])
-                    review_focus = point_config.get("审核重点", "")
-                    severity = point_config.get("严重程度", "一般")
-                    
-                    # 检查必含内容是否存在
-                    for item in required_items:
-                        if not self._check_content_exists(chapter_content, item):
-                            issue = {
-                                "type": point_name,
-                                "item": item,
-                                "severity": severity,
-                                "description": f"缺少必含内容：{item}",
-                                "suggestion": review_focus
-                            }
-                            if severity == "严重":
-                                issues.append(issue)
-                            else:
-                                suggestions.append(issue)
-        
-        return {
+        result = {
             "chapter_name": chapter_name,
             "status": "通过" if len(issues) == 0 else "不通过",
             "issues": issues,
             "suggestions": suggestions
         }
+        if fuzzy_matches:
+            # 近似匹配的必含内容及其最佳匹配句子，供人工复核
+            result["fuzzy_matches"] = [match.to_dict() for match in fuzzy_matches.values()]
+        return result
     
-    def _match_chapter_name(self, chapter_name: str, library_key: str) -> bool:
-        """匹配章节名称"""
-        keywords_map = {
-            "编制说明": ["编制", "说明"],
-            "工程概况": ["工程", "概况"],
-            "施工部署": ["施工", "部署"],
-            "施工准备": ["施工", "准备"],
-            "主要施工方法": ["施工", "方法", "技术"],
-            "施工进度计划": ["进度", "计划"],
-            "资源配置计划": ["资源", "配置"],
-            "质量保证措施": ["质量", "保证"],
-            "安全保证措施": ["安全", "保证"],
-            "文明施工环保": ["文明", "施工", "环保", "环境"],
-            "季节性施工措施": ["季节", "施工"],
-            "应急预案": ["应急", "预案"],
-            "附图附表": ["附图", "附表", "图表"]
-        }
+    def _review_chapters_with_llm(self, chapters: List[tuple], chapter_reviews: List[Dict]) -> Dict:
+        """
+        大语言模型并发审核各章节，审核意见并入对应的章节审核结果
         
-        if library_key in keywords_map:
-            keywords = keywords_map[library_key]
-            return all(kw in chapter_name for kw in keywords)
+        Args:
+            chapters: 与chapter_reviews一一对应的 [(章节名称, 章节正文, 要点库章节), ...]
+            chapter_reviews: 章节审核结果（原地追加审核意见）
         
-        return False
+        Returns:
+            LLM审核概况（模型、成功/失败章节数、耗时）
+        """
+        targets = [index for index, (_, _, library_key) in enumerate(chapters) if library_key is not None]
+        llm_result = self.llm_reviewer.review([
+            (chapters[index][0], chapters[index][1], self.review_library.chapter_requirements[chapters[index][2]])
+            for index in targets
+        ])
+        
+        for index, chapter_result in zip(targets, llm_result["chapters"]):
+            review = chapter_reviews[index]
+            review["llm_status"] = chapter_result["status"]
+            if chapter_result["error"]:
+                review["llm_error"] = chapter_result["error"]
+            for llm_issue in chapter_result["issues"]:
+                issue = {
+                    "type": "AI审核",
+                    "item": "",
+                    "severity": llm_issue["severity"],
+                    "description": llm_issue["description"],
+                    "suggestion": llm_issue["suggestion"]
+                }
+                if issue["severity"] == "严重":
+                    review["issues"].append(issue)
+                    review["status"] = "不通过"
+                else:
+                    review["suggestions"].append(issue)
+        
+        return {key: value for key, value in llm_result.items() if key != "chapters"}
+    
+    def _match_chapter_name(self, chapter_name: str, library_key: str) -> bool:
+        """匹配章节名称"""
+        return self.review_library.match_chapter_name(chapter_name, library_key)
+    
+    def _item_in_chapter(self, item: str, chapter_content: str, span: Optional[tuple]) -> bool:
+        """必含内容是否出现在章节内（优先查询命中索引，避免逐项扫描正文）"""
+        index = self.content_index
+        if span is not None and index is not None and index.covers(item):
+            return index.contains(item, span[0], span[1])
+        return self._check_content_exists(chapter_content, item)
     
     def _check_content_exists(self, content: str, keyword: str) -> bool:
         """检查内容是否存在"""
@@ -285,9 +418,7 @@ class AIReviewer:
             return ""
         
         try:
-            # 这里可以集成OpenAI、文心一言等API
-            # 示例代码（需要实际配置）
-            pass
+            return self.llm_reviewer.complete([{"role": "user", "content": prompt}])
         except Exception as e:
             print(f"LLM调用失败: {str(e)}")
             return ""
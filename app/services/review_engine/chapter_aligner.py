@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+章节对齐模块
+将文档的章标题与审核要点库的必含章节一一对应，供完整性检查和各章节审核共用
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from app.core.review_point_library import (
+    ReviewPointLibrary, COMPLETENESS_KEYWORDS, chapter_number, get_review_point_library
+)
+
+# 对齐得分：编号与关键词都一致 > 只有编号一致 > 只有关键词一致
+_SCORE_NUMBER_AND_KEYWORD = 3
+_SCORE_NUMBER = 2
+_SCORE_KEYWORD = 1
+
+
+class ChapterHeading:
+    """预处理后的章标题（编号、完整性关键词只解析一次）"""
+
+    __slots__ = ("index", "title", "number", "keywords")
+
+    def __init__(self, index: int, title: str):
+        self.index = index
+        self.title = title
+        self.number = chapter_number(title)
+        self.keywords = frozenset(kw for kw in COMPLETENESS_KEYWORDS if kw in title)
+
+
+class ChapterAlignment:
+    """
+    章节对齐结果
+
+    matches: 必含章节 -> 对应的章序号（chapters列表下标）
+    found / missing: 已找到与缺失的必含章节（按要点库顺序）
+    library_keys: 每个章对应的要点库章节（没有对应时为None）
+    """
+
+    def __init__(self, required: Tuple[str, ...], headings: List[ChapterHeading],
+                 matches: Dict[str, int], library_keys: List[Optional[str]]):
+        self.required = required
+        self.headings = headings
+        self.matches = matches
+        self.library_keys = library_keys
+        self.found = [title for title in required if title in matches]
+        self.missing = [title for title in required if title not in matches]
+
+    def matched_title(self, required: str) -> Optional[str]:
+        """必含章节对应的章标题"""
+        index = self.matches.get(required)
+        return self.headings[index].title if index is not None else None
+
+    def to_list(self) -> List[Dict]:
+        """对齐结果（可序列化）：[{"required", "chapter_index", "title"}, ...]"""
+        return [
+            {
+                "required": title,
+                "chapter_index": self.matches.get(title),
+                "title": self.matched_title(title)
+            }
+            for title in self.required
+        ]
+
+
+class ChapterAligner:
+    """
+    章节对齐器
+
+    每个章标题只解析一次编号与关键词，并按编号、关键词建立索引；
+    每个必含章节只从索引中取候选标题（判定规则与逐对匹配相同：双方都有编号时比较编号，
+    否则比较是否包含同一关键词），全部候选对按得分、标题顺序排序后贪心地一一分配，
+    总耗时与标题数、候选数近似线性。
+    """
+
+    def __init__(self, library: Optional[ReviewPointLibrary] = None):
+        self.library = library or get_review_point_library()
+
+    def align(self, chapters: List[Dict]) -> ChapterAlignment:
+        """对齐章节"""
+        library = self.library
+        headings = [ChapterHeading(index, chapter.get("title", "")) for index, chapter in enumerate(chapters)]
+
+        by_number: Dict[str, List[int]] = {}
+        by_keyword: Dict[str, List[int]] = {}
+        unnumbered_by_keyword: Dict[str, List[int]] = {}
+        for heading in headings:
+            if heading.number:
+                by_number.setdefault(heading.number, []).append(heading.index)
+            for keyword in heading.keywords:
+                by_keyword.setdefault(keyword, []).append(heading.index)
+                if not heading.number:
+                    unnumbered_by_keyword.setdefault(keyword, []).append(heading.index)
+
+        candidates: List[Tuple[int, int, int]] = []
+        for required_index, required in enumerate(library.required_chapters):
+            number = chapter_number(required)
+            keywords = library.required_chapter_keywords[required]
+            scores: Dict[int, int] = {}
+            if number:
+                for index in by_number.get(number, ()):
+                    shared = any(kw in headings[index].keywords for kw in keywords)
+                    scores[index] = _SCORE_NUMBER_AND_KEYWORD if shared else _SCORE_NUMBER
+                keyword_index = unnumbered_by_keyword
+            else:
+                keyword_index = by_keyword
+            for keyword in keywords:
+                for index in keyword_index.get(keyword, ()):
+                    scores.setdefault(index, _SCORE_KEYWORD)
+            candidates.extend((-score, index, required_index) for index, score in scores.items())
+
+        matches: Dict[str, int] = {}
+        used = set()
+        for _, index, required_index in sorted(candidates):
+            required = library.required_chapters[required_index]
+            if required in matches or index in used:
+                continue
+            matches[required] = index
+            used.add(index)
+
+        # 各章对应的要点库章节：优先按章节名称关键词查找，
+        # 找不到时沿用与之对齐且有共同关键词的必含章节
+        aligned_by_index = {index: required for required, index in matches.items()}
+        library_keys = []
+        for heading in headings:
+            key = library.find_chapter_key(heading.title)
+            if key is None and heading.index in aligned_by_index:
+                required = aligned_by_index[heading.index]
+                if heading.keywords & library.required_chapter_keywords[required]:
+                    key = library.required_chapter_library_keys.get(required)
+            library_keys.append(key)
+
+        return ChapterAlignment(library.required_chapters, headings, matches, library_keys)
+
+
+def align_chapters(chapters: List[Dict]) -> ChapterAlignment:
+    """对齐章节"""
+    return ChapterAligner().align(chapters)
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+必含内容模糊匹配模块
+基于字符n-gram哈希向量（NumPy/SciPy稀疏矩阵），离线判断必含内容是否以近似表述出现在章节中，
+如"应急组织机构"与"应急救援组织机构"
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# 分句符号（按分句比较，避免长句中零散的n-gram凑成高分）
+_SENTENCE_BREAKS = "。！？；，、：!?;,:\n"
+_BREAK_CODES = [ord(ch) for ch in _SENTENCE_BREAKS]
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class FuzzyMatch:
+    """一个必含内容的最佳匹配句子"""
+
+    def __init__(self, item: str, sentence: str, score: float, start: int, end: int):
+        self.item = item
+        self.sentence = sentence
+        self.score = score
+        self.start = start  # 句子在文本中的字符偏移 [start, end)
+        self.end = end
+
+    def to_dict(self) -> Dict:
+        return {
+            "item": self.item,
+            "sentence": self.sentence,
+            "score": round(self.score, 4),
+            "start": self.start,
+            "end": self.end
+        }
+
+
+class NgramMatcher:
+    """
+    字符n-gram模糊匹配器
+
+    文本按句切分，每句的字符n-gram经哈希映射为0/1稀疏向量；
+    全部待查必含内容与全部句子做一次稀疏矩阵乘法，
+    得分为必含内容的n-gram出现在该句中的比例（包含度），取得分最高的句子。
+    """
+
+    def __init__(self, n: int = 2, threshold: float = 0.75, min_grams: int = 3):
+        """
+        Args:
+            n: n-gram长度
+            threshold: 判定为匹配的最低得分
+            min_grams: 必含内容的n-gram数少于该值时不做模糊匹配（过短的内容容易误判）
+        """
+        import numpy  # noqa: F401  缺少依赖时在构建时报错
+        import scipy.sparse  # noqa: F401
+
+        self.n = n
+        self.threshold = threshold
+        self.min_grams = min_grams
+
+    def _gram_hashes(self, text: str, split_sentences: bool = True):
+        """
+        计算文本中每个字符n-gram的64位哈希（包含分句符号的n-gram丢弃）
+
+        Args:
+            text: 文本
+            split_sentences: 是否按分句符号分句；为False时只按换行分行（用于换行连接的必含内容）
+
+        Returns:
+            (n-gram哈希数组, n-gram所在句子序号数组, 句子起始偏移数组, 句子结束偏移数组)
+        """
+        import numpy as np
+
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        length = len(codes)
+        is_gap = np.isin(codes, _BREAK_CODES)
+        is_break = is_gap if split_sentences else codes == ord("\n")
+        # 每个字符所在句子的序号，以及每句的起止偏移
+        sentence_ids = np.cumsum(is_break) - is_break
+        break_positions = np.flatnonzero(is_break)
+        starts = np.concatenate(([0], break_positions + 1))
+        ends = np.concatenate((break_positions, [length]))
+
+        gram_count = max(length - self.n + 1, 0)
+        # 逐字符合并码位后乘以黄金分割常数打散（uint64溢出即取模）
+        hashes = codes[:gram_count].copy()
+        valid = ~is_gap[:gram_count]
+        for offset in range(1, self.n):
+            hashes = hashes * np.uint64(1000003) + codes[offset:offset + gram_count]
+            valid &= ~is_gap[offset:offset + gram_count]
+        hashes *= np.uint64(0x9E3779B97F4A7C15)
+        return hashes[valid], sentence_ids[:gram_count][valid], starts, ends
+
+    @staticmethod
+    def _binary_matrix(rows, columns, shape):
+        """由(行, 列)坐标构建0/1 CSR矩阵（重复坐标只计一次）"""
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        matrix = csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=shape)
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return matrix
+
+    def match(self, items: List[str], text: str) -> Dict[str, FuzzyMatch]:
+        """
+        在文本中查找必含内容的近似表述
+
+        Args:
+            items: 待查的必含内容（通常是精确匹配未找到的项）
+            text: 章节正文
+
+        Returns:
+            {必含内容: 最佳匹配}，只包含得分达到阈值的项
+        """
+        return self.match_many([(items, text)])[0]
+
+    def match_many(self, requests: List[Tuple[List[str], str]]) -> List[Dict[str, FuzzyMatch]]:
+        """
+        批量查找多个章节的必含内容近似表述
+
+        各章节正文以换行连接成一个文本统一计算n-gram；n-gram哈希与所属章节组合后作为向量维度，
+        章节之间的n-gram互不相交，全部章节只需一次稀疏矩阵乘法（结果按章节分块）。
+        只有必含内容中出现过的n-gram才影响得分，正文中其余n-gram直接丢弃。
+
+        Args:
+            requests: [(待查必含内容, 章节正文), ...]
+
+        Returns:
+            与requests一一对应的 {必含内容: 最佳匹配}
+        """
+        import numpy as np
+
+        results: List[Dict[str, FuzzyMatch]] = [{} for _ in requests]
+        min_length = self.min_grams + self.n - 1
+
+        # 参与匹配的 (章节序号, 必含内容)
+        rows: List[Tuple[int, str]] = []
+        texts: List[str] = []
+        text_groups: List[int] = []
+        for group, (items, text) in enumerate(requests):
+            candidates = [
+                item for item in dict.fromkeys(items)
+                if len(_WHITESPACE_RE.sub("", item)) >= min_length
+            ]
+            if candidates and text:
+                rows.extend((group, item) for item in candidates)
+                texts.append(text)
+                text_groups.append(group)
+        if not rows:
+            return results
+
+        # 必含内容向量：列为 (章节, n-gram哈希) 的组合键
+        item_hashes, item_rows, _, _ = self._gram_hashes(
+            "\n".join(_WHITESPACE_RE.sub("", item) for _, item in rows), split_sentences=False
+        )
+        item_groups = np.array([group for group, _ in rows], dtype=np.uint64)
+        item_keys = self._group_keys(item_hashes, item_groups[item_rows])
+        vocabulary, item_columns = np.unique(item_keys, return_inverse=True)
+        item_vectors = self._binary_matrix(item_rows, item_columns, (len(rows), len(vocabulary)))
+        gram_counts = np.diff(item_vectors.indptr)
+
+        # 句子向量：各章节正文以换行分隔，句子不会跨章节
+        joined = "\n".join(texts)
+        text_offsets = np.cumsum([0] + [len(text) + 1 for text in texts[:-1]])
+        text_hashes, sentence_rows, starts, ends = self._gram_hashes(joined)
+        sentence_texts = np.searchsorted(text_offsets, starts, side="right") - 1
+        sentence_groups = np.array(text_groups, dtype=np.uint64)[sentence_texts]
+        text_keys = self._group_keys(text_hashes, sentence_groups[sentence_rows])
+        columns = np.searchsorted(vocabulary, text_keys)
+        columns[columns == len(vocabulary)] = 0
+        known = vocabulary[columns] == text_keys
+        sentence_vectors = self._binary_matrix(sentence_rows[known], columns[known], (len(starts), len(vocabulary)))
+
+        # 共有n-gram数：必含内容 × 句子
+        overlap = (item_vectors @ sentence_vectors.T).tocsr()
+
+        for row, (group, item) in enumerate(rows):
+            begin, end = overlap.indptr[row], overlap.indptr[row + 1]
+            if gram_counts[row] < self.min_grams or begin == end:
+                continue
+            best = begin + int(np.argmax(overlap.data[begin:end]))
+            score = float(overlap.data[best]) / float(gram_counts[row])
+            if score >= self.threshold:
+                sentence = int(overlap.indices[best])
+                offset = int(text_offsets[sentence_texts[sentence]])
+                start, stop = int(starts[sentence]) - offset, int(ends[sentence]) - offset
+                text = requests[group][1]
+                results[group][item] = FuzzyMatch(item, text[start:stop].strip(), score, start, stop)
+        return results
+
+    @staticmethod
+    def _group_keys(hashes, groups):
+        """n-gram哈希与章节序号组合为新的64位键"""
+        import numpy as np
+
+        return hashes ^ ((groups + np.uint64(1)) * np.uint64(0xC2B2AE3D27D4EB4F))
+
+
+_matcher: Optional[NgramMatcher] = None
+_matcher_lock = threading.Lock()
+_matcher_unavailable = False
+
+
+def get_fuzzy_matcher() -> Optional[NgramMatcher]:
+    """
+    获取共享的模糊匹配器
+
+    未启用模糊匹配或未安装NumPy/SciPy时返回None（审核退回精确匹配）。
+    """
+    global _matcher, _matcher_unavailable
+    from config.config import REVIEW_CONFIG
+
+    if not REVIEW_CONFIG.get("enable_fuzzy_match", False) or _matcher_unavailable:
+        return None
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None and not _matcher_unavailable:
+                try:
+                    _matcher = NgramMatcher(
+                        n=REVIEW_CONFIG.get("fuzzy_ngram", 2),
+                        threshold=REVIEW_CONFIG.get("fuzzy_match_threshold", 0.75)
+                    )
+                except ImportError:
+                    _matcher_unavailable = True
+    return _matcher
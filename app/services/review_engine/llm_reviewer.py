@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+大语言模型章节审核模块
+各章节的审核请求在同一连接池上并发发送（并发数受限），总耗时取决于最慢的章节而不是各章节之和；
+单个章节失败（超时、重试后仍出错、响应无法解析）只记录在该章节，不影响其他章节
+"""
+
+import asyncio
+import json
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config.config import LLM_BASE_URL, LLM_REVIEW_CONFIG
+from app.services.llm.async_client import AsyncLLMClient
+from app.services.llm.common import LLMError
+from app.services.llm.response_cache import LLMResponseCache, get_llm_response_cache
+
+# 未配置LLM_BASE_URL时使用的接口地址
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+SYSTEM_PROMPT = "你是民航专业工程施工组织设计的审核专家，只根据给定的章节内容和审核要点提出审核意见。"
+
+_SEVERITIES = ("严重", "一般", "建议")
+
+
+class LLMChapterReviewer:
+    """大语言模型章节审核器"""
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None,
+                 config: Optional[Dict] = None, cache: Optional[LLMResponseCache] = None,
+                 use_cache: bool = True):
+        """
+        Args:
+            api_key: API密钥
+            model: 模型名称
+            base_url: OpenAI兼容接口地址，默认取LLM_BASE_URL
+            config: 覆盖LLM_REVIEW_CONFIG中的配置项
+            cache: 响应缓存，默认使用共享的响应缓存（未启用时不缓存）
+            use_cache: 为False时不读写响应缓存
+        """
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url or LLM_BASE_URL or DEFAULT_BASE_URL
+        self.config = {**LLM_REVIEW_CONFIG, **(config or {})}
+        self.cache = (cache if cache is not None else get_llm_response_cache()) if use_cache else None
+
+    def _create_client(self) -> AsyncLLMClient:
+        config = self.config
+        return AsyncLLMClient(
+            self.base_url, self.api_key, self.model,
+            max_concurrency=config["max_concurrency"],
+            timeout=config["timeout_seconds"],
+            max_retries=config["max_retries"],
+            retry_base_delay=config["retry_base_delay"],
+            retry_max_delay=config["retry_max_delay"],
+            cache=self.cache
+        )
+
+    def build_messages(self, chapter_name: str, chapter_content: str,
+                       requirements: Tuple[tuple, ...]) -> List[Dict]:
+        """
+        构建章节审核消息
+
+        Args:
+            chapter_name: 章节名称
+            chapter_content: 章节正文（超出max_chapter_chars的部分截断）
+            requirements: 要点库中该章节的审核要点 ((要点名称, 必含内容, 严重程度, 审核重点), ...)
+        """
+        points = "\n".join(
+            f"- {point_name}（{severity}）：{review_focus}；必含内容：{'、'.join(items)}"
+            for point_name, items, severity, review_focus in requirements
+        ) or "- 内容完整、措施具体可行"
+        max_chars = self.config["max_chapter_chars"]
+        if len(chapter_content) > max_chars:
+            chapter_content = chapter_content[:max_chars] + "\n（以下内容省略）"
+
+        prompt = f"""请审核施工组织设计中的以下章节。
+
+章节名称：{chapter_name}
+审核要点：
+{points}
+
+章节内容：
+{chapter_content}
+
+请按照以下JSON格式输出审核意见，没有问题时issues为空数组，只输出JSON，不要其他文字说明：
+{{"issues": [{{"description": "问题描述", "severity": "严重/一般/建议", "suggestion": "修改建议"}}]}}"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def parse_response(text: str) -> List[Dict]:
+        """
+        解析审核意见
+
+        Raises:
+            ValueError: 响应中没有可解析的JSON
+        """
+        match = re.search(r"\{.*\}", text, re.DOTALL)
+        if not match:
+            raise ValueError("响应中没有JSON对象")
+        data = json.loads(match.group(0))
+        issues = []
+        for issue in data.get("issues", []) if isinstance(data, dict) else []:
+            if not isinstance(issue, dict) or not issue.get("description"):
+                continue
+            severity = issue.get("severity", "一般")
+            issues.append({
+                "description": str(issue["description"]),
+                "severity": severity if severity in _SEVERITIES else "一般",
+                "suggestion": str(issue.get("suggestion", ""))
+            })
+        return issues
+
+    async def areview(self, chapters: List[Tuple[str, str, Tuple[tuple, ...]]]) -> Dict:
+        """
+        并发审核各章节
+
+        Args:
+            chapters: [(章节名称, 章节正文, 审核要点), ...]
+
+        Returns:
+            {"model", "chapters": [每章 {"status", "issues", "error"}], "succeeded", "failed",
+             "cache_hits", "cache_misses", "elapsed_seconds"}
+        """
+        started = time.perf_counter()
+        requests = [self.build_messages(*chapter) for chapter in chapters]
+        params = {"temperature": self.config["temperature"], "max_tokens": self.config["max_tokens"]}
+        async with self._create_client() as client:
+            responses = await client.chat_many(requests, **params)
+
+            results = []
+            for messages, response in zip(requests, responses):
+                if isinstance(response, LLMError):
+                    results.append({"status": "失败", "issues": [], "error": str(response)})
+                    continue
+                try:
+                    results.append({"status": "完成", "issues": self.parse_response(response), "error": None})
+                except ValueError as e:
+                    client.forget(messages, **params)
+                    results.append({"status": "失败", "issues": [], "error": f"无法解析审核意见: {e}"})
+
+        succeeded = sum(1 for result in results if result["status"] == "完成")
+        return {
+            "model": self.model,
+            "chapters": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "cache_hits": client.cache_hits,
+            "cache_misses": client.cache_misses,
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        }
+
+    def review(self, chapters: List[Tuple[str, str, Tuple[tuple, ...]]]) -> Dict:
+        """并发审核各章节（同步调用，在当前线程新建事件循环，不能在运行中的事件循环内调用）"""
+        return asyncio.run(self.areview(chapters))
+
+    def complete(self, messages: List[Dict]) -> str:
+        """单次调用模型（同步）"""
+        async def call():
+            async with self._create_client() as client:
+                return await client.chat(messages, temperature=self.config["temperature"],
+                                         max_tokens=self.config["max_tokens"])
+
+        return asyncio.run(call())
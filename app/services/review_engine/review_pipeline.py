@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+文档审核计算阶段
+关键词索引、完整性与章节必含内容审核、重大隐患预警、规则引擎匹配都是纯计算，
+集中在一个模块级函数中，便于提交到计算进程池执行（参数与返回值均可pickle）
+"""
+
+from typing import Dict, Optional
+
+from app.models.database import SessionLocal
+from app.services.review_engine.ai_reviewer import AIReviewer
+from app.services.rule_engine.ruleset_cache import get_ruleset_cache, sync_ruleset_version
+
+
+def analyze_document_for_review(document_content: Dict, standard_id: Optional[int],
+                                ruleset_version: int, include_llm_chapters: bool = False) -> Dict:
+    """
+    执行审核的计算阶段
+
+    规则集由执行进程自己的规则集缓存提供（按主进程传入的版本号失效），不在进程间传递编译结果。
+
+    Args:
+        document_content: 解析后的文档内容（content、chapters）
+        standard_id: 使用该规范的规则（以及通用规则）
+        ruleset_version: 主进程当前的规则集版本号
+        include_llm_chapters: 是否返回大语言模型审核需要的各章节内容
+
+    Returns:
+        {"analysis": AIReviewer.analyze_document的结果, "hazard_alerts", "rule_results", "rule_timings"}
+    """
+    sync_ruleset_version(ruleset_version)
+    db = SessionLocal()
+    try:
+        cached_ruleset = get_ruleset_cache().get(db, standard_id)
+    finally:
+        db.close()
+
+    content = document_content.get("content", "")
+    ai_reviewer = AIReviewer(extra_required_content=cached_ruleset.index_keywords)
+    analysis = ai_reviewer.analyze_document(document_content)
+    if not include_llm_chapters:
+        analysis["llm_chapters"] = []
+
+    # 重大隐患预警与规则引擎复用全文关键词索引，不再扫描全文
+    hazard_alerts = cached_ruleset.hazard_pack.evaluate(content, content_index=ai_reviewer.content_index)
+    rule_results, rule_timings = cached_ruleset.engine.check_rules_with_timings(
+        content,
+        document_content.get("chapters", []),
+        content_index=ai_reviewer.content_index
+    )
+
+    return {
+        "analysis": analysis,
+        "hazard_alerts": hazard_alerts,
+        "rule_results": rule_results,
+        "rule_timings": rule_timings
+    }
@@ -4,8 +4,10 @@
 基于配置的规则进行审核
 """
 
-from typing import Dict, List, Any
-import re
+from typing import Dict, List, Any, Optional
+
+from app.core.keyword_automaton import KeywordHitIndex
+from app.services.rule_engine.ruleset import RuleSet
 
 
 class RuleEngine:
@@ -13,6 +15,10 @@ class RuleEngine:
     
     def __init__(self):
         self.rules = []
+        # 规则版本号：规则增删时递增，编译结果按版本缓存
+        self.version = 0
+        self._ruleset: Optional[RuleSet] = None
+        self.last_timings: List[Dict] = []
         self.load_default_rules()
     
     def load_default_rules(self):
@@ -47,82 +53,55 @@ class RuleEngine:
                 "description": "必须包含重大危险源管理内容"
             }
         ]
+        self.version += 1
     
     def add_rule(self, rule: Dict):
         """添加规则"""
         self.rules.append(rule)
+        self.version += 1
+    
+    def load_rules(self, rules: List[Dict]):
+        """批量加载规则（追加在默认规则之后，按传入顺序评估）"""
+        self.rules.extend(rules)
+        self.version += 1
     
     def remove_rule(self, rule_name: str):
         """移除规则"""
         self.rules = [r for r in self.rules if r.get("name") != rule_name]
+        self.version += 1
     
-    def check_rules(self, content: str, chapters: List[Dict] = None) -> List[Dict]:
+    def compile(self) -> RuleSet:
+        """编译当前规则（规则未变更时复用上次的编译结果）"""
+        if self._ruleset is None or self._ruleset.version != self.version:
+            self._ruleset = RuleSet(self.rules, version=self.version)
+        return self._ruleset
+    
+    def check_rules(self, content: str, chapters: List[Dict] = None,
+                    content_index: Optional[KeywordHitIndex] = None) -> List[Dict]:
         """
         检查规则
         
         Args:
             content: 文档内容
             chapters: 章节列表
+            content_index: 必含内容命中索引（由AIReviewer对全文扫描一次得到），
+                规则的必含内容优先从索引中查询
             
         Returns:
-            检查结果列表
+            检查结果列表（每条规则的耗时记录在last_timings中）
         """
-        results = []
-        
-        for rule in self.rules:
-            if rule.get("type") == "内容检查":
-                result = self._check_content_rule(rule, content)
-                if result:
-                    results.append(result)
-            elif rule.get("type") == "章节检查":
-                result = self._check_chapter_rule(rule, chapters or [])
-                if result:
-                    results.append(result)
-        
+        results, self.last_timings = self.check_rules_with_timings(content, chapters, content_index)
         return results
     
-    def _check_content_rule(self, rule: Dict, content: str) -> Dict:
-        """检查内容规则"""
-        pattern = rule.get("pattern", "")
-        if not pattern:
-            return None
-        
-        match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
-        
-        if not match:
-            return {
-                "rule_name": rule.get("name"),
-                "status": "不通过",
-                "severity": rule.get("severity", "一般"),
-                "description": rule.get("description", ""),
-                "suggestion": f"请检查是否包含：{rule.get('description', '')}"
-            }
-        
-        return None
-    
-    def _check_chapter_rule(self, rule: Dict, chapters: List[Dict]) -> Dict:
-        """检查章节规则"""
-        pattern = rule.get("pattern", "")
-        if not pattern:
-            return None
-        
-        found = False
-        for chapter in chapters:
-            title = chapter.get("title", "")
-            if re.search(pattern, title, re.IGNORECASE):
-                found = True
-                break
-        
-        if not found:
-            return {
-                "rule_name": rule.get("name"),
-                "status": "不通过",
-                "severity": rule.get("severity", "一般"),
-                "description": rule.get("description", ""),
-                "suggestion": f"请添加章节：{rule.get('description', '')}"
-            }
+    def check_rules_with_timings(self, content: str, chapters: List[Dict] = None,
+                                 content_index: Optional[KeywordHitIndex] = None):
+        """
+        检查规则并返回每条规则的耗时（不修改引擎状态，可在多个请求间共享同一引擎）
         
-        return None
+        Returns:
+            (检查结果列表, 每条规则的耗时统计)
+        """
+        return self.compile().evaluate(content, chapters, content_index)
     
     def get_active_rules(self) -> List[Dict]:
         """获取所有激活的规则"""
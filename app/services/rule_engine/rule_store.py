@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+规则存储模块
+AI生成规则按规则指纹写入：同一规范下指纹相同的规则更新原记录，
+整批规则用一条 INSERT ... ON CONFLICT DO UPDATE ... RETURNING 语句写入（SQLite/PostgreSQL）
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.database import ReviewRule
+
+_FINGERPRINT_STRIP_RE = re.compile(r"[\s，。、；：,.;:！!？?（）()\[\]【】“”\"'《》<>]+")
+
+# 重新生成时用新结果覆盖的字段（启用状态、优先级等人工设置保持不变）
+_UPSERT_FIELDS = ("rule_name", "rule_type", "rule_content", "rule_pattern", "required_content",
+                  "review_focus", "severity", "is_ai_generated", "ai_model", "update_time")
+
+
+def _normalize_text(value) -> str:
+    """指纹用的文本规范化：全角转半角、转小写、去掉空白与标点"""
+    text = unicodedata.normalize("NFKC", str(value or "")).lower()
+    return _FINGERPRINT_STRIP_RE.sub("", text)
+
+
+def normalized_required_content(rule: Dict) -> List[str]:
+    """规范化、去重并排序后的必含内容"""
+    items = rule.get("required_content") or []
+    if isinstance(items, str):
+        items = [items]
+    return sorted({_normalize_text(item) for item in items} - {""})
+
+
+def rule_fingerprint(rule: Dict) -> str:
+    """
+    规则指纹：规范化后的规则名称、类型、匹配模式与必含内容（与顺序无关）的SHA-256
+
+    仅空白、标点、全半角或必含内容顺序不同的规则指纹相同。
+    """
+    parts = [
+        _normalize_text(rule.get("rule_name")),
+        _normalize_text(rule.get("rule_type")),
+        re.sub(r"\s+", "", str(rule.get("rule_pattern") or "")),
+        "\x1f".join(normalized_required_content(rule)),
+    ]
+    return hashlib.sha256("\x1e".join(parts).encode("utf-8")).hexdigest()
+
+
+def _dialect_insert(db: Session):
+    """当前数据库方言的insert（支持on_conflict_do_update）"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise ValueError(f"不支持批量写入规则的数据库: {dialect}")
+    return insert
+
+
+def upsert_generated_rules(db: Session, standard_id: int, rules: List[Dict], ai_model: str) -> List[Dict]:
+    """
+    批量写入AI生成的规则（幂等，调用方负责提交事务）
+
+    按 (standard_id, rule_fingerprint) 唯一索引冲突时更新已有规则，
+    同一批中指纹相同的规则只写第一条；一次数据库往返写入整批并返回规则ID，不逐条刷新。
+
+    Args:
+        db: 数据库会话
+        standard_id: 规范ID
+        rules: 规则字典列表（AIRuleGenerator生成的格式）
+        ai_model: 使用的模型
+
+    Returns:
+        已写入的规则（含id），按输入顺序
+    """
+    now = datetime.now()
+    rows: Dict[str, Dict] = {}
+    for rule_data in rules:
+        fingerprint = rule_fingerprint(rule_data)
+        if fingerprint in rows:
+            continue
+        rows[fingerprint] = {
+            "standard_id": standard_id,
+            "rule_fingerprint": fingerprint,
+            "rule_name": rule_data.get("rule_name", ""),
+            "rule_type": rule_data.get("rule_type", "内容检查"),
+            "rule_content": json.dumps(rule_data, ensure_ascii=False),
+            "rule_pattern": rule_data.get("rule_pattern", ""),
+            "required_content": rule_data.get("required_content", []),
+            "review_focus": rule_data.get("review_focus", ""),
+            "severity": rule_data.get("severity", "一般"),
+            "priority": 0,
+            "is_active": True,
+            "is_ai_generated": True,
+            "ai_model": ai_model,
+            "create_time": now,
+            "update_time": now
+        }
+    if not rows:
+        return []
+
+    # 同一批规则属于同一规范，按指纹对应ID
+    ids = upsert_rule_rows(db, list(rows.values()), _UPSERT_FIELDS)
+    return [dict(row, id=ids[(standard_id, fingerprint)]) for fingerprint, row in rows.items()]
+
+
+def upsert_rule_rows(db: Session, rows: List[Dict], update_fields) -> Dict[Tuple[Optional[int], str], int]:
+    """
+    用一条 INSERT ... ON CONFLICT DO UPDATE ... RETURNING 语句写入规则行
+
+    Args:
+        db: 数据库会话
+        rows: 规则列字典（须含standard_id与rule_fingerprint，同一批内 (standard_id, rule_fingerprint) 不重复）
+        update_fields: 与已有规则冲突时用新值覆盖的字段
+
+    Returns:
+        (standard_id, rule_fingerprint) -> 规则ID
+    """
+    insert = _dialect_insert(db)
+    statement = insert(ReviewRule).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ReviewRule.standard_id, ReviewRule.rule_fingerprint],
+        set_={field: getattr(statement.excluded, field) for field in update_fields}
+    ).returning(ReviewRule.id, ReviewRule.standard_id, ReviewRule.rule_fingerprint)
+    # RETURNING的行序不保证与VALUES一致，按 (规范ID, 指纹) 对应
+    return {
+        (standard_id, fingerprint): rule_id
+        for rule_id, standard_id, fingerprint in db.execute(statement)
+    }
+
+
+def backfill_rule_fingerprints(db: Session) -> Dict:
+    """
+    为旧版本写入的AI生成规则补算指纹（启动时调用）
+
+    同一规范下指纹相同的旧规则只保留ID最小的一条，其余删除（它们是历次重新生成追加的重复规则）。
+
+    Returns:
+        {"fingerprinted": 补算指纹的规则数, "deleted": 删除的重复规则数}
+    """
+    legacy = db.query(ReviewRule).filter(
+        ReviewRule.is_ai_generated == True,
+        ReviewRule.rule_fingerprint.is_(None),
+        ReviewRule.standard_id.isnot(None)
+    ).order_by(ReviewRule.id).all()
+    if not legacy:
+        return {"fingerprinted": 0, "deleted": 0}
+
+    taken = {
+        (standard_id, fingerprint)
+        for standard_id, fingerprint in db.query(ReviewRule.standard_id, ReviewRule.rule_fingerprint).filter(
+            ReviewRule.rule_fingerprint.isnot(None)
+        )
+    }
+    updates, duplicates = [], []
+    for rule in legacy:
+        key = (rule.standard_id, rule_fingerprint({
+            "rule_name": rule.rule_name,
+            "rule_type": rule.rule_type,
+            "rule_pattern": rule.rule_pattern,
+            "required_content": rule.required_content
+        }))
+        if key in taken:
+            duplicates.append(rule.id)
+        else:
+            taken.add(key)
+            updates.append({"id": rule.id, "rule_fingerprint": key[1]})
+
+    if updates:
+        db.bulk_update_mappings(ReviewRule, updates)
+    if duplicates:
+        db.query(ReviewRule).filter(ReviewRule.id.in_(duplicates)).delete(synchronize_session=False)
+    db.commit()
+    return {"fingerprinted": len(updates), "deleted": len(duplicates)}
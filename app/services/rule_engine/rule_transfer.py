@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+规则JSONL导入导出模块
+导出时按服务端游标分批读取规则，逐行输出JSONL；导入时逐行解析校验（预编译匹配模式），
+按批写入，整个导入在一个事务中完成，按规则指纹更新已有规则，重复导入不产生重复规则
+"""
+
+import json
+import re
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config.config import RULE_ENGINE_CONFIG, RULE_TRANSFER_CONFIG
+from app.models.database import SessionLocal, ReviewRule, ReviewStandard
+from app.services.rule_engine.ruleset import CompiledRule
+from app.services.rule_engine.rule_store import rule_fingerprint, upsert_rule_rows
+from app.services.hazard_library.hazard_pack import HAZARD_RULE_TYPE
+
+# 导出/导入的规则字段（规范以名称关联，不同实例的规范ID不一致）
+RULE_EXPORT_FIELDS = (
+    "rule_name", "rule_type", "rule_pattern", "required_content", "review_focus", "severity",
+    "priority", "is_active", "is_ai_generated", "ai_model", "rule_content"
+)
+
+SEVERITY_LEVELS = ("严重", "一般", "建议")
+
+# 导入时与已有规则指纹相同时覆盖的字段
+_IMPORT_UPDATE_FIELDS = RULE_EXPORT_FIELDS + ("update_time",)
+
+# 导出时每次输出的数据块大小（字节）
+_EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+class RuleImportError(ValueError):
+    """导入的规则行无效"""
+
+    def __init__(self, line_no: int, message: str):
+        super().__init__(f"第{line_no}行: {message}")
+        self.line_no = line_no
+        self.message = message
+
+
+def iter_rules_jsonl(standard_id: Optional[int] = None, yield_per: Optional[int] = None) -> Iterator[bytes]:
+    """
+    以JSONL格式导出规则（重大隐患规则由隐患数据库导入，不在导出范围内）
+
+    使用独立的数据库会话与服务端游标（yield_per），每次只读取一批行，不把整张表载入内存；
+    输出按约64KB合并为数据块。
+
+    Args:
+        standard_id: 只导出该规范的规则，为空时导出全部
+        yield_per: 每批读取的行数，默认读取RULE_TRANSFER_CONFIG
+    """
+    columns = [getattr(ReviewRule, field) for field in RULE_EXPORT_FIELDS]
+    statement = select(ReviewStandard.name, *columns).outerjoin(
+        ReviewStandard, ReviewRule.standard_id == ReviewStandard.id
+    ).where(
+        (ReviewRule.rule_type != HAZARD_RULE_TYPE) | (ReviewRule.rule_type.is_(None))
+    ).order_by(ReviewRule.id)
+    if standard_id is not None:
+        statement = statement.where(ReviewRule.standard_id == standard_id)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(
+            yield_per=yield_per or RULE_TRANSFER_CONFIG["export_yield_per"]
+        ))
+        buffer: List[bytes] = []
+        size = 0
+        for row in result:
+            record = {"standard_name": row[0]}
+            record.update(zip(RULE_EXPORT_FIELDS, row[1:]))
+            line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+            buffer.append(line)
+            size += len(line)
+            if size >= _EXPORT_CHUNK_BYTES:
+                yield b"".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield b"".join(buffer)
+    finally:
+        db.close()
+
+
+class RuleImporter:
+    """
+    规则JSONL导入器
+
+    add_line逐行解析校验，攒满一批后由flush写入（一条INSERT ... ON CONFLICT语句）；
+    add_lines解析一组行并在攒满时写入（供接口整组提交到线程池执行）；
+    finish写入剩余规则并提交事务。出错时调用方回滚，已写入的批次一并撤销。
+    """
+
+    def __init__(self, db: Session, standard_id: Optional[int] = None, skip_invalid: bool = False,
+                 batch_size: Optional[int] = None):
+        """
+        Args:
+            db: 数据库会话
+            standard_id: 导入到该规范（忽略各行的standard_name）；为空时按standard_name匹配已有规范
+            skip_invalid: 为真时跳过无效行并在结果中列出，否则遇到无效行抛出RuleImportError
+            batch_size: 每批写入的规则数，默认读取RULE_TRANSFER_CONFIG
+        """
+        self.db = db
+        self.standard_id = standard_id
+        self.skip_invalid = skip_invalid
+        self.batch_size = batch_size or RULE_TRANSFER_CONFIG["import_batch_size"]
+        self.pending: Dict[Tuple[Optional[int], str], Dict] = {}
+        self.lines = 0
+        self.imported = 0
+        self.batches = 0
+        self.errors: List[Dict] = []
+        self.error_count = 0
+        self._standards: Dict[str, Optional[int]] = {}
+        # 未关联规范的规则不受唯一索引约束（NULL互不相等），按已有指纹更新
+        self._global_rules: Dict[str, int] = {
+            fingerprint: rule_id
+            for rule_id, fingerprint in db.query(ReviewRule.id, ReviewRule.rule_fingerprint).filter(
+                ReviewRule.standard_id.is_(None), ReviewRule.rule_fingerprint.isnot(None)
+            )
+        }
+        self._window = RULE_ENGINE_CONFIG["proximity_window"]
+        self._time_budget_ms = RULE_ENGINE_CONFIG["match_time_budget_ms"]
+
+    @property
+    def batch_full(self) -> bool:
+        return len(self.pending) >= self.batch_size
+
+    def add_line(self, line_no: int, line: str):
+        """
+        解析并校验一行，有效的规则加入待写入批次（空行忽略）
+
+        Raises:
+            RuleImportError: 行无效且skip_invalid为假
+        """
+        if not line.strip():
+            return
+        self.lines += 1
+        try:
+            row = self._parse_line(line_no, line)
+        except RuleImportError as e:
+            if not self.skip_invalid:
+                raise
+            self.error_count += 1
+            if len(self.errors) < RULE_TRANSFER_CONFIG["max_reported_errors"]:
+                self.errors.append({"line": e.line_no, "error": e.message})
+            return
+        # 同一批内指纹相同的规则以后出现的为准
+        self.pending[(row["standard_id"], row["rule_fingerprint"])] = row
+
+    def add_lines(self, lines: List[Tuple[int, str]]):
+        """
+        解析并校验一组行，攒满一批即写入（JSON解析、校验、预编译与写入都在调用线程中执行）
+
+        Raises:
+            RuleImportError: 行无效且skip_invalid为假
+        """
+        for line_no, line in lines:
+            self.add_line(line_no, line)
+            if self.batch_full:
+                self.flush()
+
+    def _resolve_standard(self, line_no: int, record: Dict) -> Optional[int]:
+        if self.standard_id is not None:
+            return self.standard_id
+        name = record.get("standard_name")
+        if not name:
+            return None
+        if name not in self._standards:
+            standard = self.db.query(ReviewStandard.id).filter(
+                ReviewStandard.name == name
+            ).order_by(ReviewStandard.id.desc()).first()
+            self._standards[name] = standard[0] if standard else None
+        if self._standards[name] is None:
+            raise RuleImportError(line_no, f"审核规范不存在: {name}")
+        return self._standards[name]
+
+    def _parse_line(self, line_no: int, line: str) -> Dict:
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise RuleImportError(line_no, f"JSON格式错误: {str(e)}")
+        if not isinstance(record, dict):
+            raise RuleImportError(line_no, "每行须为一个JSON对象")
+
+        rule_name = record.get("rule_name")
+        if not isinstance(rule_name, str) or not rule_name.strip() or len(rule_name) > 200:
+            raise RuleImportError(line_no, "rule_name须为1-200个字符的字符串")
+        rule_type = record.get("rule_type") or "内容检查"
+        if not isinstance(rule_type, str) or len(rule_type) > 50:
+            raise RuleImportError(line_no, "rule_type须为不超过50个字符的字符串")
+        if rule_type == HAZARD_RULE_TYPE:
+            raise RuleImportError(line_no, "重大隐患规则请通过隐患数据库导入")
+        severity = record.get("severity") or "一般"
+        if severity not in SEVERITY_LEVELS:
+            raise RuleImportError(line_no, f"severity须为{'/'.join(SEVERITY_LEVELS)}之一")
+        required_content = record.get("required_content") or []
+        if isinstance(required_content, str):
+            required_content = [required_content]
+        if not isinstance(required_content, list) or not all(isinstance(item, str) for item in required_content):
+            raise RuleImportError(line_no, "required_content须为字符串数组")
+        rule_pattern = record.get("rule_pattern") or ""
+        if not isinstance(rule_pattern, str) or len(rule_pattern) > 500:
+            raise RuleImportError(line_no, "rule_pattern须为不超过500个字符的字符串")
+        priority = record.get("priority", 0)
+        if isinstance(priority, bool) or not isinstance(priority, int):
+            raise RuleImportError(line_no, "priority须为整数")
+
+        # 与规则引擎相同的方式预编译匹配模式（含安全检查：嵌套量词、多个.*?等有回溯风险的模式），
+        # 无效或有回溯风险的模式不导入
+        try:
+            CompiledRule({"name": rule_name, "type": rule_type, "pattern": rule_pattern},
+                         self._window, self._time_budget_ms)
+        except re.error as e:
+            raise RuleImportError(line_no, f"rule_pattern无效: {str(e)}")
+
+        rule_content = record.get("rule_content") or ""
+        if not isinstance(rule_content, str):
+            rule_content = json.dumps(rule_content, ensure_ascii=False)
+        row = {
+            "standard_id": self._resolve_standard(line_no, record),
+            "rule_name": rule_name,
+            "rule_type": rule_type,
+            "rule_content": rule_content,
+            "rule_pattern": rule_pattern,
+            "required_content": required_content,
+            "review_focus": str(record.get("review_focus") or ""),
+            "severity": severity,
+            "priority": priority,
+            "is_active": bool(record.get("is_active", True)),
+            "is_ai_generated": bool(record.get("is_ai_generated", False)),
+            "ai_model": record.get("ai_model")
+        }
+        row["rule_fingerprint"] = rule_fingerprint(row)
+        return row
+
+    def flush(self):
+        """写入待写入批次（不提交）"""
+        if not self.pending:
+            return
+        now = datetime.now()
+        inserts, updates = [], []
+        for (standard_id, fingerprint), row in self.pending.items():
+            row.update(update_time=now)
+            existing_id = self._global_rules.get(fingerprint) if standard_id is None else None
+            if existing_id is not None:
+                updates.append(dict(row, id=existing_id))
+            else:
+                inserts.append(dict(row, create_time=now))
+        if inserts:
+            ids = upsert_rule_rows(self.db, inserts, _IMPORT_UPDATE_FIELDS)
+            for (standard_id, fingerprint), rule_id in ids.items():
+                if standard_id is None:
+                    self._global_rules[fingerprint] = rule_id
+        if updates:
+            self.db.bulk_update_mappings(ReviewRule, updates)
+        self.imported += len(self.pending)
+        self.batches += 1
+        self.pending = {}
+
+    def finish(self) -> Dict:
+        """
+        写入剩余规则并提交事务
+
+        Returns:
+            导入统计
+        """
+        self.flush()
+        self.db.commit()
+        return {
+            "lines": self.lines,
+            "imported": self.imported,
+            "batches": self.batches,
+            "skipped": self.error_count,
+            "errors": self.errors
+        }
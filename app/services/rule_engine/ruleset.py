@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+规则集编译模块
+将规则预编译为匹配器，限定匹配范围与耗时，避免正则回溯拖垮长文档审核
+"""
+
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import re._parser as sre_parse
+    import re._compiler as sre_compile
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_compile
+
+from config.config import RULE_ENGINE_CONFIG
+from app.core.keyword_automaton import KeywordHitIndex
+
+# 不含正则元字符的字面量
+_LITERAL = r"[^.^$*+?{}\[\]\\|()]+"
+
+# "锚点.*?关键词" / "锚点.*?(关键词1|关键词2)" 形式的模式
+_PROXIMITY_PATTERN_RE = re.compile(
+    rf"^(?P<anchor>{_LITERAL})\.\*\??"
+    rf"(?:\((?:\?:)?(?P<alternatives>{_LITERAL}(?:\|{_LITERAL})*)\)|(?P<keyword>{_LITERAL}))$"
+)
+
+_REPEAT_OPCODES = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+
+# 一个模式中最多允许的不定长通配量词数（.*、.+、[^。]* 等）
+_MAX_UNBOUNDED_WILDCARDS = 1
+
+
+def _has_nested_repeat(parsed, inside_repeat: bool = False) -> bool:
+    """
+    检测灾难性回溯风险：可重复多次的分组内部又包含可重复多次的量词（如 (a+)+、(?:a*b)*）
+
+    量词内的字面量分支（如 (?:安全|质量)+）不视为风险。
+    """
+    for op, value in parsed:
+        if op in _REPEAT_OPCODES:
+            _, max_count, item = value
+            repeats = max_count is sre_parse.MAXREPEAT or max_count > 1
+            if repeats and inside_repeat:
+                return True
+            if _has_nested_repeat(item, inside_repeat or repeats):
+                return True
+        elif op == sre_parse.BRANCH:
+            if any(_has_nested_repeat(branch, inside_repeat) for branch in value[1]):
+                return True
+        elif op == sre_parse.SUBPATTERN:
+            if _has_nested_repeat(value[-1], inside_repeat):
+                return True
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if _has_nested_repeat(value[1], inside_repeat):
+                return True
+    return False
+
+
+def _is_wildcard(item) -> bool:
+    """量词的对象是否为通配内容：任意字符（.）、排除型字符集（[^。]）"""
+    if len(item) != 1:
+        return False
+    op, value = item[0]
+    if op in (sre_parse.ANY, sre_parse.NOT_LITERAL):
+        return True
+    return op == sre_parse.IN and bool(value) and value[0][0] == sre_parse.NEGATE
+
+
+def _iter_unbounded_repeats(parsed):
+    """遍历不定长量词（最大重复次数不限），产出量词的重复对象"""
+    for op, value in parsed:
+        if op in _REPEAT_OPCODES:
+            _, max_count, item = value
+            if max_count is sre_parse.MAXREPEAT:
+                yield item
+            yield from _iter_unbounded_repeats(item)
+        elif op == sre_parse.BRANCH:
+            for branch in value[1]:
+                yield from _iter_unbounded_repeats(branch)
+        elif op == sre_parse.SUBPATTERN:
+            yield from _iter_unbounded_repeats(value[-1])
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            yield from _iter_unbounded_repeats(value[1])
+
+
+def _has_unbounded_repeat(parsed) -> bool:
+    return any(True for _ in _iter_unbounded_repeats(parsed))
+
+
+def _pattern_head(parsed):
+    """
+    模式的开头部分（不含不定长量词），每个匹配的起点都是开头部分的一个匹配起点
+
+    开头的元素就是不定长量词时（如 (?:安全|质量)+目标），取量词的重复对象（至少重复一次、且本身不含
+    不定长量词的非通配内容）；无法确定时返回None。
+    """
+    for index, element in enumerate(parsed):
+        if not _has_unbounded_repeat(sre_parse.SubPattern(parsed.state, [element])):
+            continue
+        if index > 0:
+            return parsed[:index]
+        op, value = element
+        if op in _REPEAT_OPCODES:
+            min_count, _, item = value
+            if min_count >= 1 and not _is_wildcard(item) and not _has_unbounded_repeat(item):
+                return item
+        return None
+    return parsed
+
+
+def check_pattern_safety(pattern: str) -> Optional[str]:
+    """
+    检查正则模式，可编译且无回溯风险时返回None，否则返回原因
+
+    拒绝：嵌套量词（指数级回溯）；多个不定长通配量词，如 安全.*?目标.*?零事故（多项式级回溯）；
+    以不定长量词开头的模式（无法按匹配起点分段检查耗时）。
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error as e:
+        return f"正则表达式无效: {str(e)}"
+    if _has_nested_repeat(parsed):
+        return "正则表达式存在嵌套量词，可能导致灾难性回溯"
+    wildcards = sum(1 for item in _iter_unbounded_repeats(parsed) if _is_wildcard(item))
+    if wildcards > _MAX_UNBOUNDED_WILDCARDS:
+        return f"正则表达式包含{wildcards}个不定长通配量词（如.*?），最多允许{_MAX_UNBOUNDED_WILDCARDS}个"
+    if _pattern_head(parsed) is None:
+        return "正则表达式不能以不定长量词开头"
+    return None
+
+
+def compile_bounded_regex(pattern: str, flags: int = 0) -> Tuple[re.Pattern, re.Pattern]:
+    """
+    编译通过安全检查的模式
+
+    Returns:
+        (完整模式, 开头部分)：开头部分不含不定长量词，用于逐个定位候选匹配起点
+
+    Raises:
+        re.error: 模式无效或有回溯风险
+    """
+    unsafe_reason = check_pattern_safety(pattern)
+    if unsafe_reason:
+        raise re.error(unsafe_reason)
+    regex = re.compile(pattern, flags)
+    parsed = sre_parse.parse(pattern, flags)
+    head = _pattern_head(parsed)
+    if head is parsed:
+        return regex, regex
+    return regex, sre_compile.compile(head, flags)
+
+
+# 匹配结果状态
+MATCH_FOUND = "found"
+MATCH_NOT_FOUND = "not_found"
+MATCH_TIMEOUT = "timeout"
+
+
+class CompiledRule:
+    """预编译的单条规则"""
+
+    def __init__(self, rule: Dict, window: int, time_budget_ms: float):
+        self.rule = rule
+        self.name = rule.get("name")
+        self.type = rule.get("type")
+        self.pattern = rule.get("pattern") or ""
+        self.required_content = list(rule.get("required_content") or [])
+        self.window = window
+        self.time_budget = time_budget_ms / 1000.0
+        self.strategy = "none"
+
+        self._regex = None
+        self._head_re = None
+        self._anchor_re = None
+        self._keyword_re = None
+
+        if not self.pattern:
+            return
+
+        if self.type == "章节检查":
+            self._regex, self._head_re = compile_bounded_regex(self.pattern, re.IGNORECASE)
+            self.strategy = "title_regex"
+            return
+
+        proximity = _PROXIMITY_PATTERN_RE.match(self.pattern)
+        if proximity:
+            # 改写为邻近搜索：锚点之后window个字符内出现任一关键词
+            keywords = (proximity.group("alternatives") or proximity.group("keyword")).split("|")
+            self._anchor_re = re.compile(re.escape(proximity.group("anchor")), re.IGNORECASE)
+            self._keyword_re = re.compile(
+                "|".join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True)),
+                re.IGNORECASE
+            )
+            self.strategy = "proximity"
+        else:
+            self._regex, self._head_re = compile_bounded_regex(self.pattern, re.IGNORECASE | re.DOTALL)
+            self.strategy = "regex"
+
+    def match_content(self, content: str) -> str:
+        """在正文中匹配规则模式，返回匹配状态"""
+        if self.strategy == "proximity":
+            return self._match_proximity(content)
+        return self._match_regex(content)
+
+    def match_titles(self, chapters: List[Dict]) -> str:
+        """在章节标题中匹配规则模式（全部标题共用一个耗时预算）"""
+        deadline = time.perf_counter() + self.time_budget
+        for chapter in chapters:
+            status = self._search(chapter.get("title", ""), deadline)
+            if status != MATCH_NOT_FOUND:
+                return status
+        return MATCH_NOT_FOUND
+
+    def _match_proximity(self, content: str) -> str:
+        """
+        邻近搜索
+
+        按顺序遍历锚点，关键词位置单调前移复用，整体为线性扫描。
+        """
+        deadline = time.perf_counter() + self.time_budget
+        keyword_start = -1
+        keyword_search = self._keyword_re.search
+
+        for checked, anchor in enumerate(self._anchor_re.finditer(content)):
+            anchor_end = anchor.end()
+            if keyword_start < anchor_end:
+                keyword = keyword_search(content, anchor_end)
+                if keyword is None:
+                    return MATCH_NOT_FOUND
+                keyword_start = keyword.start()
+            if keyword_start - anchor_end <= self.window:
+                return MATCH_FOUND
+            if checked % 64 == 63 and time.perf_counter() > deadline:
+                return MATCH_TIMEOUT
+
+        return MATCH_NOT_FOUND
+
+    def _match_regex(self, content: str) -> str:
+        """通用正则匹配（全文）"""
+        return self._search(content, time.perf_counter() + self.time_budget)
+
+    def _search(self, text: str, deadline: float) -> str:
+        """
+        带耗时预算的正则搜索
+
+        不含不定长量词的模式直接搜索（线性）；否则用模式开头部分逐个定位候选起点，
+        在每个起点上执行完整匹配，候选之间检查耗时，超出预算返回MATCH_TIMEOUT。
+        在原文上按位置匹配（不截断文本），$、\\Z与跨越任意长度的匹配与re.search一致。
+        """
+        if self._head_re is self._regex:
+            return MATCH_FOUND if self._regex.search(text) else MATCH_NOT_FOUND
+
+        head_search = self._head_re.search
+        full_match = self._regex.match
+        pos = 0
+        length = len(text)
+        while pos <= length:
+            head = head_search(text, pos)
+            if head is None:
+                return MATCH_NOT_FOUND
+            if full_match(text, head.start()):
+                return MATCH_FOUND
+            if time.perf_counter() > deadline:
+                return MATCH_TIMEOUT
+            pos = head.start() + 1
+        return MATCH_NOT_FOUND
+
+
+class RuleSet:
+    """
+    编译后的规则集
+
+    创建时一次性预编译全部规则模式，之后可对任意文档重复评估；
+    evaluate同时返回每条规则的耗时与匹配策略。
+    """
+
+    def __init__(self, rules: List[Dict], version: Optional[int] = None,
+                 window: Optional[int] = None, time_budget_ms: Optional[float] = None):
+        """
+        编译规则集
+
+        Args:
+            rules: 规则字典列表（name/type/pattern/severity/description/required_content）
+            version: 规则集版本号
+            window: 邻近搜索的字符窗口，默认读取RULE_ENGINE_CONFIG
+            time_budget_ms: 单条规则的匹配耗时预算（毫秒）
+        """
+        self.version = version
+        self.window = window or RULE_ENGINE_CONFIG["proximity_window"]
+        self.time_budget_ms = time_budget_ms or RULE_ENGINE_CONFIG["match_time_budget_ms"]
+
+        self.rules: List[CompiledRule] = []
+        self.invalid_rules: List[Dict] = []
+        for rule in rules:
+            if not rule.get("is_active", True):
+                continue
+            try:
+                self.rules.append(CompiledRule(rule, self.window, self.time_budget_ms))
+            except re.error as e:
+                self.invalid_rules.append({"rule_name": rule.get("name"), "error": str(e)})
+
+    def __len__(self):
+        return len(self.rules)
+
+    def evaluate(self, content: str, chapters: Optional[List[Dict]] = None,
+                 content_index: Optional[KeywordHitIndex] = None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        评估规则集
+
+        Returns:
+            (检查结果列表, 每条规则的耗时统计)
+        """
+        chapters = chapters or []
+        results = []
+        timings = []
+
+        for compiled in self.rules:
+            started = time.perf_counter()
+            result = self._evaluate_rule(compiled, content, chapters, content_index)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if result:
+                results.append(result)
+            timings.append({
+                "rule_name": compiled.name,
+                "strategy": compiled.strategy,
+                "elapsed_ms": round(elapsed_ms, 3),
+                "status": result.get("status") if result else "通过"
+            })
+
+        return results, timings
+
+    def _evaluate_rule(self, compiled: CompiledRule, content: str, chapters: List[Dict],
+                       content_index: Optional[KeywordHitIndex]) -> Optional[Dict]:
+        rule = compiled.rule
+
+        if compiled.required_content:
+            missing = []
+            for item in compiled.required_content:
+                if content_index is not None and content_index.covers(item):
+                    found = content_index.contains(item)
+                else:
+                    found = item in content
+                if not found:
+                    missing.append(item)
+            if missing:
+                return self._failure(rule, f"缺少必含内容：{'、'.join(missing)}")
+
+        if not compiled.pattern:
+            return None
+
+        if compiled.type == "章节检查":
+            status = compiled.match_titles(chapters)
+            if status == MATCH_NOT_FOUND:
+                return self._failure(rule, f"请添加章节：{rule.get('description', '')}")
+            if status == MATCH_TIMEOUT:
+                return self._timeout(rule)
+            return None
+
+        if compiled.type != "内容检查":
+            return None
+
+        status = compiled.match_content(content)
+        if status == MATCH_NOT_FOUND:
+            return self._failure(rule, f"请检查是否包含：{rule.get('description', '')}")
+        if status == MATCH_TIMEOUT:
+            return self._timeout(rule)
+        return None
+
+    def _timeout(self, rule: Dict) -> Dict:
+        return {
+            "rule_name": rule.get("name"),
+            "status": "超时",
+            "severity": rule.get("severity", "一般"),
+            "description": rule.get("description", ""),
+            "suggestion": f"规则匹配超过{self.time_budget_ms:g}毫秒预算，未完成检查"
+        }
+
+    @staticmethod
+    def _failure(rule: Dict, suggestion: str) -> Dict:
+        return {
+            "rule_name": rule.get("name"),
+            "status": "不通过",
+            "severity": rule.get("severity", "一般"),
+            "description": rule.get("description", ""),
+            "suggestion": suggestion
+        }
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+规则集缓存模块
+将数据库中启用的审核规则编译后缓存在进程内，仅在规则变更（版本号递增）时重建
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from config.config import RULE_ENGINE_CONFIG
+from app.models.database import ReviewRule
+from app.services.rule_engine.rule_engine import RuleEngine
+from app.services.hazard_library.hazard_pack import HazardPack, HAZARD_RULE_TYPE
+
+# 规则集版本号：规则创建/更新/删除时递增
+_ruleset_version = 0
+_version_lock = threading.Lock()
+
+
+def bump_ruleset_version() -> int:
+    """规则发生变更后调用，使已缓存的规则集失效"""
+    global _ruleset_version
+    with _version_lock:
+        _ruleset_version += 1
+        return _ruleset_version
+
+
+def get_ruleset_version() -> int:
+    """获取当前规则集版本号"""
+    return _ruleset_version
+
+
+def sync_ruleset_version(version: int) -> int:
+    """
+    同步主进程的规则集版本号（在计算子进程中调用）
+
+    子进程中的版本号只随主进程传入的版本号增长，主进程规则变更后子进程缓存的规则集随之失效。
+    """
+    global _ruleset_version
+    with _version_lock:
+        if version > _ruleset_version:
+            _ruleset_version = version
+        return _ruleset_version
+
+
+def rule_to_dict(rule: ReviewRule) -> Dict:
+    """将数据库规则转换为规则引擎使用的字典"""
+    return {
+        "id": rule.id,
+        "name": rule.rule_name,
+        "type": rule.rule_type or "内容检查",
+        "pattern": rule.rule_pattern or "",
+        "required_content": [
+            item for item in (rule.required_content or []) if isinstance(item, str) and item
+        ],
+        "severity": rule.severity or "一般",
+        "description": rule.review_focus or rule.rule_name,
+        "priority": rule.priority or 0,
+        "standard_id": rule.standard_id
+    }
+
+
+class CachedRuleset:
+    """缓存的规则集：已编译的规则引擎及其必含内容，以及重大隐患关键词包"""
+
+    def __init__(self, engine: RuleEngine, version: int, hazard_pack: Optional[HazardPack] = None):
+        self.engine = engine
+        self.version = version
+        self.built_at = time.monotonic()
+        self.required_content: List[str] = sorted({
+            item for rule in engine.get_active_rules() for item in rule.get("required_content") or []
+        })
+        self.hazard_pack = hazard_pack or HazardPack([])
+        # 预先编译，避免首个请求承担编译开销
+        self.ruleset = engine.compile()
+
+    @property
+    def index_keywords(self) -> List[str]:
+        """审核时需要编入全文关键词索引的全部关键词（必含内容、隐患关键词与隐患条件词）"""
+        return sorted(set(self.required_content) | set(self.hazard_pack.index_terms))
+
+
+class RulesetCache:
+    """
+    进程内规则集缓存
+
+    按standard_id分别缓存；命中时不访问数据库、不重新编译。
+    规则集版本号变化，或超过ttl_seconds（多进程部署时兜底）后才重建。
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        if ttl_seconds is None:
+            ttl_seconds = RULE_ENGINE_CONFIG.get("ruleset_cache_ttl_seconds", 0)
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Optional[int], CachedRuleset] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def _is_fresh(self, entry: CachedRuleset) -> bool:
+        if entry.version != get_ruleset_version():
+            return False
+        return not self.ttl_seconds or time.monotonic() - entry.built_at < self.ttl_seconds
+
+    def get(self, db: Session, standard_id: Optional[int] = None) -> CachedRuleset:
+        """
+        获取编译好的规则集
+
+        Args:
+            db: 数据库会话（仅在需要重建时使用）
+            standard_id: 只加载该规范的规则（以及未关联规范的通用规则）；为空时加载全部启用规则
+        """
+        entry = self._entries.get(standard_id)
+        if entry is not None and self._is_fresh(entry):
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(standard_id)
+            if entry is not None and self._is_fresh(entry):
+                return entry
+            entry = self._build(db, standard_id)
+            self._entries[standard_id] = entry
+            return entry
+
+    def _build(self, db: Session, standard_id: Optional[int]) -> CachedRuleset:
+        version = get_ruleset_version()
+
+        query = db.query(ReviewRule).filter(
+            ReviewRule.is_active == True,
+            (ReviewRule.rule_type != HAZARD_RULE_TYPE) | (ReviewRule.rule_type.is_(None))
+        )
+        if standard_id is not None:
+            query = query.filter(
+                (ReviewRule.standard_id == standard_id) | (ReviewRule.standard_id.is_(None))
+            )
+        rules = query.order_by(ReviewRule.priority.desc(), ReviewRule.id).all()
+
+        engine = RuleEngine()
+        engine.load_rules([rule_to_dict(rule) for rule in rules])
+
+        # 重大隐患条目不区分规范，始终全部参与
+        hazard_rules = db.query(ReviewRule).filter(
+            ReviewRule.is_active == True, ReviewRule.rule_type == HAZARD_RULE_TYPE
+        ).order_by(ReviewRule.id).all()
+
+        self.builds += 1
+        return CachedRuleset(engine, version, HazardPack.from_rules(hazard_rules))
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        return {
+            "version": get_ruleset_version(),
+            "builds": self.builds,
+            "entries": [
+                {
+                    "standard_id": standard_id,
+                    "version": entry.version,
+                    "rules_count": len(entry.ruleset),
+                    "hazards_count": len(entry.hazard_pack),
+                    "invalid_rules": entry.ruleset.invalid_rules
+                }
+                for standard_id, entry in self._entries.items()
+            ]
+        }
+
+
+_ruleset_cache = RulesetCache()
+
+
+def get_ruleset_cache() -> RulesetCache:
+    """获取进程内共享的规则集缓存"""
+    return _ruleset_cache
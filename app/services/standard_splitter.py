@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+审核规范分块模块
+按章、条等结构边界将长规范切分为不超过token预算的片段，供分块并行生成规则
+"""
+
+import re
+from typing import List
+
+_CN_NUM = "[一二三四五六七八九十百零〇]+"
+
+# 结构边界行：第一章 / 第一节 / 第一条 / 一、 / 1 总则 / 3.0.1 / 附录A
+_BOUNDARY_RE = re.compile(
+    rf"^[^\S\n]*(?:第{_CN_NUM}[章节条]|第\d+[章节条]|{_CN_NUM}、|\d+(?:\.\d+)*[\.、]?[^\S\n]*[^\d\s\.、]|附录)",
+    re.MULTILINE
+)
+
+# 句末标点（超长条文在句末切开）
+_SENTENCE_END_RE = re.compile(r"(?<=[。；！？;!?])")
+
+_CJK_RE = re.compile(r"[　-〿㐀-鿿豈-﫿＀-￯]")
+
+
+def estimate_tokens(text: str) -> int:
+    """估算token数：中文字符及全角标点按1个token，其余字符按4个字符1个token"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _split_segments(content: str) -> List[str]:
+    """在结构边界行处切分为段（每段以边界行开头，第一段可能是前言）"""
+    starts = [match.start() for match in _BOUNDARY_RE.finditer(content)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    starts.append(len(content))
+    return [content[start:end] for start, end in zip(starts, starts[1:]) if content[start:end].strip()]
+
+
+def _split_oversized(segment: str, max_tokens: int) -> List[str]:
+    """超出预算的段依次按行、按句切分，单句仍超出时按字符数截断"""
+    pieces: List[str] = []
+    for line in segment.splitlines(keepends=True):
+        if estimate_tokens(line) <= max_tokens:
+            pieces.append(line)
+            continue
+        for sentence in _SENTENCE_END_RE.split(line):
+            while estimate_tokens(sentence) > max_tokens:
+                # 按token预算换算的字符数截断（中文为主时1字符约1个token）
+                pieces.append(sentence[:max_tokens])
+                sentence = sentence[max_tokens:]
+            if sentence:
+                pieces.append(sentence)
+    return pieces
+
+
+def split_standard(content: str, max_tokens: int) -> List[str]:
+    """
+    将规范切分为不超过max_tokens的片段
+
+    先在章、条等边界处切段，再把相邻的段依次装入片段直到预算用完，
+    片段尽量在结构边界处结束，一条条文不会被拆到两个片段中（除非单条就超出预算）。
+
+    Args:
+        content: 规范全文
+        max_tokens: 每个片段的token预算（按estimate_tokens估算）
+
+    Returns:
+        片段列表（按原文顺序，拼接后与原文一致，去掉了空白段）
+    """
+    if not content.strip():
+        return []
+    if estimate_tokens(content) <= max_tokens:
+        return [content]
+
+    pieces: List[str] = []
+    for segment in _split_segments(content):
+        if estimate_tokens(segment) <= max_tokens:
+            pieces.append(segment)
+        else:
+            pieces.extend(_split_oversized(segment, max_tokens))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
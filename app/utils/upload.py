@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+上传文件保存模块
+分块读取上传内容，边写临时文件边计算SHA-256，超出大小限制立即中止，完成后原子重命名到目标路径
+"""
+
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Optional, Tuple
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from config.config import MAX_FILE_SIZE_MB
+
+# 每次读取/写入的块大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# multipart请求体中除文件内容外的额外开销（分隔符、字段头、其他表单字段）
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """上传文件超过大小限制"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"文件大小超过限制（{max_size // (1024 * 1024)}MB）")
+
+
+class SavedUpload:
+    """已保存的上传文件"""
+
+    def __init__(self, path: Path, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
+def get_max_upload_size() -> int:
+    """上传文件大小上限（字节）"""
+    return MAX_FILE_SIZE_MB * 1024 * 1024
+
+
+def _write_chunk(buffer: BinaryIO, hasher, chunk: bytes):
+    hasher.update(chunk)
+    buffer.write(chunk)
+
+
+def _discard(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+async def hash_upload_file(upload: UploadFile, max_size: Optional[int] = None,
+                           chunk_size: int = UPLOAD_CHUNK_SIZE) -> Tuple[int, str]:
+    """
+    只读取并计算上传文件的大小与SHA-256，不写入磁盘（读取后回到文件开头）
+
+    Returns:
+        (文件大小, SHA-256)
+    """
+    if max_size is None:
+        max_size = get_max_upload_size()
+
+    known_size = getattr(upload, "size", None)
+    if known_size is not None and known_size > max_size:
+        raise UploadTooLargeError(max_size)
+
+    hasher = hashlib.sha256()
+    size = 0
+    await upload.seek(0)
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise UploadTooLargeError(max_size)
+        await run_in_threadpool(hasher.update, chunk)
+    await upload.seek(0)
+    return size, hasher.hexdigest()
+
+
+async def save_upload_file(upload: UploadFile, destination: Path,
+                           max_size: Optional[int] = None,
+                           chunk_size: int = UPLOAD_CHUNK_SIZE) -> SavedUpload:
+    """
+    流式保存上传文件
+
+    写入与哈希计算在线程池中执行，不阻塞事件循环；
+    超过max_size时删除临时文件并抛出UploadTooLargeError，目标路径不受影响。
+    multipart请求体在此之前已被完整接收，超大请求由limit_upload_size中间件按Content-Length拒绝，
+    这里的检查只保证不会把超限的文件写入存储。
+
+    Args:
+        upload: 上传文件
+        destination: 目标路径（同目录下先写临时文件，完成后os.replace）
+        max_size: 大小上限（字节），默认读取MAX_FILE_SIZE_MB
+        chunk_size: 分块大小
+    """
+    if max_size is None:
+        max_size = get_max_upload_size()
+
+    # 已知大小时直接拒绝，不读取内容
+    known_size = getattr(upload, "size", None)
+    if known_size is not None and known_size > max_size:
+        raise UploadTooLargeError(max_size)
+
+    destination = Path(destination)
+    temp_path = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}.part")
+    hasher = hashlib.sha256()
+    size = 0
+
+    buffer = await run_in_threadpool(open, temp_path, "wb")
+    try:
+        try:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(max_size)
+                await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+        finally:
+            await run_in_threadpool(buffer.close)
+        await run_in_threadpool(os.replace, temp_path, destination)
+    except BaseException:
+        await run_in_threadpool(_discard, temp_path)
+        raise
+
+    return SavedUpload(destination, size, hasher.hexdigest())
+
+
+async def iter_upload_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, str]]:
+    """
+    逐行读取流式请求体（UTF-8，如JSONL），不缓存整个请求体
+
+    Yields:
+        (行号, 行文本)，行号从1开始，行文本不含换行符
+
+    Raises:
+        ValueError: 单行超过max_line_bytes或不是UTF-8编码
+    """
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.decode("utf-8-sig" if line_no == 1 else "utf-8").rstrip("\r")
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"第{line_no + 1}行超过{max_line_bytes}字节")
+    if buffer:
+        line_no += 1
+        yield line_no, buffer.decode("utf-8-sig" if line_no == 1 else "utf-8").rstrip("\r")
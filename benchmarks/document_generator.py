@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+"""
+施工组织设计合成文档生成器
+
+按审核要点库的章节结构生成docx、pdf（文本层）和txt文档，章数、节的层级、表格数量和大小可配置，
+并按比例在各章中写入该章的必含内容关键词。相同参数与随机种子生成的文档完全一致。
+文档边生成边写入文件，生成数百MB的文档时内存占用保持不变。
+
+用法：
+    python -m benchmarks.document_generator out.docx --target-chars 100000000 --seed 1
+    python -m benchmarks.document_generator out.pdf --chapters 30 --tables-per-chapter 2
+"""
+
+import argparse
+import random
+import sys
+import zipfile
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.review_point_library import get_review_point_library
+
+# 正文句子素材
+_SUBJECTS = [
+    "施工单位", "项目经理部", "监理单位", "技术负责人", "专职安全员", "质检员", "施工班组", "测量人员",
+]
+_ACTIONS = [
+    "应严格按照设计文件和施工规范组织施工", "应在施工前完成技术交底", "应做好施工记录并及时归档",
+    "应对进场材料进行检验并留存报告", "应加强过程控制和工序交接检查", "应合理安排施工顺序和作业面",
+    "应落实不停航施工管理要求", "应对关键工序实施旁站监督", "应根据现场条件调整资源投入",
+    "应定期组织检查并整改发现的问题",
+]
+_OBJECTS = [
+    "道面混凝土浇筑", "基层摊铺碾压", "土方开挖与回填", "排水沟施工", "助航灯光安装", "电缆敷设",
+    "模板支设", "钢筋绑扎", "切缝与灌缝", "标志标线施划",
+]
+_TABLE_HEADERS = ["序号", "名称", "规格型号", "数量", "单位", "备注", "进场时间", "责任人"]
+
+_CN_DIGITS = "零一二三四五六七八九"
+
+
+def cn_number(n: int) -> str:
+    """1~99转换为中文数字（一、十、二十一）"""
+    tens, ones = divmod(n, 10)
+    text = ""
+    if tens:
+        text = ("" if tens == 1 else _CN_DIGITS[tens]) + "十"
+    if ones:
+        text += _CN_DIGITS[ones]
+    return text
+
+
+class DocumentSpec:
+    """
+    合成文档参数
+
+    Args:
+        chapters: 章数（target_chars为空时生效），超过审核要点库章数时循环使用各章标题
+        sections_per_chapter: 每章的节数
+        section_depth: 标题层级，1只有章，2有章和节，3再在节下加"（一）"条目
+        paragraphs_per_section: 每节（或每个条目）的段落数
+        paragraph_chars: 每段的大致字数
+        tables_per_chapter: 每章的表格数
+        table_rows / table_cols: 表格行数（含表头）与列数
+        keyword_ratio: 每个必含内容写入所在章的概率
+        target_chars: 目标字数，设置后持续生成章节直到达到该字数
+        seed: 随机种子
+    """
+
+    def __init__(self, chapters: int = 13, sections_per_chapter: int = 3, section_depth: int = 2,
+                 paragraphs_per_section: int = 4, paragraph_chars: int = 200,
+                 tables_per_chapter: int = 1, table_rows: int = 6, table_cols: int = 5,
+                 keyword_ratio: float = 0.8, target_chars: Optional[int] = None, seed: int = 0):
+        self.chapters = chapters
+        self.sections_per_chapter = sections_per_chapter
+        self.section_depth = section_depth
+        self.paragraphs_per_section = paragraphs_per_section
+        self.paragraph_chars = paragraph_chars
+        self.tables_per_chapter = tables_per_chapter
+        self.table_rows = table_rows
+        self.table_cols = table_cols
+        self.keyword_ratio = keyword_ratio
+        self.target_chars = target_chars
+        self.seed = seed
+
+
+def _chapter_templates() -> List[Tuple[str, List[Tuple[str, List[str]]]]]:
+    """
+    从审核要点库得到章节模板
+
+    Returns:
+        [(章标题, [(要点名称, 必含内容列表), ...]), ...]，章标题取自文档完整性中的必含章节
+    """
+    points = get_review_point_library().get_all_review_points()
+    titles = [
+        title.split(".", 1)[-1].strip()
+        for title in points["文档完整性"].get("必含章节", [])
+    ]
+    chapter_keys = [key for key in points if key != "文档完整性"]
+
+    templates = []
+    for title, key in zip(titles, chapter_keys):
+        sections = [
+            (name, list(config.get("必含内容", [])))
+            for name, config in points[key].items()
+            if isinstance(config, dict)
+        ]
+        templates.append((title, sections or [(title, [])]))
+    return templates
+
+
+def iter_blocks(spec: DocumentSpec) -> Iterator[Tuple[str, object]]:
+    """
+    按参数产出文档块
+
+    产出 ("heading", (级别, 文本))、("paragraph", 文本)、("table", 行列表)，
+    标题文本带编号（第一章 / 第一节 / （一）），超过99章时章编号改为"100."形式。
+    """
+    rng = random.Random(spec.seed)
+    templates = _chapter_templates()
+    emitted = 0
+    chapter_no = 0
+
+    while True:
+        if spec.target_chars is not None:
+            if emitted >= spec.target_chars:
+                return
+        elif chapter_no >= spec.chapters:
+            return
+
+        title, sections = templates[chapter_no % len(templates)]
+        round_no = chapter_no // len(templates)
+        chapter_no += 1
+        if round_no:
+            title = f"{title}（续{round_no}）"
+        number = f"第{cn_number(chapter_no)}章 " if chapter_no < 100 else f"{chapter_no}. "
+        heading = number + title
+        emitted += len(heading)
+        yield "heading", (1, heading)
+
+        # 本章要写入的必含内容，随机分配到各段落
+        keywords = [
+            item for _, items in sections for item in items if rng.random() < spec.keyword_ratio
+        ]
+        units = []
+        for section_index in range(spec.sections_per_chapter if spec.section_depth >= 2 else 1):
+            section_name = sections[section_index % len(sections)][0]
+            items = [None] if spec.section_depth < 3 else [
+                f"（{cn_number(i + 1)}）{rng.choice(_OBJECTS)}" for i in range(2)
+            ]
+            units.append((section_index, section_name, items))
+        paragraph_total = sum(len(items) for _, _, items in units) * spec.paragraphs_per_section
+        placements: Dict[int, List[str]] = {}
+        for keyword in keywords:
+            placements.setdefault(rng.randrange(max(1, paragraph_total)), []).append(keyword)
+
+        paragraph_index = 0
+        for section_index, section_name, items in units:
+            if spec.section_depth >= 2:
+                heading = f"第{cn_number(section_index % 99 + 1)}节 {section_name}"
+                emitted += len(heading)
+                yield "heading", (2, heading)
+            for item in items:
+                if item is not None:
+                    emitted += len(item)
+                    yield "heading", (3, item)
+                for _ in range(spec.paragraphs_per_section):
+                    text = _paragraph(rng, spec.paragraph_chars, placements.get(paragraph_index, ()))
+                    paragraph_index += 1
+                    emitted += len(text)
+                    yield "paragraph", text
+
+        for _ in range(spec.tables_per_chapter):
+            rows = _table(rng, spec.table_rows, spec.table_cols)
+            emitted += sum(len(cell) for row in rows for cell in row)
+            yield "table", rows
+
+
+def _paragraph(rng: random.Random, length: int, keywords) -> str:
+    parts = []
+    size = 0
+    for keyword in keywords:
+        sentence = f"本节明确了{keyword}的相关要求。"
+        parts.append(sentence)
+        size += len(sentence)
+    while size < length:
+        sentence = f"{rng.choice(_SUBJECTS)}在{rng.choice(_OBJECTS)}过程中{rng.choice(_ACTIONS)}。"
+        parts.append(sentence)
+        size += len(sentence)
+    rng.shuffle(parts)
+    return "".join(parts)
+
+
+def _table(rng: random.Random, rows: int, cols: int) -> List[List[str]]:
+    header = [_TABLE_HEADERS[i % len(_TABLE_HEADERS)] for i in range(cols)]
+    body = [
+        [str(row + 1)] + [
+            rng.choice(_OBJECTS) if col % 2 else str(rng.randint(1, 500)) for col in range(1, cols)
+        ]
+        for row in range(rows - 1)
+    ]
+    return [header] + body
+
+
+def _block_lines(block_type: str, block) -> List[str]:
+    """文档块对应的文本行（txt与pdf使用）"""
+    if block_type == "heading":
+        return [block[1]]
+    if block_type == "paragraph":
+        return [block]
+    return ["\t".join(row) for row in block]
+
+
+def write_txt(path: Path, spec: DocumentSpec, encoding: str = "utf-8"):
+    """生成txt文档"""
+    with open(path, "w", encoding=encoding, newline="\n") as f:
+        for block_type, block in iter_blocks(spec):
+            for line in _block_lines(block_type, block):
+                f.write(line)
+                f.write("\n")
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+_DOCX_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_DOCX_STYLES = (
+    f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:styles {_W}>'
+    + "".join(
+        f'<w:style w:type="paragraph" w:styleId="Heading{level}"><w:name w:val="heading {level}"/>'
+        f'<w:pPr><w:outlineLvl w:val="{level - 1}"/></w:pPr></w:style>'
+        for level in (1, 2, 3)
+    )
+    + '</w:styles>'
+)
+
+
+def _docx_paragraph(text: str, style: Optional[str] = None) -> str:
+    p_pr = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f'<w:p>{p_pr}<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def _docx_table(rows: List[List[str]]) -> str:
+    cols = max(len(row) for row in rows)
+    grid = "".join('<w:gridCol w:w="1800"/>' for _ in range(cols))
+    body = "".join(
+        "<w:tr>" + "".join(f"<w:tc>{_docx_paragraph(cell)}</w:tc>" for cell in row) + "</w:tr>"
+        for row in rows
+    )
+    return f"<w:tbl><w:tblGrid>{grid}</w:tblGrid>{body}</w:tbl>"
+
+
+def write_docx(path: Path, spec: DocumentSpec):
+    """生成docx文档（word/document.xml边生成边压缩写入）"""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx_zip:
+        docx_zip.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        docx_zip.writestr("_rels/.rels", _DOCX_RELS)
+        docx_zip.writestr("word/_rels/document.xml.rels", _DOCX_DOCUMENT_RELS)
+        docx_zip.writestr("word/styles.xml", _DOCX_STYLES)
+
+        with docx_zip.open("word/document.xml", "w", force_zip64=True) as document:
+            document.write(
+                f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {_W}><w:body>'.encode("utf-8")
+            )
+            for block_type, block in iter_blocks(spec):
+                if block_type == "heading":
+                    xml = _docx_paragraph(block[1], f"Heading{block[0]}")
+                elif block_type == "paragraph":
+                    xml = _docx_paragraph(block)
+                else:
+                    xml = _docx_table(block)
+                document.write(xml.encode("utf-8"))
+            document.write(b"<w:sectPr/></w:body></w:document>")
+
+
+# PDF页面参数：A4，每行字数与每页行数
+_PDF_PAGE = (595, 842)
+_PDF_LINE_CHARS = 38
+_PDF_PAGE_LINES = 48
+
+
+def _pdf_to_unicode(chars) -> bytes:
+    """ToUnicode映射：字形编码即Unicode码位，只列出文档中用到的字符，保证文本层可被正确提取"""
+    entries = [b"<%04X> <%04X>" % (ord(ch), ord(ch)) for ch in sorted(chars)]
+    blocks = []
+    for start in range(0, len(entries), 100):
+        chunk = entries[start:start + 100]
+        blocks.append(b"%d beginbfchar\n" % len(chunk) + b"\n".join(chunk) + b"\nendbfchar")
+    return (
+        b"/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+        b"/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+        b"/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+        b"1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+        + b"\n".join(blocks)
+        + b"\nendcmap\nCMapName currentdict /CMap defineresource pop\nend\nend"
+    )
+
+
+class _PdfWriter:
+    """顺序写入PDF对象并记录偏移，最后写入页面树与交叉引用表"""
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.offsets: Dict[int, int] = {}
+        self.next_id = 1
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def reserve(self) -> int:
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def write(self, obj_id: int, body: bytes):
+        self.offsets[obj_id] = self.f.tell()
+        self.f.write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+    def write_stream(self, obj_id: int, data: bytes):
+        data = zlib.compress(data)
+        self.write(obj_id, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream")
+
+    def finish(self, root_id: int):
+        xref = self.f.tell()
+        size = self.next_id
+        self.f.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for obj_id in range(1, size):
+            self.f.write(b"%010d 00000 n \n" % self.offsets[obj_id])
+        self.f.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, root_id, xref))
+
+
+def _wrap(line: str, width: int) -> Iterator[str]:
+    """按句子折行（整句放不下时才在句中断开），避免关键词被拆到两行"""
+    current = ""
+    for sentence in line.replace("。", "。\n").splitlines() or [""]:
+        if current and len(current) + len(sentence) > width:
+            yield current
+            current = ""
+        while len(sentence) > width:
+            yield sentence[:width]
+            sentence = sentence[width:]
+        current += sentence
+    if current or not line:
+        yield current
+
+
+def write_pdf(path: Path, spec: DocumentSpec):
+    """
+    生成带文本层的PDF文档
+
+    使用不嵌入的CID字体，文字按Unicode码位编码并附ToUnicode映射，
+    用于测试文本提取（不保证在阅读器中的显示效果）。页面逐页写入，页面树与ToUnicode映射最后写出。
+    """
+    with open(path, "wb") as f:
+        pdf = _PdfWriter(f)
+        catalog_id, pages_id, font_id, cid_font_id, descriptor_id, to_unicode_id = (
+            pdf.reserve() for _ in range(6)
+        )
+        pdf.write(catalog_id, b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+        pdf.write(font_id, (
+            b"<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /Identity-H "
+            b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (cid_font_id, to_unicode_id)
+        ))
+        pdf.write(cid_font_id, (
+            b"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light "
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            b"/FontDescriptor %d 0 R >>" % descriptor_id
+        ))
+        pdf.write(descriptor_id, (
+            b"<< /Type /FontDescriptor /FontName /STSong-Light /Flags 6 /FontBBox [0 -200 1000 900] "
+            b"/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>"
+        ))
+
+        page_ids: List[int] = []
+        lines: List[str] = []
+        used_chars = set()
+
+        def flush_page():
+            ops = [b"BT", b"/F1 12 Tf", b"16 TL", b"50 %d Td" % (_PDF_PAGE[1] - 60)]
+            for line in lines:
+                used_chars.update(line)
+                ops.append(b"<" + line.encode("utf-16-be").hex().encode("ascii") + b"> Tj T*")
+            ops.append(b"ET")
+            content_id, page_id = pdf.reserve(), pdf.reserve()
+            pdf.write_stream(content_id, b"\n".join(ops))
+            pdf.write(page_id, (
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+                b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+                % (pages_id, _PDF_PAGE[0], _PDF_PAGE[1], font_id, content_id)
+            ))
+            page_ids.append(page_id)
+            lines.clear()
+
+        for block_type, block in iter_blocks(spec):
+            for line in _block_lines(block_type, block):
+                for wrapped in _wrap(line.replace("\t", " "), _PDF_LINE_CHARS):
+                    lines.append(wrapped)
+                    if len(lines) >= _PDF_PAGE_LINES:
+                        flush_page()
+        if lines or not page_ids:
+            flush_page()
+
+        pdf.write_stream(to_unicode_id, _pdf_to_unicode(used_chars))
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+        pdf.write(pages_id, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids)))
+        pdf.finish(catalog_id)
+
+
+_WRITERS = {".txt": write_txt, ".docx": write_docx, ".pdf": write_pdf}
+
+
+def generate_document(path, spec: Optional[DocumentSpec] = None) -> Path:
+    """按扩展名生成合成文档"""
+    path = Path(path)
+    writer = _WRITERS.get(path.suffix.lower())
+    if writer is None:
+        raise ValueError(f"不支持生成的文件格式: {path.suffix}")
+    writer(path, spec or DocumentSpec())
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="生成施工组织设计合成文档")
+    arg_parser.add_argument("output", help="输出文件（.docx / .pdf / .txt）")
+    arg_parser.add_argument("--chapters", type=int, default=13)
+    arg_parser.add_argument("--sections-per-chapter", type=int, default=3)
+    arg_parser.add_argument("--section-depth", type=int, default=2, choices=(1, 2, 3))
+    arg_parser.add_argument("--paragraphs-per-section", type=int, default=4)
+    arg_parser.add_argument("--paragraph-chars", type=int, default=200)
+    arg_parser.add_argument("--tables-per-chapter", type=int, default=1)
+    arg_parser.add_argument("--table-rows", type=int, default=6)
+    arg_parser.add_argument("--table-cols", type=int, default=5)
+    arg_parser.add_argument("--keyword-ratio", type=float, default=0.8)
+    arg_parser.add_argument("--target-chars", type=int, help="目标字数（设置后忽略--chapters，持续生成直到达到该字数）")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    spec = DocumentSpec(
+        chapters=args.chapters,
+        sections_per_chapter=args.sections_per_chapter,
+        section_depth=args.section_depth,
+        paragraphs_per_section=args.paragraphs_per_section,
+        paragraph_chars=args.paragraph_chars,
+        tables_per_chapter=args.tables_per_chapter,
+        table_rows=args.table_rows,
+        table_cols=args.table_cols,
+        keyword_ratio=args.keyword_ratio,
+        target_chars=args.target_chars,
+        seed=args.seed
+    )
+    path = generate_document(args.output, spec)
+    print(f"已生成: {path} ({path.stat().st_size / 1024 / 1024:.1f}MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+大语言模型章节审核并发基准测试
+
+启动本地模拟模型服务，对合成文档的各章节分别以串行（并发数1）和配置的并发数调用模型审核，
+比较总耗时：并发审核的耗时应接近最慢的单个章节，而不是各章节之和。
+
+用法：
+    python -m benchmarks.llm_review_benchmark
+    python -m benchmarks.llm_review_benchmark --chapters 30 --latency 0.5 --error-rate 0.1
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.config import LLM_REVIEW_CONFIG
+from app.core.review_point_library import get_review_point_library
+from app.services.review_engine.llm_reviewer import LLMChapterReviewer
+from benchmarks.mock_llm_server import start_mock_server
+
+
+def build_chapters(count: int) -> List[tuple]:
+    """取要点库中的章节循环生成count个待审核章节"""
+    library = get_review_point_library()
+    keys = list(library.chapter_requirements)
+    chapters = []
+    for index in range(count):
+        key = keys[index % len(keys)]
+        content = "。".join(item for _, items, _, _ in library.chapter_requirements[key] for item in items)
+        chapters.append((f"{index + 1} {key}", content, library.chapter_requirements[key]))
+    return chapters
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="大语言模型章节审核并发基准测试")
+    arg_parser.add_argument("--chapters", type=int, default=16, help="章节数")
+    arg_parser.add_argument("--latency", type=float, default=0.3, help="模拟服务每次响应的延迟（秒）")
+    arg_parser.add_argument("--jitter", type=float, default=0.1, help="模拟服务的随机延迟上限（秒）")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="模拟服务返回429/503的比例")
+    arg_parser.add_argument("--concurrency", type=int, default=LLM_REVIEW_CONFIG["max_concurrency"],
+                            help="并发审核的并发数")
+    args = arg_parser.parse_args(argv)
+
+    chapters = build_chapters(args.chapters)
+    results = {}
+    for concurrency in (1, args.concurrency):
+        server, base_url = start_mock_server(latency=args.latency, jitter=args.jitter,
+                                             error_rate=args.error_rate, seed=0)
+        try:
+            reviewer = LLMChapterReviewer("mock-key", "mock-model", base_url,
+                                          {"max_concurrency": concurrency, "retry_base_delay": 0.05},
+                                          use_cache=False)
+            result = reviewer.review(chapters)
+        finally:
+            server.shutdown()
+        stats = server.RequestHandlerClass.state.stats()
+        results[concurrency] = result
+        print(f"并发数 {concurrency:>3}: {result['elapsed_seconds']:>8.3f}s  "
+              f"成功 {result['succeeded']} 失败 {result['failed']}  "
+              f"请求 {stats['requests']}（错误 {stats['errors']}）最大同时请求 {stats['max_in_flight']}")
+
+    sequential = results[1]["elapsed_seconds"]
+    concurrent = results[args.concurrency]["elapsed_seconds"]
+    if concurrent > 0:
+        print(f"\n加速比: {sequential / concurrent:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+本地模拟大语言模型服务
+
+提供OpenAI兼容的 POST /v1/chat/completions 与Anthropic格式的 POST /v1/messages 接口（均支持stream流式响应），
+用于在不访问真实模型的情况下测试并发审核、超时、重试与流式解析：
+可设置每次响应的延迟与随机抖动，以及按比例返回429/503错误。
+
+用法：
+    python -m benchmarks.mock_llm_server --port 8900 --latency 0.5 --error-rate 0.1
+    LLM_API_KEY=test LLM_BASE_URL=http://127.0.0.1:8900/v1 python run.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+_CHAPTER_RE = re.compile(r"章节名称：(.*)")
+
+
+class MockLLMState:
+    """模拟服务的配置与统计（各请求线程共享）"""
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def begin(self) -> Tuple[float, Optional[int]]:
+        """登记一个请求，返回 (延迟秒数, 要返回的错误状态码，正常响应时为None)"""
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            error_status = None
+            if self.random.random() < self.error_rate:
+                self.errors += 1
+                error_status = self.random.choice((429, 503))
+        return delay, error_status
+
+    def end(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"requests": self.requests, "errors": self.errors, "max_in_flight": self.max_in_flight}
+
+
+def mock_completion(messages) -> str:
+    """规则生成请求返回两条规则，章节审核请求根据章节名称生成一条固定格式的审核意见"""
+    prompt = messages[-1].get("content", "") if messages else ""
+    if "审核规则" in prompt:
+        return "```json\n" + json.dumps([
+            {
+                "rule_name": "安全目标检查",
+                "rule_type": "内容检查",
+                "required_content": ["安全目标", "零事故"],
+                "review_focus": "必须明确安全目标",
+                "severity": "严重",
+                "rule_pattern": "安全目标.*?(零事故|零伤亡)"
+            },
+            {
+                "rule_name": "应急预案检查",
+                "rule_type": "内容检查",
+                "required_content": ["应急预案", "应急救援"],
+                "review_focus": "必须包含应急预案和应急救援组织",
+                "severity": "一般",
+                "rule_pattern": ""
+            }
+        ], ensure_ascii=False, indent=2) + "\n```"
+    match = _CHAPTER_RE.search(prompt)
+    chapter = match.group(1).strip() if match else "文档"
+    return json.dumps({
+        "issues": [{
+            "description": f"{chapter}的措施描述不够具体",
+            "severity": "建议",
+            "suggestion": f"补充{chapter}的实施细节和责任人"
+        }]
+    }, ensure_ascii=False)
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """OpenAI兼容接口的请求处理"""
+
+    protocol_version = "HTTP/1.1"
+    state: MockLLMState = None
+    # 流式响应每段的字符数
+    stream_chunk_chars = 8
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端已超时断开
+            self.close_connection = True
+
+    def _send_stream(self, events):
+        """以分块传输发送SSE事件 [(event字段或None, data), ...]"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for event, data in events:
+                text = (f"event: {event}\n" if event else "") + f"data: {data}\n\n"
+                body = text.encode("utf-8")
+                self.wfile.write(f"{len(body):x}\r\n".encode("ascii") + body + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _openai_response(self, request: Dict, content: str):
+        model = request.get("model", "mock")
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": f"mock-{self.state.requests}",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            })
+            return
+        size = self.stream_chunk_chars
+        events = [
+            (None, json.dumps({"object": "chat.completion.chunk", "model": model,
+                               "choices": [{"index": 0, "delta": {"content": content[i:i + size]}}]},
+                              ensure_ascii=False))
+            for i in range(0, len(content), size)
+        ]
+        events.append((None, "[DONE]"))
+        self._send_stream(events)
+
+    def _anthropic_response(self, request: Dict, content: str):
+        model = request.get("model", "mock")
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": f"mock-{self.state.requests}",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": content}],
+                "stop_reason": "end_turn"
+            })
+            return
+        size = self.stream_chunk_chars
+        events = [("message_start", json.dumps({"type": "message_start", "message": {"model": model}})),
+                  ("content_block_start", json.dumps({"type": "content_block_start", "index": 0,
+                                                      "content_block": {"type": "text", "text": ""}}))]
+        events += [
+            ("content_block_delta", json.dumps({"type": "content_block_delta", "index": 0,
+                                                "delta": {"type": "text_delta", "text": content[i:i + size]}},
+                                               ensure_ascii=False))
+            for i in range(0, len(content), size)
+        ]
+        events += [("content_block_stop", json.dumps({"type": "content_block_stop", "index": 0})),
+                   ("message_stop", json.dumps({"type": "message_stop"}))]
+        self._send_stream(events)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.rstrip("/")
+        if path.endswith("/chat/completions"):
+            respond = self._openai_response
+        elif path.endswith("/messages"):
+            respond = self._anthropic_response
+        else:
+            self._send_json(404, {"error": {"message": f"未知接口: {self.path}"}})
+            return
+
+        delay, error_status = self.state.begin()
+        try:
+            time.sleep(delay)
+            if error_status:
+                self._send_json(error_status, {"error": {"message": "模拟服务繁忙"}}, {"Retry-After": "0"})
+                return
+            respond(request, mock_completion(request.get("messages", [])))
+        finally:
+            self.state.end()
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **state_options) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    在后台线程启动模拟服务
+
+    Returns:
+        (服务对象, 接口地址如 http://127.0.0.1:12345/v1)；结束时调用 server.shutdown()
+    """
+    handler = type("BoundMockLLMHandler", (MockLLMHandler,), {"state": MockLLMState(**state_options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="本地模拟大语言模型服务（OpenAI兼容）")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8900)
+    arg_parser.add_argument("--latency", type=float, default=0.2, help="每次响应的基础延迟（秒）")
+    arg_parser.add_argument("--jitter", type=float, default=0.0, help="在基础延迟上增加的随机延迟上限（秒）")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="返回429/503错误的比例")
+    args = arg_parser.parse_args(argv)
+
+    server, base_url = start_mock_server(args.host, args.port, latency=args.latency,
+                                         jitter=args.jitter, error_rate=args.error_rate)
+    print(f"模拟服务已启动: {base_url}（Ctrl+C退出）")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+解析与审核流程性能基准测试
+
+对样例文档及其放大版本依次执行 解析 -> 章节识别 -> AI审核 -> 规则检查 -> 报告生成，
+记录每个环节的耗时、吞吐量（字符/秒）和峰值内存，与基准结果比较，
+任一环节超出阈值即以非零状态码退出。
+
+用法：
+    python -m benchmarks.parser_benchmark                 # 与基准比较（没有基准时生成）
+    python -m benchmarks.parser_benchmark --update-baseline
+    python -m benchmarks.parser_benchmark --scales 1,10 --threshold 30
+    python -m benchmarks.parser_benchmark --synthetic-chars 5000000    # 另测合成文档
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.config import BENCHMARK_CONFIG
+from app.services.document_parser.parser import DocumentParserFactory
+from app.services.review_engine.ai_reviewer import AIReviewer
+from app.services.rule_engine.rule_engine import RuleEngine
+from app.services.report_generator.report_generator import ReportGenerator
+from benchmarks.document_generator import DocumentSpec, generate_document
+
+# 各环节名称（按执行顺序）
+STAGES = ("parse", "extract_chapters", "review", "rules", "report")
+
+
+def scale_docx(source: Path, destination: Path, scale: int):
+    """将docx正文（w:body中sectPr之前的内容）重复scale次"""
+    with zipfile.ZipFile(source) as src:
+        document = src.read("word/document.xml")
+        body_start = document.index(b">", document.index(b"<w:body")) + 1
+        body_end = document.rfind(b"<w:sectPr", body_start)
+        if body_end < 0:
+            body_end = document.rindex(b"</w:body>")
+        scaled = document[:body_start] + document[body_start:body_end] * scale + document[body_end:]
+
+        with zipfile.ZipFile(destination, "w", zipfile.ZIP_DEFLATED) as dst:
+            for item in src.infolist():
+                data = scaled if item.filename == "word/document.xml" else src.read(item.filename)
+                dst.writestr(item, data, compress_type=zipfile.ZIP_DEFLATED)
+
+
+def scale_pdf(source: Path, destination: Path, scale: int):
+    """将PDF全部页面重复scale次"""
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(str(source))
+    writer = PyPDF2.PdfWriter()
+    for _ in range(scale):
+        for page in reader.pages:
+            writer.add_page(page)
+    with open(destination, "wb") as f:
+        writer.write(f)
+
+
+_SCALERS = {".docx": scale_docx, ".pdf": scale_pdf}
+
+
+def prepare_inputs(sample_files: List[Path], scales: List[int], work_dir: Path) -> List[Tuple[str, int, Path]]:
+    """生成各放大倍数的输入文件，返回 [(样例名称, 倍数, 文件路径), ...]"""
+    inputs = []
+    for sample in sample_files:
+        sample = Path(sample)
+        if not sample.exists():
+            print(f"跳过不存在的样例文档: {sample}")
+            continue
+        scaler = _SCALERS.get(sample.suffix.lower())
+        for scale in scales:
+            if scale == 1:
+                path = sample
+            elif scaler is None:
+                print(f"跳过无法放大的样例文档: {sample.name} x{scale}")
+                continue
+            else:
+                path = work_dir / f"{sample.stem}_x{scale}{sample.suffix}"
+                scaler(sample, path, scale)
+            inputs.append((sample.stem, scale, path))
+    return inputs
+
+
+def measure(func: Callable, repeat: int) -> Tuple[object, float, int]:
+    """
+    执行环节并测量
+
+    先重复执行repeat次取最短耗时（不开启tracemalloc，避免影响计时），
+    再在tracemalloc下执行一次得到Python对象分配的峰值内存。
+
+    Returns:
+        (执行结果, 最短耗时秒数, 峰值内存字节数)
+    """
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def _metrics(elapsed: float, peak: int, chars: int) -> Dict:
+    return {
+        "seconds": round(elapsed, 6),
+        "chars": chars,
+        "chars_per_second": round(chars / elapsed) if elapsed > 0 else None,
+        "peak_memory_mb": round(peak / 1024 / 1024, 3)
+    }
+
+
+def run_pipeline(path: Path, repeat: int) -> Dict[str, Dict]:
+    """对一个文档执行全部环节，吞吐量均按文档全文字符数计算"""
+    parser = DocumentParserFactory.get_parser(str(path))
+    results: Dict[str, Dict] = {}
+
+    parsed, elapsed, peak = measure(lambda: parser.parse(str(path)), repeat)
+    content = parsed["content"]
+    results["parse"] = _metrics(elapsed, peak, len(content))
+
+    def record(stage: str, func: Callable):
+        result, elapsed, peak = measure(func, repeat)
+        results[stage] = _metrics(elapsed, peak, len(content))
+        return result
+
+    chapters = record("extract_chapters", lambda: parser.extract_chapters(content))
+    review_result = record("review", lambda: AIReviewer().review_document(parsed))
+    record("rules", lambda: RuleEngine().check_rules(content, chapters))
+    record("report", lambda: ReportGenerator().generate_report(review_result, {"name": path.stem}))
+    return results
+
+
+def prepare_synthetic_inputs(target_chars: int, work_dir: Path, seed: int = 0) -> List[Tuple[str, int, Path]]:
+    """生成指定字数的合成docx、pdf、txt文档"""
+    inputs = []
+    for suffix in (".docx", ".pdf", ".txt"):
+        path = generate_document(work_dir / f"synthetic{suffix}", DocumentSpec(target_chars=target_chars, seed=seed))
+        inputs.append((f"synthetic_{target_chars}{suffix}", 1, path))
+    return inputs
+
+
+def run_benchmark(scales: List[int], repeat: int, sample_files: Optional[List[Path]] = None,
+                  synthetic_chars: int = 0) -> Dict:
+    """运行全部基准测试，返回 {"meta": ..., "results": {"样例@倍数x/环节": 指标}}"""
+    sample_files = sample_files or BENCHMARK_CONFIG["sample_files"]
+    results: Dict[str, Dict] = {}
+
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as work_dir:
+        inputs = prepare_inputs(sample_files, scales, Path(work_dir))
+        if synthetic_chars:
+            inputs += prepare_synthetic_inputs(synthetic_chars, Path(work_dir))
+        for name, scale, path in inputs:
+            print(f"\n{name} x{scale}")
+            stage_results = run_pipeline(path, repeat if scale == 1 else 1)
+            for stage in STAGES:
+                metrics = stage_results[stage]
+                results[f"{name}@{scale}x/{stage}"] = metrics
+                print(f"  {stage:<18}{metrics['seconds']:>10.4f}s"
+                      f"{metrics['chars_per_second'] or 0:>14,}字符/秒"
+                      f"{metrics['peak_memory_mb']:>10.2f}MB")
+
+    return {
+        "meta": {
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scales": scales,
+            "repeat": repeat,
+            "synthetic_chars": synthetic_chars
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold_percent: float,
+            min_seconds: float = 0.0, min_memory_mb: float = 0.0) -> List[str]:
+    """
+    与基准比较
+
+    耗时或峰值内存超出基准threshold_percent%即视为退化；
+    增加量不足min_seconds/min_memory_mb时忽略（微小环节的测量抖动）。
+
+    Returns:
+        退化描述列表
+    """
+    factor = 1 + threshold_percent / 100
+    regressions = []
+    for key, metrics in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        if (metrics["seconds"] > base["seconds"] * factor
+                and metrics["seconds"] - base["seconds"] >= min_seconds):
+            regressions.append(
+                f"{key} 耗时 {base['seconds']:.4f}s -> {metrics['seconds']:.4f}s "
+                f"(+{(metrics['seconds'] / base['seconds'] - 1) * 100:.1f}%)"
+            )
+        if (base["peak_memory_mb"] > 0 and metrics["peak_memory_mb"] > base["peak_memory_mb"] * factor
+                and metrics["peak_memory_mb"] - base["peak_memory_mb"] >= min_memory_mb):
+            regressions.append(
+                f"{key} 峰值内存 {base['peak_memory_mb']:.2f}MB -> {metrics['peak_memory_mb']:.2f}MB "
+                f"(+{(metrics['peak_memory_mb'] / base['peak_memory_mb'] - 1) * 100:.1f}%)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="解析与审核流程性能基准测试")
+    arg_parser.add_argument("--scales", default=",".join(str(s) for s in BENCHMARK_CONFIG["scales"]),
+                            help="样例文档放大倍数，逗号分隔")
+    arg_parser.add_argument("--repeat", type=int, default=BENCHMARK_CONFIG["repeat"],
+                            help="原始大小文档每个环节的重复次数")
+    arg_parser.add_argument("--baseline", default=str(BENCHMARK_CONFIG["baseline_file"]),
+                            help="基准结果文件")
+    arg_parser.add_argument("--threshold", type=float, default=BENCHMARK_CONFIG["regression_threshold_percent"],
+                            help="退化阈值（百分比）")
+    arg_parser.add_argument("--synthetic-chars", type=int, default=BENCHMARK_CONFIG["synthetic_chars"],
+                            help="另外生成指定字数的合成docx/pdf/txt文档参与测试（0为不生成）")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="将本次结果写入基准文件")
+    arg_parser.add_argument("--output", help="本次结果另存为JSON文件")
+    args = arg_parser.parse_args(argv)
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    current = run_benchmark(scales, args.repeat, synthetic_chars=args.synthetic_chars)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline or not baseline_path.exists():
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n基准结果已写入: {baseline_path}")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions = compare(current, baseline, args.threshold,
+                          BENCHMARK_CONFIG["min_regression_seconds"], BENCHMARK_CONFIG["min_regression_memory_mb"])
+    if regressions:
+        print(f"\n性能退化（阈值 {args.threshold}%）：")
+        for line in regressions:
+            print(f"  ✗ {line}")
+        return 1
+
+    print(f"\n✓ 所有环节均未超出基准 {args.threshold}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,9 +16,10 @@ DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR}/data/review_syst
 UPLOAD_DIR = BASE_DIR / "data" / "documents"
 REPORT_DIR = BASE_DIR / "data" / "reports"
 KNOWLEDGE_BASE_DIR = BASE_DIR / "data" / "knowledge_base"
+CACHE_DIR = BASE_DIR / "data" / "cache"
 
 # 创建必要的目录
-for dir_path in [UPLOAD_DIR, REPORT_DIR, KNOWLEDGE_BASE_DIR]:
+for dir_path in [UPLOAD_DIR, REPORT_DIR, KNOWLEDGE_BASE_DIR, CACHE_DIR]:
     dir_path.mkdir(parents=True, exist_ok=True)
 
 # AI模型配置
@@ -26,12 +27,121 @@ LLM_API_KEY = os.getenv("LLM_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
 LLM_BASE_URL = os.getenv("LLM_BASE_URL", "")
 
+# 大语言模型章节审核配置
+LLM_REVIEW_CONFIG = {
+    "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "8")),  # 同时进行的章节审核请求数上限
+    "timeout_seconds": float(os.getenv("LLM_TIMEOUT", "60")),  # 单次请求超时（秒）
+    "max_retries": 3,  # 限流、服务端错误、网络错误的最多重试次数
+    "retry_base_delay": 0.5,  # 重试退避基准（秒），按指数增长并随机抖动
+    "retry_max_delay": 8.0,  # 单次重试最长等待（秒）
+    "max_chapter_chars": 6000,  # 每个章节发送给模型的最多字符数
+    "temperature": 0.3,
+    "max_tokens": 1000,
+}
+
+# 大语言模型同步客户端配置（规则生成等，同一接口地址共用连接池）
+LLM_CLIENT_CONFIG = {
+    "max_connections": 20,  # 每个接口地址的最大连接数
+    "max_keepalive_connections": 10,  # 保持的空闲长连接数
+    "keepalive_expiry_seconds": 60,  # 空闲长连接保留时间（秒）
+    "timeout_seconds": float(os.getenv("LLM_TIMEOUT", "60")),  # 单次请求超时（秒）
+    "max_retries": 3,  # 限流（429）、服务端错误（5xx）、网络错误的最多重试次数
+    "retry_base_delay": 0.5,  # 重试退避基准（秒），按指数增长并随机抖动
+    "retry_max_delay": 8.0,  # 单次重试最长等待（秒）
+    "stream": True,  # 是否以流式方式接收回复并边接收边解析
+}
+
+# 大语言模型响应缓存配置
+LLM_CACHE_CONFIG = {
+    "enabled": os.getenv("LLM_CACHE_ENABLED", "1") != "0",  # 是否启用响应缓存
+    "db_path": CACHE_DIR / "llm" / "responses.sqlite3",  # 缓存数据库文件
+    "ttl_hours": float(os.getenv("LLM_CACHE_TTL_HOURS", "168")),  # 缓存有效期（小时），0为永不过期
+    "max_size_mb": 256,  # 缓存回复总大小上限（MB），超出后按LRU淘汰
+}
+
+# 规则生成配置（长规范分块并行生成后合并去重）
+RULE_GENERATION_CONFIG = {
+    "chunk_tokens": int(os.getenv("RULE_CHUNK_TOKENS", "3000")),  # 每个规范片段的token预算（估算值）
+    "max_concurrency": int(os.getenv("RULE_MAX_CONCURRENCY", "4")),  # 同时请求模型的片段数上限
+}
+
 # 审核配置
 REVIEW_CONFIG = {
     "min_score_pass": 80,  # 通过的最低分数
     "min_score_conditional": 60,  # 有条件通过的最低分数
     "enable_ai_review": True,  # 是否启用AI审核
     "enable_rule_review": True,  # 是否启用规则审核
+    "enable_fuzzy_match": True,  # 必含内容精确匹配未找到时是否查找近似表述（需要numpy、scipy）
+    "fuzzy_match_threshold": 0.75,  # 近似匹配的最低得分（必含内容的字符n-gram出现在同一句中的比例）
+    "fuzzy_ngram": 2,  # 模糊匹配使用的字符n-gram长度
+}
+
+# 文档解析配置
+PARSER_CONFIG = {
+    "docx_streaming": True,  # Word文档使用流式解析（直接读取word/document.xml，不构建python-docx对象树）
+    "pdf_workers": int(os.getenv("PDF_PARSE_WORKERS", min(4, os.cpu_count() or 1))),  # PDF并行解析进程数（0或1为串行，不超过CPU核数）
+    "pdf_parallel_min_pages": 50,  # 页数达到该值才启用并行解析（页数少时进程通信开销大于收益）
+    "pdf_pages_per_task": 8,  # 每个并行任务最少处理的页数
+    "text_encodings": ["utf-8", "gbk", "gb18030"],  # 文本文件无BOM时依次尝试的编码
+    "text_chunk_size_kb": 1024,  # 文本文件每次解码的块大小（KB）
+}
+
+# 解析结果缓存配置
+PARSE_CACHE_CONFIG = {
+    "enabled": os.getenv("PARSE_CACHE_ENABLED", "1") != "0",  # 是否启用解析缓存
+    "cache_dir": CACHE_DIR / "parse",  # 缓存目录
+    "max_size_mb": 512,  # 缓存总大小上限（MB），超出后按LRU淘汰
+}
+
+# 规则引擎配置
+RULE_ENGINE_CONFIG = {
+    "proximity_window": 1000,  # "锚点.*?关键词"类规则：关键词须在锚点之后该字符数内出现
+    "match_time_budget_ms": 200,  # 单条规则匹配耗时预算（毫秒），超出后该规则记为超时
+    "ruleset_cache_ttl_seconds": 300,  # 规则集缓存最长有效期（秒），多进程部署时兜底其他进程的规则变更；0为不过期
+}
+
+# 规则JSONL批量导入导出配置
+RULE_TRANSFER_CONFIG = {
+    "import_batch_size": 500,  # 导入时每批写入的规则数（整个导入在一个事务中）
+    "export_yield_per": 1000,  # 导出时服务端游标每次读取的行数
+    "max_line_bytes": 1024 * 1024,  # 导入文件单行最大字节数
+    "max_reported_errors": 100,  # 导入结果中最多列出的错误行数
+}
+
+# 重大风险及重大隐患数据库配置
+HAZARD_LIBRARY_CONFIG = {
+    "default_file": BASE_DIR / "中国民航机场建设集团有限公司民航专业工程重大风险及重大隐患数据库.xlsx",  # 未上传文件时导入的内置数据库
+    "condition_window": 50,  # 作业关键词与隐患条件词相距不超过该字符数时才输出重大隐患预警
+}
+
+# 后台任务配置
+JOB_QUEUE_CONFIG = {
+    "workers": int(os.getenv("JOB_WORKERS", 2)),  # 后台任务工作线程数
+    "wait_poll_interval": 0.5,  # 等待其他进程执行的任务时，轮询数据库的间隔（秒）
+    "recover_on_startup": True,  # 启动时重新排队上次未执行完的任务
+}
+
+# 执行池配置（审核的计算阶段在进程池中执行，阻塞I/O在线程池中执行，不阻塞事件循环）
+EXECUTOR_CONFIG = {
+    "cpu_workers": int(os.getenv("CPU_WORKERS", min(4, os.cpu_count() or 1))),  # 计算进程数（0为不使用进程池，计算阶段改在I/O线程池执行）
+    "io_workers": int(os.getenv("IO_WORKERS", 16)),  # 阻塞I/O线程数
+    "cpu_start_method": "spawn",  # 计算进程启动方式（spawn不继承父进程的线程锁与数据库连接）
+}
+
+# 性能基准测试配置（python -m benchmarks.parser_benchmark）
+BENCHMARK_CONFIG = {
+    "sample_files": [  # 基准测试使用的样例文档
+        BASE_DIR / "机场场道工程施工组织设计范本.docx",
+        BASE_DIR / "机场目视助航工程施工组织设计范本.docx",
+        BASE_DIR / "民航专业工程施工重大安全隐患判定标准(试行).pdf",
+    ],
+    "scales": [1, 10, 100],  # 样例文档放大倍数（正文重复N次）
+    "synthetic_chars": 0,  # 合成文档字数（大于0时另外生成docx/pdf/txt合成文档参与测试）
+    "repeat": 3,  # 原始大小文档每个环节重复执行次数（取最短耗时），放大后的文档只执行一次
+    "baseline_file": BASE_DIR / "benchmarks" / "baseline.json",  # 基准结果文件
+    "regression_threshold_percent": float(os.getenv("BENCHMARK_REGRESSION_PERCENT", 25)),  # 耗时或峰值内存超出基准该比例视为退化
+    "min_regression_seconds": 0.005,  # 耗时增加小于该值时不视为退化（避免微小环节的计时抖动）
+    "min_regression_memory_mb": 0.5,  # 峰值内存增加小于该值时不视为退化
 }
 
 # 日志配置
@@ -40,7 +150,7 @@ LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
 # 允许的文件类型
-ALLOWED_FILE_TYPES = [".docx", ".doc", ".pdf", ".txt"]
+ALLOWED_FILE_TYPES = [".docx", ".doc", ".pdf", ".txt", ".md", ".xlsx"]
 
 # 文件大小限制（MB）
 MAX_FILE_SIZE_MB = 50
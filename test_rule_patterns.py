@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+规则匹配模式测试
+验证有回溯风险的模式在编译时被拒绝、不能通过JSONL导入，通用正则匹配受耗时预算限制
+"""
+
+import json
+import re
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base
+from app.services.rule_engine.ruleset import CompiledRule, check_pattern_safety, MATCH_FOUND, MATCH_NOT_FOUND
+from app.services.rule_engine.rule_transfer import RuleImporter, RuleImportError
+
+# 多个不定长通配量词：匹配长文档时出现多项式级回溯
+SLOW_PATTERN = "安全.*?目标.*?零事故"
+SLOW_CONTENT = ("安全" + "x" * 40 + "目标" + "y" * 40) * 2000
+
+
+def _compile(pattern, rule_type="内容检查"):
+    return CompiledRule({"name": "测试规则", "type": rule_type, "pattern": pattern}, 1000, 200)
+
+
+def test_multiple_wildcards_rejected():
+    """多个.*?的模式不能通过安全检查，内容检查与章节检查规则都拒绝编译"""
+    assert check_pattern_safety(SLOW_PATTERN)
+    with pytest.raises(re.error):
+        _compile(SLOW_PATTERN)
+    with pytest.raises(re.error):
+        _compile("(a+)+$", "章节检查")
+
+
+def test_regex_match_within_budget():
+    """单个通配量词的模式在长文档上按耗时预算结束，结果与re.search一致"""
+    compiled = _compile("安全.*?零事故")
+    started = time.perf_counter()
+    compiled.match_content(SLOW_CONTENT)
+    assert time.perf_counter() - started < 2
+
+    content = "x" * 63000 + "安全目标" + "a" * 2000 + "零事故"
+    assert _compile("安全目标[^。]*零事故").match_content(content) == MATCH_FOUND
+    assert _compile("目标$").match_content("x" * 65530 + "目标" + "z") == MATCH_NOT_FOUND
+    assert _compile("(?:安全|质量)+目标").match_content("质量安全目标") == MATCH_FOUND
+
+
+def test_import_rejects_multiple_wildcards():
+    """JSONL导入时多个.*?的模式整体失败；skip_invalid时跳过该行并列出原因"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    lines = [
+        (1, json.dumps({"rule_name": "安全目标", "rule_pattern": "安全目标[^。]*零事故"}, ensure_ascii=False)),
+        (2, json.dumps({"rule_name": "零事故目标", "rule_pattern": SLOW_PATTERN}, ensure_ascii=False)),
+    ]
+    try:
+        with pytest.raises(RuleImportError) as excinfo:
+            RuleImporter(db).add_lines(lines)
+        assert excinfo.value.line_no == 2
+        db.rollback()
+
+        importer = RuleImporter(db, skip_invalid=True)
+        importer.add_lines(lines)
+        result = importer.finish()
+        assert result["imported"] == 1
+        assert [error["line"] for error in result["errors"]] == [2]
+    finally:
+        db.close()
+        engine.dispose()